@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+"""
+API HTTP de solo lectura (ASGI) sobre los mismos datos de la plataforma.
+
+Expone las consultas del dashboard para otros consumidores, sin el costo de
+un rerun de Streamlit. Usa la misma capa de datos: dataset compartido que
+se recarga al cambiar el archivo (datos_plataforma), facetas precalculadas
+(facetas), índice de búsqueda (indice_busqueda), clusters del mapa
+(servicio_mapa) y cubo de tribunales (cubo_tribunales).
+
+Endpoints (GET):
+    /salud                   versiones de los datos
+    /conflictos              lista paginada: ?fuente=&sector=&region=&estado=&año=&pagina=&por_pagina=
+    /conflictos.csv          mismos filtros, CSV completo en streaming
+    /facetas                 conteos por dimensión para los filtros
+    /buscar                  ?q=texto&tabla=conflictos|sentencias&limite=
+    /mapa                    clusters o puntos: ?zoom=&extension=lat_min,lon_min,lat_max,lon_max&causas=1
+    /tribunales              ?dimension=año&medida=causas&tribunal=2TA&procedimiento=...
+    /tribunales/oficiales    cifras oficiales por tribunal
+
+Los filtros se pueden repetir (?fuente=INDH&fuente=OCMAL). Las respuestas
+JSON se guardan en un LRU por (ruta, parámetros, versión de los datos),
+llevan ETag (If-None-Match -> 304) y se comprimen con gzip si el cliente
+lo acepta. Los errores 503 (datos no generados) y 500 no se guardan.
+
+Ejecutar con:
+    PLATAFORMA_COMPARTIDA=1 uvicorn api_plataforma:app --workers 4
+    python api_plataforma.py [--puerto 8000] [--workers 4]   # uvicorn si está instalado, si no un servidor asyncio mínimo
+
+Prueba de carga: python scripts/carga_api.py
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import os
+import socket
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import parse_qs
+
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
+
+from cubo_tribunales import (CIFRAS_OFICIALES_FILE, CUBO_FILE, DIMENSIONES as DIMENSIONES_CUBO, LISTADO_FILE,
+                             CuboTribunales, cargar_cifras_oficiales)
+from datos_plataforma import VARIABLE_COMPARTIDA, dataset_conflictos, iterar_csv
+from facetas import DIMENSIONES as DIMENSIONES_FACETAS, Facetas, ordenar_conteos
+from indice_busqueda import INDICE_FILE, buscar_conflictos, buscar_sentencias
+from servicio_mapa import GEOCODIFICACION_FILE, indice_conflictos_y_causas
+
+# Columnas de /conflictos (las de la plataforma)
+COLUMNAS = [
+    'id_maestro', 'fuente_principal', 'nombre', 'descripcion', 'region', 'sector',
+    'estado', 'año_inicio', 'latitud', 'longitud', 'impactos', 'resistencias', 'resultados'
+]
+
+POR_PAGINA = 50
+MAX_POR_PAGINA = 500
+MAX_LIMITE_BUSQUEDA = 200
+
+TAMANO_CACHE = 512
+# Respuestas más cortas no se comprimen
+MIN_GZIP = 1024
+CACHE_CONTROL = "public, max-age=60"
+
+
+class ErrorConsulta(ValueError):
+    """Parámetros inválidos (responde 400)."""
+
+
+class DatosNoDisponibles(Exception):
+    """Datos de un endpoint aún no generados (responde 503, sin guardar en caché)."""
+
+
+# ============================================================
+# CAPA DE DATOS
+# ============================================================
+
+def _version_archivo(ruta):
+    return ruta.stat().st_mtime_ns if ruta.exists() else 0
+
+
+class DatosAPI:
+    """Dataset y estructuras derivadas, reconstruidas solo cuando cambia su versión."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._derivados = {}
+
+    def conflictos(self):
+        """(DataFrame, versión) del dataset compartido."""
+        return dataset_conflictos(COLUMNAS).obtener()
+
+    def _derivado(self, nombre, version, construir):
+        with self._lock:
+            actual = self._derivados.get(nombre)
+            if actual is not None and actual[0] == version:
+                return actual[1]
+        valor = construir()
+        with self._lock:
+            self._derivados[nombre] = (version, valor)
+        return valor
+
+    def facetas(self):
+        df, version = self.conflictos()
+        return df, self._derivado("facetas", version, lambda: Facetas(df))
+
+    def mapa(self):
+        df, version = self.conflictos()
+        return self._derivado("mapa", (version, _version_archivo(GEOCODIFICACION_FILE)),
+                              lambda: indice_conflictos_y_causas(df))
+
+    def cubo(self):
+        version = (_version_archivo(CUBO_FILE), _version_archivo(LISTADO_FILE))
+        return self._derivado("cubo", version, CuboTribunales.cargar)
+
+    def version(self, ruta):
+        """Versión de los datos de los que depende un endpoint (clave de caché y ETag)."""
+        if ruta.startswith("/tribunales"):
+            return (_version_archivo(CUBO_FILE), _version_archivo(LISTADO_FILE),
+                    _version_archivo(CIFRAS_OFICIALES_FILE))
+        if ruta == "/buscar":
+            return _version_archivo(INDICE_FILE)
+        if ruta == "/mapa":
+            return (self.conflictos()[1], _version_archivo(GEOCODIFICACION_FILE))
+        return self.conflictos()[1]
+
+
+DATOS = DatosAPI()
+
+
+# ============================================================
+# PARÁMETROS
+# ============================================================
+
+def _lista(params, nombre):
+    return [v for v in params.get(nombre, []) if v != ""] or None
+
+
+def _uno(params, nombre, defecto=None):
+    valores = params.get(nombre)
+    return valores[-1] if valores else defecto
+
+
+def _entero(params, nombre, defecto, minimo=None, maximo=None):
+    valor = _uno(params, nombre)
+    if valor is None:
+        return defecto
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise ErrorConsulta(f"'{nombre}' debe ser un entero")
+    if minimo is not None:
+        numero = max(minimo, numero)
+    return min(maximo, numero) if maximo is not None else numero
+
+
+def filtros_facetas(params):
+    """Filtros de facetas desde los parámetros (año se convierte a entero)."""
+    filtros = {}
+    for dim in DIMENSIONES_FACETAS:
+        valores = _lista(params, dim)
+        if valores is None:
+            continue
+        if dim == "año":
+            try:
+                valores = [int(v) for v in valores]
+            except ValueError:
+                raise ErrorConsulta("'año' debe ser un entero")
+        filtros[dim] = tuple(valores)
+    return filtros
+
+
+def _registros(df):
+    """Filas de un DataFrame como dicts serializables (None para nulos, listas para arreglos)."""
+    registros = []
+    for fila in df.astype(object).to_dict("records"):
+        for col, valor in fila.items():
+            if hasattr(valor, "tolist"):
+                fila[col] = valor.tolist()
+            elif valor is None or (isinstance(valor, float) and math.isnan(valor)) or str(valor) == "<NA>":
+                fila[col] = None
+        registros.append(fila)
+    return registros
+
+
+# ============================================================
+# ENDPOINTS
+# ============================================================
+
+def ep_salud(params):
+    return {"estado": "ok", "versiones": {ruta: str(DATOS.version(ruta))
+                                          for ruta in ("/conflictos", "/buscar", "/mapa", "/tribunales")}}
+
+
+def ep_conflictos(params):
+    df, facetas = DATOS.facetas()
+    indices = facetas.indices(**filtros_facetas(params))
+    por_pagina = _entero(params, "por_pagina", POR_PAGINA, 1, MAX_POR_PAGINA)
+    pagina = _entero(params, "pagina", 1, 1)
+    inicio = (pagina - 1) * por_pagina
+    return {
+        "total": len(indices),
+        "pagina": pagina,
+        "por_pagina": por_pagina,
+        "resultados": _registros(df.iloc[indices[inicio:inicio + por_pagina]]),
+    }
+
+
+def ep_conflictos_csv(params):
+    df, facetas = DATOS.facetas()
+    return iterar_csv(df.iloc[facetas.indices(**filtros_facetas(params))])
+
+
+def ep_facetas(params):
+    _, facetas = DATOS.facetas()
+    conteos = facetas.conteos(**filtros_facetas(params))
+    return {"total": conteos["total"],
+            **{dim: ordenar_conteos(conteos[dim]) for dim in facetas.valores}}
+
+
+def ep_buscar(params):
+    texto = _uno(params, "q", "")
+    tabla = _uno(params, "tabla", "conflictos")
+    if tabla not in ("conflictos", "sentencias"):
+        raise ErrorConsulta("'tabla' debe ser conflictos o sentencias")
+    if not INDICE_FILE.exists():
+        raise DatosNoDisponibles("Índice de búsqueda no generado (python scripts/indice_busqueda.py)")
+    limite = _entero(params, "limite", 20, 1, MAX_LIMITE_BUSQUEDA)
+    buscador = buscar_conflictos if tabla == "conflictos" else buscar_sentencias
+    return {"q": texto, "tabla": tabla, "resultados": buscador(texto, limite=limite)}
+
+
+def ep_mapa(params):
+    import numpy as np
+
+    _, facetas = DATOS.facetas()
+    indice, filas, causas = DATOS.mapa()
+
+    zoom = _uno(params, "zoom")
+    extension = _uno(params, "extension")
+    try:
+        zoom = float(zoom) if zoom is not None else None
+        extension = tuple(float(v) for v in extension.split(",")) if extension else None
+    except ValueError:
+        raise ErrorConsulta("'zoom' y 'extension' deben ser numéricos")
+    if extension is not None and len(extension) != 4:
+        raise ErrorConsulta("'extension' debe ser lat_min,lon_min,lat_max,lon_max")
+
+    incluir_causas = _uno(params, "causas", "0") in ("1", "true", "si")
+    mascara = np.concatenate([facetas.mascara(**filtros_facetas(params))[filas],
+                              np.full(len(causas), incluir_causas)])
+    vista = indice.consultar(zoom=zoom, extension=extension, mascara=mascara)
+    vista.pop("posiciones", None)
+    return vista
+
+
+def ep_tribunales(params):
+    cubo = DATOS.cubo()
+    if cubo is None:
+        raise DatosNoDisponibles("Cubo de tribunales no disponible (python scripts/cubo_tribunales.py)")
+
+    filtros = {}
+    for dim in DIMENSIONES_CUBO:
+        valor = _uno(params, dim)
+        if valor is not None:
+            if dim == "año":
+                try:
+                    valor = int(valor)
+                except ValueError:
+                    raise ErrorConsulta("'año' debe ser un entero")
+            filtros[dim] = valor
+
+    dimension = _uno(params, "dimension")
+    medida = _uno(params, "medida", "documentos")
+    if medida not in ("documentos", "causas"):
+        raise ErrorConsulta("'medida' debe ser documentos o causas")
+    if dimension is None:
+        return {"filtros": filtros, "documentos": cubo.documentos(**filtros), "causas": cubo.causas(**filtros)}
+    if dimension not in DIMENSIONES_CUBO:
+        raise ErrorConsulta(f"'dimension' debe ser una de {DIMENSIONES_CUBO}")
+    filtros.pop(dimension, None)
+    return {"filtros": filtros, "dimension": dimension, "medida": medida,
+            "serie": cubo.serie(dimension, medida=medida, **filtros)}
+
+
+def ep_tribunales_oficiales(params):
+    cifras = cargar_cifras_oficiales()
+    if cifras is None:
+        raise DatosNoDisponibles(f"No existe {CIFRAS_OFICIALES_FILE.name}")
+    return cifras
+
+
+RUTAS = {
+    "/salud": ep_salud,
+    "/conflictos": ep_conflictos,
+    "/facetas": ep_facetas,
+    "/buscar": ep_buscar,
+    "/mapa": ep_mapa,
+    "/tribunales": ep_tribunales,
+    "/tribunales/oficiales": ep_tribunales_oficiales,
+}
+RUTAS_STREAMING = {
+    "/conflictos.csv": (ep_conflictos_csv, b"text/csv; charset=utf-8"),
+}
+
+
+# ============================================================
+# CACHÉ DE RESPUESTAS
+# ============================================================
+
+class Respuesta:
+    """Cuerpo JSON serializado, su ETag y (si se pide) su versión gzip."""
+
+    def __init__(self, estado, cuerpo):
+        self.estado = estado
+        self.cuerpo = cuerpo
+        self.etag = f'"{hashlib.sha1(cuerpo).hexdigest()[:20]}"'.encode()
+        self._gzip = None
+
+    def comprimido(self):
+        if self._gzip is None:
+            self._gzip = gzip.compress(self.cuerpo, compresslevel=6)
+        return self._gzip
+
+
+class CacheRespuestas:
+    """LRU de respuestas por (ruta, parámetros, versión de los datos)."""
+
+    def __init__(self, tamano=TAMANO_CACHE):
+        self.tamano = tamano
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, calcular):
+        with self._lock:
+            respuesta = self._entradas.get(clave)
+            if respuesta is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return respuesta
+        respuesta = calcular()
+        with self._lock:
+            self.fallos += 1
+            self._entradas[clave] = respuesta
+            while len(self._entradas) > self.tamano:
+                self._entradas.popitem(last=False)
+        return respuesta
+
+
+CACHE = CacheRespuestas()
+
+
+def _json(datos):
+    def convertir(valor):
+        if hasattr(valor, "item"):
+            return valor.item()
+        if hasattr(valor, "tolist"):
+            return valor.tolist()
+        return str(valor)
+    return json.dumps(datos, ensure_ascii=False, separators=(",", ":"), default=convertir).encode("utf-8")
+
+
+def respuesta_error(ruta, error):
+    """Respuesta 503/500 (no cacheable) para una excepción de un endpoint."""
+    if isinstance(error, DatosNoDisponibles):
+        return Respuesta(503, _json({"error": str(error)}))
+    print(f"Error en {ruta}:", file=sys.stderr)
+    traceback.print_exception(error)
+    return Respuesta(500, _json({"error": "Error interno"}))
+
+
+def responder_json(ruta, params):
+    """Respuesta de un endpoint JSON (las 200 y 400 se guardan en caché)."""
+    endpoint = RUTAS[ruta]
+
+    def calcular():
+        try:
+            return Respuesta(200, _json(endpoint(params)))
+        except ErrorConsulta as e:
+            return Respuesta(400, _json({"error": str(e)}))
+
+    try:
+        clave = (ruta, tuple(sorted((k, tuple(v)) for k, v in params.items())), DATOS.version(ruta))
+        return CACHE.obtener(clave, calcular)
+    except Exception as e:
+        return respuesta_error(ruta, e)
+
+
+# ============================================================
+# APLICACIÓN ASGI
+# ============================================================
+
+def _cabeceras(scope):
+    return {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+
+
+async def _enviar(send, estado, cuerpo, cabeceras, head=False):
+    await send({"type": "http.response.start", "status": estado,
+                "headers": cabeceras + [(b"content-length", str(len(cuerpo)).encode())]})
+    await send({"type": "http.response.body", "body": b"" if head else cuerpo})
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            mensaje = await receive()
+            if mensaje["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif mensaje["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    ruta = scope["path"].rstrip("/") or "/"
+    metodo = scope["method"]
+    tipo_json = [(b"content-type", b"application/json; charset=utf-8")]
+    if metodo not in ("GET", "HEAD"):
+        await _enviar(send, 405, _json({"error": "Solo GET"}), tipo_json + [(b"allow", b"GET, HEAD")])
+        return
+
+    params = parse_qs(scope.get("query_string", b"").decode("utf-8"), keep_blank_values=False)
+    cabeceras = _cabeceras(scope)
+    loop = asyncio.get_running_loop()
+
+    if ruta in RUTAS_STREAMING:
+        generador, tipo = RUTAS_STREAMING[ruta]
+        try:
+            bloques = await loop.run_in_executor(None, generador, params)
+        except ErrorConsulta as e:
+            await _enviar(send, 400, _json({"error": str(e)}), tipo_json)
+            return
+        except Exception as e:
+            respuesta = respuesta_error(ruta, e)
+            await _enviar(send, respuesta.estado, respuesta.cuerpo, tipo_json, head=(metodo == "HEAD"))
+            return
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", tipo), (b"cache-control", CACHE_CONTROL.encode())]})
+        try:
+            # Cada bloque se genera en el executor (pandas): el event loop sigue atendiendo
+            while metodo == "GET":
+                bloque = await loop.run_in_executor(None, next, bloques, None)
+                if bloque is None:
+                    break
+                await send({"type": "http.response.body", "body": bloque, "more_body": True})
+        finally:
+            bloques.close()
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    if ruta not in RUTAS:
+        await _enviar(send, 404, _json({"error": f"Ruta desconocida: {ruta}", "rutas": sorted(RUTAS) +
+                                        sorted(RUTAS_STREAMING)}), tipo_json)
+        return
+
+    # Las consultas usan pandas/numpy: fuera del event loop
+    respuesta = await loop.run_in_executor(None, responder_json, ruta, params)
+    comunes = tipo_json + [(b"vary", b"Accept-Encoding")]
+    if respuesta.estado == 200:
+        comunes += [(b"etag", respuesta.etag), (b"cache-control", CACHE_CONTROL.encode())]
+
+    if respuesta.estado == 200 and respuesta.etag.decode() in cabeceras.get("if-none-match", ""):
+        await send({"type": "http.response.start", "status": 304, "headers": comunes[1:]})
+        await send({"type": "http.response.body", "body": b""})
+        return
+
+    cuerpo = respuesta.cuerpo
+    if len(cuerpo) >= MIN_GZIP and "gzip" in cabeceras.get("accept-encoding", ""):
+        cuerpo = respuesta.comprimido()
+        comunes.append((b"content-encoding", b"gzip"))
+    await _enviar(send, respuesta.estado, cuerpo, comunes, head=(metodo == "HEAD"))
+
+
+# ============================================================
+# SERVIDOR MÍNIMO (sin uvicorn)
+# ============================================================
+
+RAZONES = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+async def _atender(lector, escritor, aplicacion):
+    """Conexión HTTP/1.1 con keep-alive: cada petición se pasa a la aplicación ASGI."""
+    try:
+        while True:
+            linea = await lector.readline()
+            if not linea:
+                break
+            metodo, destino, _ = linea.decode("latin-1").split(" ", 2)
+            cabeceras = []
+            while True:
+                linea = await lector.readline()
+                if linea in (b"\r\n", b"\n", b""):
+                    break
+                nombre, _, valor = linea.decode("latin-1").partition(":")
+                cabeceras.append((nombre.strip().lower().encode("latin-1"), valor.strip().encode("latin-1")))
+            ruta, _, consulta = destino.partition("?")
+            scope = {"type": "http", "method": metodo, "path": ruta, "query_string": consulta.encode("latin-1"),
+                     "headers": cabeceras, "http_version": "1.1"}
+            cerrar = (b"connection", b"close") in cabeceras
+
+            async def recibir():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            # HEAD: mismas cabeceras que GET, sin cuerpo (ni el terminador chunked)
+            estado_envio = {"head": metodo == "HEAD"}
+
+            async def enviar(mensaje):
+                if mensaje["type"] == "http.response.start":
+                    estado = mensaje["status"]
+                    lineas = [f"HTTP/1.1 {estado} {RAZONES.get(estado, '')}\r\n".encode()]
+                    nombres = set()
+                    for nombre, valor in mensaje["headers"]:
+                        nombres.add(nombre.lower())
+                        lineas.append(nombre + b": " + valor + b"\r\n")
+                    # Sin content-length se envía en bloques (chunked)
+                    estado_envio["chunked"] = b"content-length" not in nombres and estado != 304
+                    if estado_envio["chunked"]:
+                        lineas.append(b"transfer-encoding: chunked\r\n")
+                    escritor.write(b"".join(lineas) + b"\r\n")
+                elif mensaje["type"] == "http.response.body":
+                    cuerpo = mensaje.get("body", b"")
+                    if estado_envio["head"]:
+                        return
+                    if estado_envio.get("chunked"):
+                        if cuerpo:
+                            escritor.write(f"{len(cuerpo):x}\r\n".encode() + cuerpo + b"\r\n")
+                        if not mensaje.get("more_body"):
+                            escritor.write(b"0\r\n\r\n")
+                    else:
+                        escritor.write(cuerpo)
+                    await escritor.drain()
+
+            await aplicacion(scope, recibir, enviar)
+            if cerrar:
+                break
+    except (ConnectionError, ValueError):
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir(aplicacion, host="127.0.0.1", puerto=8000, reutilizar_puerto=False):
+    servidor = await asyncio.start_server(lambda l, e: _atender(l, e, aplicacion), host, puerto,
+                                          reuse_port=reutilizar_puerto or None)
+    print(f"API en http://{host}:{puerto} (proceso {os.getpid()}, servidor asyncio mínimo; para producción: uvicorn)")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def _servir_worker(host, puerto):
+    asyncio.run(servir(app, host, puerto, reutilizar_puerto=True))
+
+
+def main(host="127.0.0.1", puerto=8000, workers=1):
+    # Varios workers comparten el dataset mapeado en memoria (datos_plataforma)
+    if workers > 1:
+        os.environ[VARIABLE_COMPARTIDA] = "1"
+    try:
+        import uvicorn
+    except ImportError:
+        if workers > 1 and hasattr(socket, "SO_REUSEPORT"):
+            import multiprocessing
+            procesos = [multiprocessing.Process(target=_servir_worker, args=(host, puerto)) for _ in range(workers)]
+            for proceso in procesos:
+                proceso.start()
+            for proceso in procesos:
+                proceso.join()
+            return
+        if workers > 1:
+            print("uvicorn no instalado, se usa un solo proceso. Ejecuta: pip install uvicorn")
+        asyncio.run(servir(app, host, puerto))
+        return
+    uvicorn.run("api_plataforma:app", host=host, port=puerto, workers=workers)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='API HTTP de solo lectura de la plataforma')
+    parser.add_argument('--host', default='127.0.0.1', help='Interfaz (default: 127.0.0.1)')
+    parser.add_argument('--puerto', type=int, default=8000, help='Puerto (default: 8000)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Procesos; con más de uno comparten el dataset mapeado en memoria')
+    args = parser.parse_args()
+
+    main(args.host, args.puerto, args.workers)
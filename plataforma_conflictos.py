@@ -7,14 +7,23 @@ Ejecutar con: streamlit run plataforma_conflictos.py
 Dos secciones principales:
 1. Conflictos Socioecológicos: Base integrada INDH, EJAtlas, OCMAL (244 conflictos)
 2. Tribunales Ambientales: Corpus de causas y sentencias (2012-2025)
+
+Cada rerun de Streamlit ejecuta solo la sección y la vista seleccionadas:
+pandas y plotly se importan dentro de las vistas que los usan, y los
+agregados (conteos por sector, región, estado...) salen de facetas
+precalculadas (scripts/facetas.py), con caché por combinación de filtros,
+y las series de la vista Temporal del cubo temporal (scripts/cubo_temporal.py).
+Los gráficos se sirven desde una caché de figuras serializadas por
+(gráfico, filtros, versión de los datos) (scripts/cache_graficos.py); los
+de las vistas por defecto se construyen al cargar cada versión de los datos.
 """
 
-import json
+import sys
 from pathlib import Path
-from collections import Counter
-import pandas as pd
+
 import streamlit as st
-import plotly.express as px
+
+sys.path.insert(0, str(Path(__file__).parent / "scripts"))
 
 # Configuración de página
 st.set_page_config(
@@ -26,32 +35,140 @@ st.set_page_config(
 # Rutas
 BASE_DIR = Path(__file__).parent
 DATOS_DIR = BASE_DIR / "datos" / "conflictos"
-STATS_DIR = BASE_DIR / "datos" / "estadisticas"
 
+# Columnas del dataset de conflictos que usa la plataforma
+COLUMNAS_CONFLICTOS = [
+    'id_maestro', 'fuente_principal', 'nombre', 'descripcion', 'region', 'sector',
+    'estado', 'año_inicio', 'latitud', 'longitud', 'impactos', 'resistencias', 'resultados'
+]
+
+COLORES_FUENTE = {'INDH': '#1f77b4', 'EJAtlas': '#ff7f0e', 'OCMAL': '#2ca02c'}
+COLORES_ESTADO = {'Activo': '#E63946', 'Latente': '#F4A261', 'Cerrado': '#2A9D8F', 'Archivado': '#264653'}
+COLORES_TRIBUNAL = ['#1f77b4', '#ff7f0e', '#2ca02c']
 
-@st.cache_data(ttl=10)
-def cargar_datos_conflictos():
-    """Carga el dataset consolidado de conflictos."""
-    archivo = DATOS_DIR / "conflictos_consolidados_noticias.json"
-    with open(archivo, encoding="utf-8") as f:
-        data = json.load(f)
 
-    df = pd.DataFrame(data)
+def _preparar_conflictos(df):
     df['fuente'] = df['fuente_principal']
-    df['region'] = df['region'].fillna('Sin dato')
-    df['sector'] = df['sector'].fillna('Sin dato')
-    df['estado'] = df['estado'].fillna('')
     return df
 
 
-@st.cache_data
-def cargar_datos_tribunales():
-    """Carga estadísticas de los Tribunales Ambientales."""
-    stats_path = STATS_DIR / "estadisticas_corpus.json"
-    if stats_path.exists():
-        with open(stats_path, encoding="utf-8") as f:
-            return json.load(f)
-    return None
+def cargar_datos_conflictos():
+    """
+    Dataset consolidado de conflictos y su versión.
+
+    Una sola copia por proceso, compartida entre sesiones; se recarga solo
+    cuando cambia el archivo de datos (ver scripts/datos_plataforma.py).
+    El DataFrame no debe modificarse.
+    """
+    from datos_plataforma import dataset_conflictos
+
+    return dataset_conflictos(COLUMNAS_CONFLICTOS, preparar=_preparar_conflictos).obtener()
+
+
+def _version_archivo(ruta):
+    return ruta.stat().st_mtime_ns if ruta.exists() else 0
+
+
+@st.cache_resource(max_entries=2)
+def cargar_cubo_tribunales(version):
+    """Cubo tribunal × año × tipo × procedimiento (scripts/cubo_tribunales.py), o None."""
+    from cubo_tribunales import CuboTribunales
+    return CuboTribunales.cargar()
+
+
+@st.cache_data(max_entries=2)
+def cargar_cifras_oficiales(version):
+    """Cifras oficiales por tribunal (datos/estadisticas/cifras_oficiales.json), o None."""
+    from cubo_tribunales import cargar_cifras_oficiales
+    return cargar_cifras_oficiales()
+
+
+@st.cache_data(max_entries=4)
+def opciones_filtros(version):
+    """Valores de los filtros de la barra lateral (fuentes, sectores, regiones)."""
+    from almacen_conflictos import SIN_DATO
+
+    df, _ = cargar_datos_conflictos()
+    return {
+        "fuentes": df['fuente'].unique().tolist(),
+        "sectores": sorted([s for s in df['sector'].unique() if s != SIN_DATO]),
+        "regiones": sorted([r for r in df['region'].unique() if r != SIN_DATO]),
+    }
+
+
+@st.cache_resource(max_entries=2)
+def facetas_conflictos(version):
+    """Bitmaps por fuente, sector, región, estado y año (scripts/facetas.py)."""
+    from facetas import Facetas
+
+    df, _ = cargar_datos_conflictos()
+    return Facetas(df)
+
+
+def _filtros_facetas(fuentes, sector, region):
+    return {
+        "fuente": fuentes,
+        "sector": None if sector == 'Todos' else (sector,),
+        "region": None if region == 'Todas' else (region,),
+    }
+
+
+def filtrar_conflictos(version, fuentes, sector, region):
+    """Subconjunto del dataset para una combinación de filtros."""
+    df, _ = cargar_datos_conflictos()
+    indices = facetas_conflictos(version).indices(**_filtros_facetas(fuentes, sector, region))
+    return df.iloc[indices]
+
+
+def agregados_conflictos(version, fuentes, sector, region):
+    """Conteos para métricas y gráficos, en una pasada sobre las facetas (LRU por filtros)."""
+    from almacen_conflictos import SIN_DATO
+    from facetas import ordenar_conteos
+
+    conteos = facetas_conflictos(version).conteos(**_filtros_facetas(fuentes, sector, region))
+    return {
+        "total": conteos["total"],
+        "por_fuente": dict(ordenar_conteos(conteos["fuente"])),
+        "activos": conteos["estado"].get('Activo', 0),
+        "por_sector": ordenar_conteos(conteos["sector"], excluir=(SIN_DATO,), limite=10),
+        "por_region": ordenar_conteos(conteos["region"], excluir=(SIN_DATO,), limite=10),
+        "por_estado": ordenar_conteos(conteos["estado"], excluir=(SIN_DATO,)),
+    }
+
+
+@st.cache_resource(max_entries=2)
+def cubo_temporal_conflictos(version):
+    """Cubo año × sector × región × fuente × estado (scripts/cubo_temporal.py)."""
+    from cubo_temporal import CuboTemporal
+
+    df, _ = cargar_datos_conflictos()
+    return CuboTemporal.cargar(df=df)
+
+
+def grafico_barras_h(pares, etiqueta, titulo, **kwargs):
+    """Gráfico de barras horizontal a partir de pares (categoría, cantidad)."""
+    import pandas as pd
+    import plotly.express as px
+
+    df = pd.DataFrame(pares, columns=[etiqueta, 'Cantidad'])
+    fig = px.bar(df, x='Cantidad', y=etiqueta, orientation='h', title=titulo, text='Cantidad', **kwargs)
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+    fig.update_traces(textposition='outside')
+    return fig
+
+
+@st.cache_resource
+def cache_graficos():
+    """Figuras serializadas compartidas por todas las sesiones (scripts/cache_graficos.py)."""
+    from cache_graficos import CacheGraficos
+    return CacheGraficos()
+
+
+def mostrar_grafico(id_grafico, version, filtros, construir, *args):
+    """Muestra un gráfico desde la caché de figuras (lo construye solo si no está)."""
+    figura = cache_graficos().obtener(id_grafico, filtros, version, construir, *args)
+    if figura is not None:
+        st.plotly_chart(figura, use_container_width=True)
 
 
 # =============================================================================
@@ -70,160 +187,329 @@ def seccion_conflictos():
     actores afectados, formas de resistencia y estado actual.
     """)
 
-    df = cargar_datos_conflictos()
+    # La versión de los datos entra en la clave de los cachés derivados
+    _, version = cargar_datos_conflictos()
+    opciones = opciones_filtros(version)
 
     # Sidebar con filtros
     st.sidebar.header("Filtros - Conflictos")
 
-    fuentes_sel = st.sidebar.multiselect(
-        "Fuente", df['fuente'].unique().tolist(), default=df['fuente'].unique().tolist()
-    )
+    fuentes_sel = st.sidebar.multiselect("Fuente", opciones["fuentes"], default=opciones["fuentes"])
+    sector_sel = st.sidebar.selectbox("Sector económico", ['Todos'] + opciones["sectores"])
+    region_sel = st.sidebar.selectbox("Región", ['Todas'] + opciones["regiones"])
 
-    sectores = ['Todos'] + sorted([s for s in df['sector'].unique() if s and s != 'Sin dato'])
-    sector_sel = st.sidebar.selectbox("Sector económico", sectores)
+    # Gráficos de la vista sin filtros: una vez por versión de los datos
+    precalcular_graficos_conflictos(version)
 
-    regiones = ['Todas'] + sorted([r for r in df['region'].unique() if r and r != 'Sin dato' and r != ''])
-    region_sel = st.sidebar.selectbox("Región", regiones)
-
-    # Aplicar filtros
-    df_filtrado = df[df['fuente'].isin(fuentes_sel)]
-    if sector_sel != 'Todos':
-        df_filtrado = df_filtrado[df_filtrado['sector'] == sector_sel]
-    if region_sel != 'Todas':
-        df_filtrado = df_filtrado[df_filtrado['region'] == region_sel]
+    filtros = (version, tuple(fuentes_sel), sector_sel, region_sel)
+    agregados = agregados_conflictos(*filtros)
 
     # Métricas
     col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("Total", len(df_filtrado))
-    col2.metric("INDH", len(df_filtrado[df_filtrado['fuente'] == 'INDH']))
-    col3.metric("EJAtlas", len(df_filtrado[df_filtrado['fuente'] == 'EJAtlas']))
-    col4.metric("OCMAL", len(df_filtrado[df_filtrado['fuente'] == 'OCMAL']))
-    col5.metric("Activos", len(df_filtrado[df_filtrado['estado'] == 'Activo']))
-
-    # Sub-pestañas de conflictos
-    tab_stats, tab_temporal, tab_mapa, tab_datos, tab_busqueda = st.tabs([
+    col1.metric("Total", agregados["total"])
+    col2.metric("INDH", agregados["por_fuente"].get('INDH', 0))
+    col3.metric("EJAtlas", agregados["por_fuente"].get('EJAtlas', 0))
+    col4.metric("OCMAL", agregados["por_fuente"].get('OCMAL', 0))
+    col5.metric("Activos", agregados["activos"])
+
+    # Sub-vistas de conflictos: solo se ejecuta la seleccionada
+    vista = st.radio("Vista", [
         "📊 Estadísticas", "📈 Temporal", "🗺️ Mapa", "📋 Datos", "🔍 Búsqueda"
-    ])
-
-    with tab_stats:
-        col1, col2 = st.columns(2)
-
-        with col1:
-            # Por sector
-            df_sector = df_filtrado['sector'].value_counts().reset_index()
-            df_sector.columns = ['Sector', 'Cantidad']
-            df_sector = df_sector[df_sector['Sector'] != 'Sin dato'].head(10)
-
-            if len(df_sector) > 0:
-                fig = px.bar(df_sector, x='Cantidad', y='Sector', orientation='h',
-                            title='Por sector económico', text='Cantidad',
-                            color='Cantidad', color_continuous_scale='Viridis')
-                fig.update_layout(yaxis={'categoryorder': 'total ascending'}, showlegend=False)
-                fig.update_traces(textposition='outside')
-                st.plotly_chart(fig, use_container_width=True)
-
-        with col2:
-            # Por región
-            df_region = df_filtrado['region'].value_counts().reset_index()
-            df_region.columns = ['Región', 'Cantidad']
-            df_region = df_region[(df_region['Región'] != 'Sin dato') & (df_region['Región'] != '')].head(10)
-
-            if len(df_region) > 0:
-                fig = px.bar(df_region, x='Cantidad', y='Región', orientation='h',
-                            title='Top 10 regiones', text='Cantidad',
-                            color='Cantidad', color_continuous_scale='Blues')
-                fig.update_layout(yaxis={'categoryorder': 'total ascending'})
-                fig.update_traces(textposition='outside')
-                st.plotly_chart(fig, use_container_width=True)
-
-        col1, col2 = st.columns(2)
-
-        with col1:
-            # Por fuente
-            df_fuente = df_filtrado['fuente'].value_counts().reset_index()
-            df_fuente.columns = ['Fuente', 'Cantidad']
-            fig = px.bar(df_fuente, x='Cantidad', y='Fuente', orientation='h',
-                        title='Por fuente', text='Cantidad', color='Fuente',
-                        color_discrete_map={'INDH': '#1f77b4', 'EJAtlas': '#ff7f0e', 'OCMAL': '#2ca02c'})
-            fig.update_layout(yaxis={'categoryorder': 'total ascending'}, showlegend=False)
-            fig.update_traces(textposition='outside')
-            st.plotly_chart(fig, use_container_width=True)
-
-        with col2:
-            # Por estado
-            df_estado = df_filtrado[df_filtrado['estado'] != '']['estado'].value_counts().reset_index()
-            df_estado.columns = ['Estado', 'Cantidad']
-            if len(df_estado) > 0:
-                fig = px.bar(df_estado, x='Cantidad', y='Estado', orientation='h',
-                            title='Por estado', text='Cantidad', color='Estado',
-                            color_discrete_map={'Activo': '#E63946', 'Latente': '#F4A261',
-                                              'Cerrado': '#2A9D8F', 'Archivado': '#264653'})
-                fig.update_layout(yaxis={'categoryorder': 'total ascending'}, showlegend=False)
-                fig.update_traces(textposition='outside')
-                st.plotly_chart(fig, use_container_width=True)
-
-    with tab_temporal:
-        df_año = df_filtrado[df_filtrado['año_inicio'].notna()].copy()
-        df_año['año_inicio'] = df_año['año_inicio'].astype(int)
-
-        if len(df_año) > 0:
-            col1, col2 = st.columns(2)
-
-            with col1:
-                df_count = df_año.groupby('año_inicio').size().reset_index(name='Cantidad')
-                fig = px.bar(df_count, x='año_inicio', y='Cantidad',
-                            title='Conflictos por año de inicio')
-                st.plotly_chart(fig, use_container_width=True)
-
-            with col2:
-                df_count = df_count.sort_values('año_inicio')
-                df_count['Acumulado'] = df_count['Cantidad'].cumsum()
-                fig = px.area(df_count, x='año_inicio', y='Acumulado',
-                             title='Conflictos acumulados')
-                st.plotly_chart(fig, use_container_width=True)
-
-    with tab_mapa:
-        df_mapa = df_filtrado[(df_filtrado['latitud'].notna()) & (df_filtrado['longitud'].notna())]
-
-        if len(df_mapa) > 0:
-            fig = px.scatter_map(df_mapa, lat='latitud', lon='longitud',
-                                hover_name='nombre', hover_data=['sector', 'region', 'estado'],
-                                color='sector', zoom=3.5, height=600,
-                                title=f'{len(df_mapa)} conflictos georreferenciados')
-            fig.update_layout(map_style='carto-positron')
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No hay conflictos con coordenadas en la selección.")
-
-    with tab_datos:
-        cols = ['id_maestro', 'nombre', 'fuente_principal', 'region', 'sector',
-                'estado', 'año_inicio', 'impactos', 'resistencias', 'resultados']
-        cols_disp = [c for c in cols if c in df_filtrado.columns]
-        st.dataframe(df_filtrado[cols_disp], use_container_width=True, height=500)
-
-        csv = df_filtrado.to_csv(index=False, encoding='utf-8-sig')
-        st.download_button("📥 Descargar CSV", csv, "conflictos.csv", "text/csv")
+    ], horizontal=True, label_visibility="collapsed", key="vista_conflictos")
+
+    if vista == "📊 Estadísticas":
+        vista_estadisticas_conflictos(filtros, agregados)
+    elif vista == "📈 Temporal":
+        vista_temporal_conflictos(filtros)
+    elif vista == "🗺️ Mapa":
+        vista_mapa_conflictos(filtros)
+    elif vista == "📋 Datos":
+        vista_datos_conflictos(filtros)
+    else:
+        vista_busqueda_conflictos(filtrar_conflictos(*filtros))
+
+
+GRAFICOS_ESTADISTICAS = ["conflictos_sector", "conflictos_region", "conflictos_fuente", "conflictos_estado"]
+GRAFICOS_TEMPORAL = ["conflictos_por_año", "conflictos_acumulados", "conflictos_año_sector"]
+
+# Sectores con serie propia en el gráfico por año y sector (el resto va en "Otros")
+MAX_SECTORES_TEMPORAL = 6
+
+
+def figura_conflictos(id_grafico, agregados):
+    """Figura de un gráfico de la sección Conflictos a partir de los agregados (None si no hay datos)."""
+    if id_grafico == "conflictos_sector":
+        if not agregados["por_sector"]:
+            return None
+        fig = grafico_barras_h(agregados["por_sector"], 'Sector', 'Por sector económico',
+                               color='Cantidad', color_continuous_scale='Viridis')
+        fig.update_layout(showlegend=False)
+        return fig
+
+    if id_grafico == "conflictos_region":
+        if not agregados["por_region"]:
+            return None
+        return grafico_barras_h(agregados["por_region"], 'Región', 'Top 10 regiones',
+                                color='Cantidad', color_continuous_scale='Blues')
+
+    if id_grafico == "conflictos_fuente":
+        fig = grafico_barras_h(list(agregados["por_fuente"].items()), 'Fuente', 'Por fuente',
+                               color='Fuente', color_discrete_map=COLORES_FUENTE)
+        fig.update_layout(showlegend=False)
+        return fig
+
+    if id_grafico == "conflictos_estado":
+        if not agregados["por_estado"]:
+            return None
+        fig = grafico_barras_h(agregados["por_estado"], 'Estado', 'Por estado',
+                               color='Estado', color_discrete_map=COLORES_ESTADO)
+        fig.update_layout(showlegend=False)
+        return fig
+
+    raise KeyError(f"Gráfico desconocido: {id_grafico}")
+
+
+def figura_temporal_conflictos(id_grafico, cubo, fuentes, sector, region):
+    """Figura de la vista Temporal a partir del cubo temporal (None si no hay datos)."""
+    import pandas as pd
+    import plotly.express as px
+    from almacen_conflictos import SIN_DATO
+
+    corte = _filtros_facetas(fuentes, sector, region)
+
+    if id_grafico in ("conflictos_por_año", "conflictos_acumulados"):
+        por_año = cubo.serie('año', **corte)
+        if not por_año:
+            return None
+        df_count = pd.DataFrame(por_año, columns=['año_inicio', 'Cantidad'])
+        if id_grafico == "conflictos_por_año":
+            return px.bar(df_count, x='año_inicio', y='Cantidad',
+                          title='Conflictos por año de inicio')
+        df_count['Acumulado'] = df_count['Cantidad'].cumsum()
+        return px.area(df_count, x='año_inicio', y='Acumulado',
+                       title='Conflictos acumulados')
+
+    if id_grafico == "conflictos_año_sector":
+        # Drill-down del corte por sector: los principales y el resto como "Otros"
+        principales = [s for s, _ in cubo.desglosar('sector', limite=MAX_SECTORES_TEMPORAL, **corte)]
+        df_sector = cubo.agregar('año', 'sector', **corte)
+        df_sector = df_sector[df_sector['año'].notna() & (df_sector['sector'] != SIN_DATO)]
+        if not len(df_sector):
+            return None
+        df_sector = df_sector.assign(sector=df_sector['sector'].where(df_sector['sector'].isin(principales), 'Otros'))
+        df_sector = df_sector.groupby(['año', 'sector'], as_index=False)['conflictos'].sum()
+        return px.bar(df_sector, x='año', y='conflictos', color='sector',
+                      labels={'año': 'Año de inicio', 'conflictos': 'Conflictos', 'sector': 'Sector'},
+                      title='Conflictos por año de inicio y sector')
+
+    raise KeyError(f"Gráfico desconocido: {id_grafico}")
+
+
+@st.cache_resource(max_entries=2)
+def precalcular_graficos_conflictos(version):
+    """Figuras de las vistas Estadísticas y Temporal sin filtros (la portada), por versión de los datos."""
+    opciones = opciones_filtros(version)
+    filtros = (tuple(opciones["fuentes"]), 'Todos', 'Todas')
+    agregados = agregados_conflictos(version, *filtros)
+    cubo = cubo_temporal_conflictos(version)
+    graficos = [(id_grafico, filtros, version, figura_conflictos, (id_grafico, agregados))
+                for id_grafico in GRAFICOS_ESTADISTICAS]
+    graficos += [(id_grafico, filtros, version, figura_temporal_conflictos, (id_grafico, cubo, *filtros))
+                 for id_grafico in GRAFICOS_TEMPORAL]
+    return cache_graficos().precalcular(graficos)
+
+
+def vista_estadisticas_conflictos(filtros, agregados):
+    version, estado = filtros[0], filtros[1:]
+    for fila in (GRAFICOS_ESTADISTICAS[:2], GRAFICOS_ESTADISTICAS[2:]):
+        for col, id_grafico in zip(st.columns(2), fila):
+            with col:
+                mostrar_grafico(id_grafico, version, estado, figura_conflictos, id_grafico, agregados)
+
+
+def vista_temporal_conflictos(filtros):
+    version, estado = filtros[0], filtros[1:]
+    cubo = cubo_temporal_conflictos(version)
+    for col, id_grafico in zip(st.columns(2), GRAFICOS_TEMPORAL[:2]):
+        with col:
+            mostrar_grafico(id_grafico, version, estado, figura_temporal_conflictos, id_grafico, cubo, *estado)
+    mostrar_grafico(GRAFICOS_TEMPORAL[2], version, estado, figura_temporal_conflictos,
+                    GRAFICOS_TEMPORAL[2], cubo, *estado)
+
+
+@st.cache_resource(max_entries=2)
+def indice_mapa(version, version_causas):
+    """
+    Índice de clusters (scripts/servicio_mapa.py) con los conflictos georreferenciados
+    seguidos de las causas geocodificadas.
+
+    Returns:
+        (IndiceMapa, filas del DataFrame de cada conflicto del índice, causas)
+    """
+    from servicio_mapa import indice_conflictos_y_causas
+
+    df, _ = cargar_datos_conflictos()
+    return indice_conflictos_y_causas(df)
+
+
+def vista_mapa_conflictos(filtros):
+    import numpy as np
+    import pandas as pd
+    import plotly.express as px
+    from capas_mapa import GEOCODIFICACION_FILE, NIVELES_ZOOM, ZOOM_PUNTOS
+
+    col1, col2 = st.columns([1, 2])
+    incluir_causas = col1.checkbox("Incluir causas geocodificadas de los tribunales")
+    detalle = col2.select_slider("Nivel de detalle (zoom)", ["Automático"] + sorted(NIVELES_ZOOM) + [ZOOM_PUNTOS])
+
+    version_causas = GEOCODIFICACION_FILE.stat().st_mtime_ns if GEOCODIFICACION_FILE.exists() else 0
+    indice, filas, causas = indice_mapa(filtros[0], version_causas)
+    mascara_df = facetas_conflictos(filtros[0]).mascara(**_filtros_facetas(*filtros[1:]))
+    mascara = np.concatenate([mascara_df[filas], np.full(len(causas), incluir_causas)])
+
+    # Solo viajan al navegador los clusters (o puntos) de la selección
+    vista = indice.consultar(zoom=None if detalle == "Automático" else detalle, mascara=mascara)
+    if vista["total"] == 0:
+        st.info("No hay conflictos con coordenadas en la selección.")
+        return
 
-    with tab_busqueda:
-        busqueda = st.text_input("Buscar por nombre o descripción")
-        if busqueda:
-            mask = (df_filtrado['nombre'].str.contains(busqueda, case=False, na=False) |
-                   df_filtrado['descripcion'].str.contains(busqueda, case=False, na=False))
-            resultados = df_filtrado[mask]
-            st.write(f"**{len(resultados)} resultados**")
+    centro = {"lat": float(np.mean(vista["lat"])), "lon": float(np.mean(vista["lon"]))}
+
+    if vista["modo"] == "puntos":
+        df, _ = cargar_datos_conflictos()
+        posiciones = np.asarray(vista["posiciones"], dtype=int)
+        df_conflictos = df.iloc[filas[posiciones[posiciones < len(filas)]]]
+        registros = df_conflictos[['nombre', 'sector', 'region', 'estado', 'latitud', 'longitud']].astype(object)
+        registros = registros.to_dict('records')
+        for posicion in posiciones[posiciones >= len(filas)]:
+            causa = causas[posicion - len(filas)]
+            registros.append({'nombre': causa["id"], 'sector': f"Causa {causa.get('tribunal') or ''}".strip(),
+                              'region': causa.get('region'), 'estado': '',
+                              'latitud': causa["lat"], 'longitud': causa["lon"]})
+        df_mapa = pd.DataFrame(registros)
+        fig = px.scatter_map(df_mapa, lat='latitud', lon='longitud',
+                            hover_name='nombre', hover_data=['sector', 'region', 'estado'],
+                            color='sector', zoom=vista["zoom"], center=centro, height=600,
+                            title=f'{vista["total"]} puntos georreferenciados')
+    else:
+        df_mapa = pd.DataFrame({'lat': vista['lat'], 'lon': vista['lon'], 'Puntos': vista['n'],
+                                **{tipo.capitalize() + 's': conteos for tipo, conteos in vista['por_tipo'].items()}})
+        fig = px.scatter_map(df_mapa, lat='lat', lon='lon', size='Puntos', color='Puntos',
+                            hover_data=[c for c in df_mapa.columns if c not in ('lat', 'lon')],
+                            color_continuous_scale='Viridis', size_max=40,
+                            zoom=vista["zoom"], center=centro, height=600,
+                            title=f'{vista["total"]} puntos en {len(df_mapa)} grupos '
+                                  f'(celdas de {vista["tamano_celda"]}°)')
+
+    fig.update_layout(map_style='carto-positron')
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.cache_data(max_entries=16, show_spinner="Generando archivo...")
+def exportar_conflictos(version, fuentes, sector, region, formato):
+    """Archivo de descarga (bytes) de una combinación de filtros, generado solo al pedirlo."""
+    from datos_plataforma import exportar_dataframe
+
+    return exportar_dataframe(filtrar_conflictos(version, fuentes, sector, region), formato)
+
+
+def vista_datos_conflictos(filtros):
+    from datos_plataforma import FORMATOS_EXPORTACION
+
+    df, _ = cargar_datos_conflictos()
+    indices = facetas_conflictos(filtros[0]).indices(**_filtros_facetas(*filtros[1:]))
+    total = len(indices)
+
+    cols = ['id_maestro', 'nombre', 'fuente_principal', 'region', 'sector',
+            'estado', 'año_inicio', 'impactos', 'resistencias', 'resultados']
+    cols_disp = [c for c in cols if c in df.columns]
+
+    # Paginación: solo se envían al navegador las filas de la página visible
+    col1, col2, col3 = st.columns([1, 1, 3])
+    filas_pagina = col1.selectbox("Filas por página", [25, 50, 100, 250], index=1)
+    paginas = max(1, -(-total // filas_pagina))
+    pagina = col2.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1)
+    inicio = (pagina - 1) * filas_pagina
+    fin = min(inicio + filas_pagina, total)
+    col3.caption(f"Filas {inicio + 1 if total else 0}–{fin} de {total}")
+
+    st.dataframe(df.iloc[indices[inicio:fin]][cols_disp], use_container_width=True, hide_index=True)
+
+    # Exportación: el archivo se genera al pedirlo y queda en caché por filtros y formato
+    col1, col2 = st.columns([1, 3])
+    formato = col1.radio("Formato", list(FORMATOS_EXPORTACION), horizontal=True, label_visibility="collapsed")
+    clave = (filtros, formato)
+    if col2.button("📦 Preparar descarga"):
+        st.session_state["exportacion"] = clave
+    if st.session_state.get("exportacion") == clave:
+        try:
+            datos = exportar_conflictos(*filtros, formato)
+        except ImportError as e:
+            st.error(str(e))
+            return
+        mime, extension = FORMATOS_EXPORTACION[formato]
+        st.download_button(f"📥 Descargar {extension.upper()} ({len(datos) / 1024:.0f} KB)", datos,
+                           f"conflictos.{extension}", mime)
+
+
+@st.cache_data(max_entries=128)
+def buscar_en_indice(tabla, texto, version_indice, limite):
+    """Resultados del índice de búsqueda (scripts/indice_busqueda.py) para un texto."""
+    from indice_busqueda import buscar_conflictos, buscar_sentencias
+
+    buscador = buscar_conflictos if tabla == "conflictos" else buscar_sentencias
+    return buscador(texto, limite=limite)
+
+
+def vista_busqueda_conflictos(df_filtrado):
+    from indice_busqueda import INDICE_FILE
+
+    busqueda = st.text_input("Buscar por nombre o descripción (sin distinguir tildes ni mayúsculas)")
+    incluir_sentencias = st.checkbox("Buscar también en el texto de las sentencias")
+    if not busqueda:
+        return
 
-            for _, row in resultados.iterrows():
-                with st.expander(f"📍 {row['nombre']} ({row['fuente']})"):
-                    st.write(f"**Sector:** {row.get('sector', 'N/A')} | **Región:** {row.get('region', 'N/A')} | **Estado:** {row.get('estado', 'N/A')}")
-                    if row.get('descripcion'):
-                        st.write(str(row['descripcion'])[:500])
+    if not INDICE_FILE.exists():
+        st.caption("Índice de búsqueda no generado (python scripts/indice_busqueda.py): búsqueda simple.")
+        mask = (df_filtrado['nombre'].str.contains(busqueda, case=False, na=False, regex=False) |
+                df_filtrado['descripcion'].str.contains(busqueda, case=False, na=False, regex=False))
+        resultados = [(row, None) for _, row in df_filtrado[mask].iterrows()]
+    else:
+        version_indice = INDICE_FILE.stat().st_mtime_ns
+        encontrados = buscar_en_indice("conflictos", busqueda, version_indice, limite=500)
+        # El índice cubre todo el dataset: se respetan los filtros de la barra lateral
+        filas = df_filtrado.set_index('id_maestro', drop=False)
+        resultados = [(filas.loc[r['id_maestro']], r['fragmento'])
+                      for r in encontrados if r['id_maestro'] in filas.index]
+
+    st.write(f"**{len(resultados)} resultados**")
+    for row, fragmento in resultados[:100]:
+        with st.expander(f"📍 {row['nombre']} ({row['fuente']})"):
+            st.write(f"**Sector:** {row.get('sector', 'N/A')} | **Región:** {row.get('region', 'N/A')} | **Estado:** {row.get('estado', 'N/A')}")
+            if fragmento:
+                st.markdown(fragmento)
+            elif row.get('descripcion'):
+                st.write(str(row['descripcion'])[:500])
+
+    if incluir_sentencias and INDICE_FILE.exists():
+        sentencias = buscar_en_indice("sentencias", busqueda, INDICE_FILE.stat().st_mtime_ns, limite=20)
+        st.markdown(f"#### Sentencias ({len(sentencias)})")
+        for r in sentencias:
+            st.markdown(f"**{r['documento']}** {r['tribunal'] or ''}  \n{' '.join(r['fragmento'].split())}")
 
 
 # =============================================================================
 # SECCIÓN: TRIBUNALES AMBIENTALES
 # =============================================================================
+def etiqueta_tribunal(codigo):
+    from cubo_tribunales import NOMBRES_TRIBUNAL
+    return f"{codigo} ({NOMBRES_TRIBUNAL.get(codigo, codigo)})"
+
+
 def seccion_tribunales():
     """Muestra la sección de Tribunales Ambientales."""
+    from cubo_tribunales import CIFRAS_OFICIALES_FILE, CUBO_FILE, LISTADO_FILE
+
     st.header("⚖️ Tribunales Ambientales")
     st.markdown("""
     **Corpus de causas y sentencias de los Tribunales Ambientales de Chile (2012-2025).**
@@ -236,190 +522,260 @@ def seccion_tribunales():
     - **3TA** (Valdivia): La Araucanía a Magallanes
     """)
 
-    datos = cargar_datos_tribunales()
+    version_cubo = (_version_archivo(CUBO_FILE), _version_archivo(LISTADO_FILE))
+    version_oficiales = _version_archivo(CIFRAS_OFICIALES_FILE)
+    cubo = cargar_cubo_tribunales(version_cubo)
+    oficiales = cargar_cifras_oficiales(version_oficiales)
 
-    if not datos:
+    if cubo is None:
         st.warning("No se encontraron datos de tribunales.")
         return
 
-    # Sidebar con filtros de tribunales
+    # Gráficos de las vistas sin filtros: una vez por versión de los datos
+    precalcular_graficos_tribunales(version_cubo, version_oficiales)
+
+    # Sidebar con filtros de tribunales (valores tomados del cubo)
     st.sidebar.header("Filtros - Tribunales")
-    tribunal_filtro = st.sidebar.multiselect(
-        "Tribunal",
-        ["1TA (Antofagasta)", "2TA (Santiago)", "3TA (Valdivia)"],
-        default=["1TA (Antofagasta)", "2TA (Santiago)", "3TA (Valdivia)"]
+    tribunales = cubo.valores['tribunal']
+    tribunales_sel = st.sidebar.multiselect(
+        "Tribunal", tribunales, default=tribunales, format_func=etiqueta_tribunal
     )
 
-    años_disponibles = sorted([int(k) for k in datos['por_año'].keys() if int(k) >= 2013])
+    años_disponibles = años_tribunales(cubo)
+    if not años_disponibles:
+        st.info("El listado de tribunales no tiene documentos fechados desde 2013.")
+        return
     año_min, año_max = st.sidebar.select_slider(
         "Rango de años",
         options=años_disponibles,
         value=(min(años_disponibles), max(años_disponibles))
     )
+    años_sel = [a for a in años_disponibles if año_min <= a <= año_max]
 
-    # Calcular métricas de sentencias (solo documentos legales relevantes)
-    sentencias_total = datos['por_tipo'].get('Sentencia', 0)
-    sentencias_reemplazo = datos['por_tipo'].get('Sentencia Reemplazo', 0)
-    sentencias_casacion = datos['por_tipo'].get('Sentencia Casación', 0)
-    resoluciones = datos['por_tipo'].get('Resolución', 0)
-
-    total_docs_legales = sentencias_total + sentencias_reemplazo + sentencias_casacion + resoluciones
-
-    # Métricas principales (datos oficiales verificados - CIFRAS_OFICIALES.md)
+    # Métricas principales (cifras oficiales: datos/estadisticas/cifras_oficiales.json)
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Sentencias oficiales", "704")
-    col2.metric("Causas ingresadas", "~1,320")
-    col3.metric("Tribunales", "3")
-    col4.metric("Período", "2013-2025")
+    if oficiales:
+        filas = oficiales['tribunales']
+        aprox = "~" if any(t['aproximado'] for t in filas) else ""
+        col1.metric("Sentencias oficiales", f"{sum(t['sentencias'] for t in filas):,}")
+        col2.metric("Causas ingresadas", f"{aprox}{sum(t['causas'] for t in filas):,}")
+        col3.metric("Tribunales", len(filas))
+        col4.metric("Período", oficiales['periodo'])
+    else:
+        col1.metric("Documentos del corpus", f"{cubo.documentos():,}")
+        col2.metric("Causas del corpus", f"{cubo.causas():,}")
+        col3.metric("Tribunales", len(tribunales))
+        col4.metric("Período", f"{min(años_disponibles)}-{max(años_disponibles)}")
 
-    # Sub-pestañas de tribunales
-    tab_stats, tab_temporal, tab_tribunal = st.tabs([
+    # Sub-vistas de tribunales: solo se ejecuta la seleccionada
+    vista = st.radio("Vista", [
         "📊 Estadísticas", "📈 Evolución temporal", "🏛️ Por tribunal"
+    ], horizontal=True, label_visibility="collapsed", key="vista_tribunales")
+
+    if vista == "📊 Estadísticas":
+        if oficiales:
+            vista_estadisticas_tribunales(version_oficiales, oficiales)
+        else:
+            st.info("Sin cifras oficiales (datos/estadisticas/cifras_oficiales.json).")
+    elif vista == "📈 Evolución temporal":
+        vista_temporal_tribunales(version_cubo, cubo, tribunales_sel, años_sel)
+    else:
+        vista_por_tribunal(version_cubo, cubo)
+
+
+def años_tribunales(cubo):
+    """Años del filtro de tribunales (desde 2013, primer año completo de funcionamiento)."""
+    return [a for a in cubo.valores['año'] if a is not None and a >= 2013]
+
+
+GRAFICOS_OFICIALES = ["oficiales_sentencias", "oficiales_causas", "oficiales_porcentaje", "oficiales_promedio"]
+GRAFICOS_TEMPORAL_TRIBUNALES = ["tribunales_por_año", "tribunales_evolucion", "tribunales_procedimiento"]
+GRAFICOS_POR_TRIBUNAL = ["tribunal_tipos", "tribunal_procedimientos"]
+
+
+def figura_oficiales(id_grafico, oficiales):
+    """Figura de un gráfico de cifras oficiales por tribunal."""
+    import pandas as pd
+    import plotly.express as px
+
+    df_oficial = pd.DataFrame([
+        {'Tribunal': t['nombre'], 'Sentencias': t['sentencias'], 'Causas': t['causas'],
+         'Promedio': round(t['sentencias'] / t['años_actividad']) if t.get('años_actividad') else None}
+        for t in oficiales['tribunales']
     ])
+    aprox = "~" if any(t['aproximado'] for t in oficiales['tribunales']) else ""
+    periodo = oficiales['periodo']
 
-    with tab_stats:
-        # Datos oficiales verificados (CIFRAS_OFICIALES.md)
-        st.markdown("### Sentencias definitivas por tribunal")
-        st.caption("Fuentes: Cuentas Públicas 2024 y 3TA en Cifras")
-
-        # Datos oficiales verificados
-        df_oficial = pd.DataFrame([
-            {'Tribunal': '1TA (Antofagasta)', 'Sentencias': 66, 'Causas': 150},
-            {'Tribunal': '2TA (Santiago)', 'Sentencias': 332, 'Causas': 620},
-            {'Tribunal': '3TA (Valdivia)', 'Sentencias': 306, 'Causas': 549},
-        ])
-
-        col1, col2 = st.columns(2)
-
-        with col1:
-            fig = px.bar(df_oficial, x='Tribunal', y='Sentencias',
-                        title='704 sentencias definitivas (2013-2025)',
-                        text='Sentencias',
-                        color='Tribunal',
-                        color_discrete_sequence=['#1f77b4', '#ff7f0e', '#2ca02c'])
-            fig.update_layout(showlegend=False, xaxis_title='', yaxis_title='Sentencias')
-            fig.update_traces(textposition='outside')
-            st.plotly_chart(fig, use_container_width=True)
-
-        with col2:
-            fig = px.bar(df_oficial, x='Tribunal', y='Causas',
-                        title='~1,320 causas ingresadas (2013-2025)',
-                        text='Causas',
-                        color='Tribunal',
-                        color_discrete_sequence=['#1f77b4', '#ff7f0e', '#2ca02c'])
-            fig.update_layout(showlegend=False, xaxis_title='', yaxis_title='Causas')
-            fig.update_traces(textposition='outside')
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Distribución porcentual
-        st.markdown("### Distribución del sistema")
-        col1, col2 = st.columns(2)
-
-        with col1:
-            df_pct = df_oficial.copy()
-            df_pct['Porcentaje'] = (df_pct['Sentencias'] / df_pct['Sentencias'].sum() * 100).round(1)
-            df_pct = df_pct.sort_values('Sentencias', ascending=True)
-
-            fig = px.bar(df_pct, x='Sentencias', y='Tribunal', orientation='h',
-                        title='Sentencias por tribunal',
-                        text=df_pct.apply(lambda x: f"{x['Sentencias']} ({x['Porcentaje']}%)", axis=1),
-                        color='Tribunal',
-                        color_discrete_sequence=['#1f77b4', '#ff7f0e', '#2ca02c'])
-            fig.update_layout(showlegend=False, xaxis_title='Sentencias', yaxis_title='')
-            fig.update_traces(textposition='outside')
-            st.plotly_chart(fig, use_container_width=True)
-
-        with col2:
-            # Productividad anual
-            df_prod = pd.DataFrame([
-                {'Tribunal': '1TA (Antofagasta)', 'Promedio': 9, 'Años': 7},
-                {'Tribunal': '2TA (Santiago)', 'Promedio': 28, 'Años': 12},
-                {'Tribunal': '3TA (Valdivia)', 'Promedio': 26, 'Años': 12},
-            ])
-            fig = px.bar(df_prod, x='Tribunal', y='Promedio',
-                        title='Promedio sentencias/año',
-                        text='Promedio',
-                        color='Tribunal',
-                        color_discrete_sequence=['#1f77b4', '#ff7f0e', '#2ca02c'])
-            fig.update_layout(showlegend=False, xaxis_title='', yaxis_title='Sentencias/año')
-            fig.update_traces(textposition='outside')
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Nota sobre fuentes
-        st.info("""
-        **Fuentes oficiales:**
-        - 3TA: [3TA en Cifras](https://3ta.cl/3ta-en-cifras/) (actualizado 30/06/2025)
-        - 2TA: [Cuenta Pública 2024](https://tribunalambiental.cl/)
-        - 1TA: [Cuenta Pública 2024](https://www.1ta.cl/)
-        """)
-
-    with tab_temporal:
-        # Solo años con sentencias
-        st.markdown("### Sentencias dictadas por año")
-
-        # Calcular sentencias por año (aproximación desde datos disponibles)
-        df_año = pd.DataFrame([
-            {'Año': int(k), 'Documentos': v}
-            for k, v in datos['por_año'].items()
-            if int(k) >= 2013
-        ]).sort_values('Año')
-
-        fig = px.bar(df_año, x='Año', y='Documentos',
-                    title='Actividad judicial por año')
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Evolución por tribunal
-        st.markdown("### Evolución por tribunal")
-        datos_evol = []
-        for trib, años in datos['por_tribunal_año'].items():
-            for año, cant in años.items():
-                if cant > 0 and int(año) >= 2013:
-                    datos_evol.append({
-                        'Tribunal': f"{trib} ({'Antofagasta' if trib=='1TA' else 'Santiago' if trib=='2TA' else 'Valdivia'})",
-                        'Año': int(año),
-                        'Documentos': cant
-                    })
-
-        if datos_evol:
-            df_evol = pd.DataFrame(datos_evol).sort_values(['Tribunal', 'Año'])
-            fig = px.line(df_evol, x='Año', y='Documentos', color='Tribunal',
-                         markers=True, title='Actividad por tribunal y año')
-            st.plotly_chart(fig, use_container_width=True)
-
-    with tab_tribunal:
-        tribunal_sel = st.selectbox("Seleccionar tribunal",
-                                   ["1TA (Antofagasta)", "2TA (Santiago)", "3TA (Valdivia)"])
-        trib_code = tribunal_sel.split()[0]
-
-        col1, col2 = st.columns(2)
-
-        with col1:
-            st.metric("Total documentos", datos['por_tribunal'].get(trib_code, 0))
-            st.metric("Sentencias", datos['por_tribunal_tipo'].get(trib_code, {}).get('Sentencia', 0))
-
-        with col2:
-            # Competencia territorial
-            competencias = {
-                '1TA': "Arica y Parinacota, Tarapacá, Antofagasta, Atacama, Coquimbo",
-                '2TA': "Valparaíso, Metropolitana, O'Higgins, Maule, Ñuble, Biobío",
-                '3TA': "La Araucanía, Los Ríos, Los Lagos, Aysén, Magallanes"
-            }
-            st.info(f"**Competencia territorial:** {competencias[trib_code]}")
+    if id_grafico in ("oficiales_sentencias", "oficiales_causas"):
+        if id_grafico == "oficiales_sentencias":
+            campo, titulo = 'Sentencias', f"{df_oficial['Sentencias'].sum():,} sentencias definitivas"
+        else:
+            campo, titulo = 'Causas', f"{aprox}{df_oficial['Causas'].sum():,} causas ingresadas"
+        fig = px.bar(df_oficial, x='Tribunal', y=campo,
+                    title=f"{titulo} ({periodo})",
+                    text=campo,
+                    color='Tribunal',
+                    color_discrete_sequence=COLORES_TRIBUNAL)
+        fig.update_layout(showlegend=False, xaxis_title='', yaxis_title=campo)
+
+    elif id_grafico == "oficiales_porcentaje":
+        df_pct = df_oficial.copy()
+        df_pct['Porcentaje'] = (df_pct['Sentencias'] / df_pct['Sentencias'].sum() * 100).round(1)
+        df_pct = df_pct.sort_values('Sentencias', ascending=True)
+
+        fig = px.bar(df_pct, x='Sentencias', y='Tribunal', orientation='h',
+                    title='Sentencias por tribunal',
+                    text=df_pct.apply(lambda x: f"{x['Sentencias']} ({x['Porcentaje']}%)", axis=1),
+                    color='Tribunal',
+                    color_discrete_sequence=COLORES_TRIBUNAL)
+        fig.update_layout(showlegend=False, xaxis_title='Sentencias', yaxis_title='')
+
+    elif id_grafico == "oficiales_promedio":
+        # Productividad anual
+        fig = px.bar(df_oficial, x='Tribunal', y='Promedio',
+                    title='Promedio sentencias/año',
+                    text='Promedio',
+                    color='Tribunal',
+                    color_discrete_sequence=COLORES_TRIBUNAL)
+        fig.update_layout(showlegend=False, xaxis_title='', yaxis_title='Sentencias/año')
 
+    else:
+        raise KeyError(f"Gráfico desconocido: {id_grafico}")
+
+    fig.update_traces(textposition='outside')
+    return fig
+
+
+def figura_temporal_tribunales(id_grafico, cubo, tribunales_sel, años_sel):
+    """Figura de la evolución temporal de los tribunales (None si no hay datos)."""
+    import pandas as pd
+    import plotly.express as px
+
+    # Cada punto de las series es una celda precalculada del cubo
+    if id_grafico == "tribunales_por_año":
+        df_año = pd.DataFrame(
+            [(año, cubo.suma(tribunal=list(tribunales_sel), año=año)) for año in años_sel],
+            columns=['Año', 'Documentos']
+        )
+        return px.bar(df_año, x='Año', y='Documentos',
+                      title='Actividad judicial por año')
+
+    if id_grafico == "tribunales_evolucion":
+        evolucion = [(etiqueta_tribunal(t), año, n)
+                     for t in tribunales_sel
+                     for año, n in cubo.serie('año', valores=años_sel, tribunal=t)]
+        if not evolucion:
+            return None
+        df_evol = pd.DataFrame(evolucion, columns=['Tribunal', 'Año', 'Documentos'])
+        return px.line(df_evol, x='Año', y='Documentos', color='Tribunal',
+                       markers=True, title='Actividad por tribunal y año')
+
+    if id_grafico == "tribunales_procedimiento":
+        # Por procedimiento (letra del ROL)
+        procedimientos = [(año, p, cubo.suma('causas', tribunal=list(tribunales_sel), año=año, procedimiento=p))
+                          for año in años_sel for p in cubo.valores['procedimiento'] if p != 'Sin dato']
+        df_proc = pd.DataFrame([fila for fila in procedimientos if fila[2]],
+                               columns=['Año', 'Procedimiento', 'Causas'])
+        if not len(df_proc):
+            return None
+        return px.bar(df_proc, x='Año', y='Causas', color='Procedimiento',
+                      title='Causas (ROL distintos) por año y procedimiento')
+
+    raise KeyError(f"Gráfico desconocido: {id_grafico}")
+
+
+def figura_por_tribunal(id_grafico, cubo, tribunal_sel):
+    """Figura de la vista de un tribunal (None si no hay datos)."""
+    if id_grafico == "tribunal_tipos":
         # Tipos de documento del tribunal
-        tipos_trib = datos['por_tribunal_tipo'].get(trib_code, {})
-        tipos_legales = {k: v for k, v in tipos_trib.items()
-                        if k in ['Sentencia', 'Sentencia Reemplazo', 'Sentencia Casación', 'Resolución']}
-
-        if tipos_legales:
-            df_tipos = pd.DataFrame([
-                {'Tipo': k, 'Cantidad': v} for k, v in tipos_legales.items()
-            ]).sort_values('Cantidad', ascending=True)
-
-            fig = px.bar(df_tipos, x='Cantidad', y='Tipo', orientation='h',
-                        title=f'Documentos judiciales - {tribunal_sel}', text='Cantidad')
-            fig.update_traces(textposition='outside')
-            st.plotly_chart(fig, use_container_width=True)
+        tipos_legales = cubo.serie('tipo', tribunal=tribunal_sel,
+                                   valores=['Sentencia', 'Sentencia Reemplazo', 'Sentencia Casación', 'Resolución'])
+        if not tipos_legales:
+            return None
+        return grafico_barras_h(sorted(tipos_legales, key=lambda kv: kv[1]), 'Tipo',
+                                f'Documentos judiciales - {etiqueta_tribunal(tribunal_sel)}')
+
+    if id_grafico == "tribunal_procedimientos":
+        procedimientos = [(p, n) for p, n in cubo.serie('procedimiento', medida='causas', tribunal=tribunal_sel)
+                          if p != 'Sin dato']
+        if not procedimientos:
+            return None
+        return grafico_barras_h(procedimientos, 'Procedimiento', 'Causas por procedimiento')
+
+    raise KeyError(f"Gráfico desconocido: {id_grafico}")
+
+
+@st.cache_resource(max_entries=2)
+def precalcular_graficos_tribunales(version_cubo, version_oficiales):
+    """Figuras de las vistas de Tribunales con los filtros por defecto, por versión de los datos."""
+    cubo = cargar_cubo_tribunales(version_cubo)
+    oficiales = cargar_cifras_oficiales(version_oficiales)
+    tribunales = tuple(cubo.valores['tribunal'])
+    años = tuple(años_tribunales(cubo))
+
+    graficos = [(id_grafico, (tribunales, años), version_cubo, figura_temporal_tribunales,
+                 (id_grafico, cubo, tribunales, años)) for id_grafico in GRAFICOS_TEMPORAL_TRIBUNALES]
+    if tribunales:
+        graficos += [(id_grafico, (tribunales[0],), version_cubo, figura_por_tribunal,
+                      (id_grafico, cubo, tribunales[0])) for id_grafico in GRAFICOS_POR_TRIBUNAL]
+    if oficiales:
+        graficos += [(id_grafico, (), version_oficiales, figura_oficiales, (id_grafico, oficiales))
+                     for id_grafico in GRAFICOS_OFICIALES]
+    return cache_graficos().precalcular(graficos)
+
+
+def vista_estadisticas_tribunales(version, oficiales):
+    st.markdown("### Sentencias definitivas por tribunal")
+    fuentes = sorted({t['fuente'].split(' (')[0] for t in oficiales['tribunales']})
+    st.caption(f"Fuentes: {' y '.join(fuentes)}")
+
+    for col, id_grafico in zip(st.columns(2), GRAFICOS_OFICIALES[:2]):
+        with col:
+            mostrar_grafico(id_grafico, version, (), figura_oficiales, id_grafico, oficiales)
+
+    # Distribución porcentual
+    st.markdown("### Distribución del sistema")
+    for col, id_grafico in zip(st.columns(2), GRAFICOS_OFICIALES[2:]):
+        with col:
+            mostrar_grafico(id_grafico, version, (), figura_oficiales, id_grafico, oficiales)
+
+    # Nota sobre fuentes
+    st.info("**Fuentes oficiales:**\n" + "\n".join(
+        f"- {t['codigo']}: [{t['fuente']}]({t['url']})" for t in oficiales['tribunales']
+    ))
+
+
+def vista_temporal_tribunales(version, cubo, tribunales_sel, años_sel):
+    filtros = (tuple(tribunales_sel), tuple(años_sel))
+    titulos = ["### Documentos por año", "### Evolución por tribunal", "### Causas por procedimiento"]
+    for titulo, id_grafico in zip(titulos, GRAFICOS_TEMPORAL_TRIBUNALES):
+        st.markdown(titulo)
+        mostrar_grafico(id_grafico, version, filtros, figura_temporal_tribunales, id_grafico, cubo, *filtros)
+
+
+def vista_por_tribunal(version, cubo):
+    tribunal_sel = st.selectbox("Seleccionar tribunal", cubo.valores['tribunal'], format_func=etiqueta_tribunal)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.metric("Total documentos", cubo.documentos(tribunal=tribunal_sel))
+        st.metric("Sentencias", cubo.documentos(tribunal=tribunal_sel, tipo='Sentencia'))
+        st.metric("Causas (ROL distintos)", cubo.causas(tribunal=tribunal_sel))
+
+    with col2:
+        # Competencia territorial
+        competencias = {
+            '1TA': "Arica y Parinacota, Tarapacá, Antofagasta, Atacama, Coquimbo",
+            '2TA': "Valparaíso, Metropolitana, O'Higgins, Maule, Ñuble, Biobío",
+            '3TA': "La Araucanía, Los Ríos, Los Lagos, Aysén, Magallanes"
+        }
+        if tribunal_sel in competencias:
+            st.info(f"**Competencia territorial:** {competencias[tribunal_sel]}")
+
+    for col, id_grafico in zip(st.columns(2), GRAFICOS_POR_TRIBUNAL):
+        with col:
+            mostrar_grafico(id_grafico, version, (tribunal_sel,), figura_por_tribunal, id_grafico, cubo, tribunal_sel)
 
 
 # =============================================================================
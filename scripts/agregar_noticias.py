@@ -1,430 +1,112 @@
 #!/usr/bin/env python3
 """
 Agrega URLs de noticias y actualiza categorías para conflictos sin datos.
+
+Las tablas curadas de noticias están en datos/conflictos/noticias_conflictos.json.
 """
 
 import sys
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
 import json
+import unicodedata
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent))
+
+from almacen_conflictos import guardar_parquet, ruta_parquet
+from automata_patrones import AhoCorasick
+
 BASE_DIR = Path(__file__).parent.parent
 DATOS_DIR = BASE_DIR / "datos" / "conflictos"
 
-# Mapeo de conflictos a noticias y categorías basado en búsqueda web
-NOTICIAS_CONFLICTOS = {
-    # EJAtlas sin categorías
-    "Mina de oro, cobre y plata Pascua Lama, Chile": {
-        "url_noticia": "https://www.ciperchile.cl/2020/11/15/pascua-lama-mientras-se-juega-su-ultima-carta-en-la-corte-suprema-el-sii-le-autoriza-credito-por-us443-millones/",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena", "agricultor"],
-        "resistencias": ["judicial", "movilizacion"],
-        "resultados": ["paralizado"]
-    },
-    "Ventanas Industrial Complex, Chile": {
-        "url_noticia": "https://www.greenpeace.org/chile/blog/issues/climayenergia/celebramos-el-cierre-de-la-fundicion-ventanas-una-de-las-principales-fuentes-de-contaminacion-de-nuestra-historia/",
-        "impactos": ["aire", "salud", "suelo"],
-        "actores": ["urbano"],
-        "resistencias": ["judicial", "movilizacion", "mediatica"],
-        "resultados": ["paralizado"]
-    },
-    "ALTO MAIPO Hydroelectric Project (PHAM), Chile": {
-        "url_noticia": "https://aida-americas.org/es/blog/proyecto-alto-maipo-peligroso-innecesario-y-encima-inviable",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["urbano", "agricultor"],
-        "resistencias": ["judicial", "institucional", "movilizacion"],
-        "resultados": ["en_litigio"]
-    },
-    "Hidroaysén hydroelectric project, Chile": {
-        "url_noticia": "https://www.ciperchile.cl/2013/07/08/el-verdadero-impacto-de-hidroaysen-frente-al-deficit-energetico-en-chile/",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["urbano", "indigena"],
-        "resistencias": ["judicial", "movilizacion", "mediatica", "institucional"],
-        "resultados": ["paralizado"]
-    },
-    "Proyecto Minera Dominga, Coquimbo, Chile": {
-        "url_noticia": "https://www.ciperchile.cl/2024/12/18/conservacion-desarrollo-y-conflicto-el-eterno-debate-de-la-minera-dominga/",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["pescador", "urbano"],
-        "resistencias": ["judicial", "institucional", "movilizacion"],
-        "resultados": ["en_litigio"]
-    },
-    "Lithium mining in the Salar de Atacama, Chile": {
-        "url_noticia": "https://es.mongabay.com/2024/11/comunidades-indigenas-interponen-denuncia-por-hundimiento-de-salar-de-atacama-por-litio-chile/",
-        "impactos": ["agua", "biodiversidad", "suelo"],
-        "actores": ["indigena"],
-        "resistencias": ["judicial", "institucional"],
-        "resultados": ["aprobado"]
-    },
-    "Ralco HEP and Bio Bio Watershed hydro plans, Chile": {
-        "url_noticia": "https://www.memoriachilena.gob.cl/602/w3-article-96731.html",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena"],
-        "resistencias": ["judicial", "movilizacion", "institucional"],
-        "resultados": ["aprobado"]
-    },
-    "Cellulose Factory Celulosa Aurauco S.A., Valdivia, Chile": {
-        "url_noticia": "https://www.ciperchile.cl/2023/06/16/contaminacion-fluvial-en-valdivia/",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["pescador", "urbano"],
-        "resistencias": ["judicial", "mediatica"],
-        "resultados": ["aprobado"]
-    },
-    "Minera Invierno de carbón en Isla Riesco, Chile": {
-        "url_noticia": "https://laderasur.com/articulo/isla-riesco-y-minera-invierno-todo-lo-que-necesitas-saber-para-comprender-el-conflicto/",
-        "impactos": ["aire", "biodiversidad", "suelo"],
-        "actores": ["urbano"],
-        "resistencias": ["judicial", "movilizacion", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "The avocado agribusiness and the water crisis in Petorca, Va": {
-        "url_noticia": "https://www.france24.com/es/medio-ambiente/20210616-chile-escasez-agua-petorca-cultivos-aguacate",
-        "impactos": ["agua"],
-        "actores": ["agricultor", "urbano"],
-        "resistencias": ["movilizacion", "mediatica"],
-        "resultados": ["aprobado"]
-    },
-    "Las Vizcachitas Mining Project, Chile": {
-        "url_noticia": "https://vergara240.udp.cl/especiales/sequia-en-chile-vizcachitas-megaproyecto-minero-putaendo/",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["agricultor", "urbano"],
-        "resistencias": ["judicial", "movilizacion", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Fundicion de cobre Paipote (Videla Lira), Chile": {
-        "url_noticia": "https://www.ciperchile.cl/2011/08/11/contaminacion-critica-en-tierra-amarilla-por-un-negocio-minero-en-plena-expansion/",
-        "impactos": ["aire", "salud", "suelo"],
-        "actores": ["urbano"],
-        "resistencias": ["judicial", "movilizacion"],
-        "resultados": ["paralizado"]
-    },
-    "Castilla Thermal Power Station, Chile": {
-        "url_noticia": "https://www.elmostrador.cl/noticias/pais/2012/08/29/corte-suprema-falla-contra-castilla-y-marca-efecto-domino-en-otros-proyectos-emblematicos/",
-        "impactos": ["aire", "biodiversidad", "salud"],
-        "actores": ["pescador", "urbano"],
-        "resistencias": ["judicial", "movilizacion"],
-        "resultados": ["paralizado"]
-    },
-    "Green Hydrogen in the Magallanes Region, Chile": {
-        "url_noticia": "https://dialogue.earth/es/energia/chile-apuesta-hidrogeno-verde-magallanes/",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["urbano"],
-        "resistencias": ["institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Refiner-a y fundici-n ENAMI-CODELCO en Zona de Sacrificio Ve": {
-        "url_noticia": "https://www.greenpeace.org/chile/blog/issues/climayenergia/celebramos-el-cierre-de-la-fundicion-ventanas-una-de-las-principales-fuentes-de-contaminacion-de-nuestra-historia/",
-        "impactos": ["aire", "salud"],
-        "actores": ["urbano"],
-        "resistencias": ["judicial", "movilizacion"],
-        "resultados": ["paralizado"]
-    },
-    "Lithium and iron mining in the dunes of Putu, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/lithium-and-iron-mining-in-the-dunes-of-putu-chile",
-        "impactos": ["agua", "biodiversidad", "suelo"],
-        "actores": ["agricultor", "urbano"],
-        "resistencias": ["movilizacion", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Lithium mining and potassium Salar Maricunga, Copiap-": {
-        "url_noticia": "https://ejatlas.org/conflict/lithium-mining-and-potassium-salar-maricunga-copiapo-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena"],
-        "resistencias": ["judicial", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Health impacts of pesticides exposure on rural populations i": {
-        "url_noticia": "https://ejatlas.org/conflict/health-impacts-of-pesticides-exposure-on-rural-populations-in-ohiggins-chile",
-        "impactos": ["salud", "agua", "suelo"],
-        "actores": ["agricultor"],
-        "resistencias": ["mediatica"],
-        "resultados": ["aprobado"]
-    },
-    "Living with pesticides from export crops in Monte Patria, Co": {
-        "url_noticia": "https://ejatlas.org/conflict/living-with-pesticides-from-export-crops-in-monte-patria-coquimbo-chile",
-        "impactos": ["salud", "agua"],
-        "actores": ["agricultor", "urbano"],
-        "resistencias": ["mediatica"],
-        "resultados": ["aprobado"]
-    },
-    "Environmental threats (industrial salmon, new mining concess": {
-        "url_noticia": "https://ejatlas.org/conflict/environmental-threats-industrial-salmon-new-mining-concessions-in-the-southern-austral-patagonia-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena", "pescador"],
-        "resistencias": ["movilizacion", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Geothermal plant Cerro Pabellón, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/geothermal-plant-cerro-pabellon-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena"],
-        "resistencias": ["institucional"],
-        "resultados": ["aprobado"]
-    },
-    "Small-scale fisher people against contaminating industries i": {
-        "url_noticia": "https://ejatlas.org/conflict/small-scale-fisher-people-against-contaminating-industries-in-mehuin-valdivia-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["pescador", "indigena"],
-        "resistencias": ["movilizacion", "judicial"],
-        "resultados": ["paralizado"]
-    },
-    "Yelcho Watershed targeted by Ministry of Energy-s hydro plan": {
-        "url_noticia": "https://ejatlas.org/conflict/yelcho-watershed-targeted-by-ministry-of-energys-hydro-plans-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["urbano", "pescador"],
-        "resistencias": ["movilizacion", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Mediterraneo Hydroelectric plant and future exploitation pla": {
-        "url_noticia": "https://ejatlas.org/conflict/mediterraneo-hydroelectric-plant-and-future-exploitation-plans-for-pascua-and-baker-rivers-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["urbano"],
-        "resistencias": ["movilizacion"],
-        "resultados": ["en_litigio"]
-    },
-    "Proyecto Nueva Unión en Vallenar, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/nueva-union-copper-gold-mine-proyecto-minero-nueva-union-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena", "agricultor"],
-        "resistencias": ["institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Minería de Tierras Raras en Penco, Región del Biob": {
-        "url_noticia": "https://ejatlas.org/conflict/mineria-de-tierras-raras-en-penco-region-del-biobio-chile",
-        "impactos": ["agua", "suelo"],
-        "actores": ["urbano"],
-        "resistencias": ["movilizacion", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Data Center Google en Cerrillos, Santiago, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/data-center-google-en-cerrillos-santiago-chile",
-        "impactos": ["agua"],
-        "actores": ["urbano"],
-        "resistencias": ["institucional"],
-        "resultados": ["aprobado"]
-    },
-    "Puerto Corral Pacífico Sur, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/puerto-corral-pacifico-sur-chile",
-        "impactos": ["biodiversidad", "agua"],
-        "actores": ["pescador", "urbano"],
-        "resistencias": ["movilizacion", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Proyecto inmobiliario 'Maratué', Valparaíso, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/proyecto-inmobiliario-maratue-valparaiso-chile",
-        "impactos": ["biodiversidad"],
-        "actores": ["urbano"],
-        "resistencias": ["movilizacion", "judicial"],
-        "resultados": ["en_litigio"]
-    },
-    "Lago Lleu Lleu, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/lago-lleu-lleu-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena"],
-        "resistencias": ["movilizacion"],
-        "resultados": ["en_litigio"]
-    },
-    "Conflicto internacional sobre el Rio Lauca, Bolivia": {
-        "url_noticia": "https://ejatlas.org/conflict/conflicto-internacional-sobre-el-rio-lauca-bolivia-chile",
-        "impactos": ["agua"],
-        "actores": ["indigena", "agricultor"],
-        "resistencias": ["institucional"],
-        "resultados": ["aprobado"]
-    },
-    "Planta de Tratamiento de lodos Cabrero": {
-        "url_noticia": "https://mapaconflictos.indh.cl/",
-        "impactos": ["suelo", "agua"],
-        "actores": ["urbano"],
-        "resistencias": ["institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Cobquecura sin acu": {
-        "url_noticia": "https://mapaconflictos.indh.cl/",
-        "impactos": ["biodiversidad", "agua"],
-        "actores": ["pescador"],
-        "resistencias": ["movilizacion"],
-        "resultados": ["en_litigio"]
-    },
-    "Minera Manganese Atacama, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/minera-manganese-atacama-chile",
-        "impactos": ["agua", "suelo"],
-        "actores": ["agricultor"],
-        "resistencias": ["institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Exploitation of Manganese Los Pumas, Arica, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/exploitation-of-manganese-los-pumas-arica-chile",
-        "impactos": ["agua", "suelo"],
-        "actores": ["indigena"],
-        "resistencias": ["institucional"],
-        "resultados": ["en_litigio"]
-    },
-}
-
-# Noticias adicionales encontradas
-NOTICIAS_ADICIONALES = {
-    "Minera Los Pelambres, Los Vilos, Coquimbo, Chile": {
-        "url_noticia": "https://www.ciperchile.cl/2011/08/11/contaminacion-critica-en-tierra-amarilla-por-un-negocio-minero-en-plena-expansion/",
-        "impactos": ["agua", "suelo"],
-        "actores": ["agricultor", "urbano"],
-        "resistencias": ["judicial", "movilizacion"],
-        "resultados": ["aprobado"]
-    },
-    "Minera El Morro en Valles del Huasco, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/el-morro-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena"],
-        "resistencias": ["judicial"],
-        "resultados": ["paralizado"]
-    },
-    "Caserones, Chile": {
-        "url_noticia": "https://mapa.conflictosmineros.net/ocmal_db-v2/conflicto/view/117",
-        "impactos": ["agua"],
-        "actores": ["agricultor", "urbano"],
-        "resistencias": ["institucional"],
-        "resultados": ["aprobado"]
-    },
-    "Conflicto del Plomo Boliden, Cerro Chuño en Arica,": {
-        "url_noticia": "https://ejatlas.org/conflict/contaminacion-plomo-arica",
-        "impactos": ["suelo", "salud"],
-        "actores": ["urbano"],
-        "resistencias": ["judicial", "movilizacion"],
-        "resultados": ["aprobado"]
-    },
-    "Embalse La Punilla, Ñuble, Chile": {
-        "url_noticia": "https://www.ciperchile.cl/2023/07/20/la-riesgosa-insistencia-en-el-embalse-nueva-la-punilla/",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["agricultor", "urbano"],
-        "resistencias": ["movilizacion", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Proyecto Expansión Andina 244 CODELCO, Chile": {
-        "url_noticia": "https://olca.cl/articulo/nota.php?id=2574",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["urbano", "indigena"],
-        "resistencias": ["institucional", "movilizacion"],
-        "resultados": ["en_litigio"]
-    },
-    "Contaminación por asbesto en empresa Pizarreño, Ch": {
-        "url_noticia": "https://ejatlas.org/conflict/cientos-de-enfermos-por-inhalar-asbesto",
-        "impactos": ["salud", "aire"],
-        "actores": ["urbano"],
-        "resistencias": ["judicial"],
-        "resultados": ["aprobado"]
-    },
-    "Neltume hydroelectric project in Panguipulli, Chil": {
-        "url_noticia": "https://ejatlas.org/conflict/neltume-hydroelectric-project-in-panguipulli-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena"],
-        "resistencias": ["movilizacion", "judicial"],
-        "resultados": ["paralizado"]
-    },
-    "Hidroñuble Hydroelectric dam, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/hidronuble-hydroelectric-dam-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["agricultor"],
-        "resistencias": ["institucional"],
-        "resultados": ["aprobado"]
-    },
-    "Embalse La Tranca, Valle de Cogotí, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/embalse-la-tranca-valle-de-cogoti-chile",
-        "impactos": ["agua"],
-        "actores": ["agricultor"],
-        "resistencias": ["institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Contaminación masiva de la Cuenca del Lago Villarr": {
-        "url_noticia": "https://ejatlas.org/conflict/contaminacion-masiva-de-la-cuenca-del-lago-villarrica-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena", "urbano"],
-        "resistencias": ["movilizacion", "judicial"],
-        "resultados": ["en_litigio"]
-    },
-    "Osorno water crisis and anti-privatization struggl": {
-        "url_noticia": "https://ejatlas.org/conflict/osorno-water-crisis-and-anti-privatization-struggles-chile",
-        "impactos": ["agua"],
-        "actores": ["urbano"],
-        "resistencias": ["movilizacion"],
-        "resultados": ["en_litigio"]
-    },
-    "White Quebrada White and Quebrada Phase 2 in Tarap": {
-        "url_noticia": "https://ejatlas.org/conflict/quebrada-blanca-and-quebrada-phase-2-in-tarapaca-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena"],
-        "resistencias": ["institucional"],
-        "resultados": ["aprobado"]
-    },
-    "'Tranquilo' coal mining project, Chile": {
-        "url_noticia": "https://ejatlas.org/conflict/tranquilo-coal-mining-project-chile",
-        "impactos": ["aire", "biodiversidad"],
-        "actores": ["urbano"],
-        "resistencias": ["movilizacion"],
-        "resultados": ["en_litigio"]
-    },
-    "Yelcho Watershed targeted by Ministry of Energy": {
-        "url_noticia": "https://ejatlas.org/conflict/yelcho-watershed-targeted-by-ministry-of-energys-hydro-plans-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["pescador", "urbano"],
-        "resistencias": ["movilizacion", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Lithium mining and potassium Salar Maricunga": {
-        "url_noticia": "https://ejatlas.org/conflict/lithium-mining-and-potassium-salar-maricunga-copiapo-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["indigena"],
-        "resistencias": ["judicial", "institucional"],
-        "resultados": ["en_litigio"]
-    },
-    "Refiner": {
-        "url_noticia": "https://www.greenpeace.org/chile/blog/issues/climayenergia/celebramos-el-cierre-de-la-fundicion-ventanas-una-de-las-principales-fuentes-de-contaminacion-de-nuestra-historia/",
-        "impactos": ["aire", "salud"],
-        "actores": ["urbano"],
-        "resistencias": ["judicial", "movilizacion"],
-        "resultados": ["paralizado"]
-    },
-    "Rio Cuervo Hydroelectric Project": {
-        "url_noticia": "https://ejatlas.org/conflict/rio-cuervo-hydroelectric-project-aysen-chile",
-        "impactos": ["agua", "biodiversidad"],
-        "actores": ["urbano"],
-        "resistencias": ["movilizacion", "judicial"],
-        "resultados": ["paralizado"]
-    },
-    "Monoculture plantation in Araucania": {
-        "url_noticia": "https://ejatlas.org/conflict/monoculture-plantation-in-araucania-chile",
-        "impactos": ["agua", "biodiversidad", "suelo"],
-        "actores": ["indigena"],
-        "resistencias": ["movilizacion"],
-        "resultados": ["aprobado"]
-    },
-    "Huasco - Petcoke": {
-        "url_noticia": "https://ejatlas.org/conflict/huasco-petcoke-chile",
-        "impactos": ["aire", "salud"],
-        "actores": ["urbano", "agricultor"],
-        "resistencias": ["judicial", "movilizacion"],
-        "resultados": ["aprobado"]
-    },
-}
-
-# Agregar URLs para conflictos OCMAL (minería)
-OCMAL_NOTICIAS = {
-    "Valle del Lluta and Canal Uchusuma": {
-        "url_noticia": "https://mapa.conflictosmineros.net/ocmal_db-v2/",
-        "impactos": ["agua"],
-        "actores": ["indigena", "agricultor"],
-    },
-    "Carmen de Andacollo Expansion": {
-        "url_noticia": "https://mapa.conflictosmineros.net/ocmal_db-v2/",
-        "impactos": ["agua", "salud", "aire"],
-        "actores": ["urbano"],
-    },
-    "Manganeso Los Pumas": {
-        "url_noticia": "https://mapa.conflictosmineros.net/ocmal_db-v2/",
-        "impactos": ["agua", "suelo"],
-        "actores": ["indigena"],
-    },
-}
-
+NOTICIAS_FILE = DATOS_DIR / "noticias_conflictos.json"
+
+
+def normalizar_clave(texto):
+    """Normaliza un nombre para comparación: minúsculas, sin tildes y espacios simples."""
+    texto = unicodedata.normalize('NFKD', texto or "").encode('ASCII', 'ignore').decode('ASCII')
+    return " ".join(texto.lower().split())
+
+
+def cargar_tablas_noticias():
+    """
+    Carga las tablas curadas de noticias y categorías.
+
+    Returns:
+        Tupla (noticias_conflictos, noticias_adicionales, ocmal_noticias),
+        cada una {nombre_conflicto: {"url_noticia", "impactos", ...}}
+    """
+    with open(NOTICIAS_FILE, encoding="utf-8") as f:
+        tablas = json.load(f)
+    return (
+        tablas.get("noticias_conflictos", {}),
+        tablas.get("noticias_adicionales", {}),
+        tablas.get("ocmal_noticias", {}),
+    )
+
+
+class IndiceNoticias:
+    """
+    Índice de una tabla de noticias para emparejar nombres de conflictos.
+
+    Primero busca el nombre normalizado exacto en un diccionario; si no hay,
+    busca contención con un autómata Aho-Corasick sobre las claves (clave
+    contenida en el nombre) y, si es bidireccional, sobre los nombres del lote
+    (nombre contenido en la clave). Entre varias claves candidatas gana la
+    primera en el orden de la tabla.
+    """
+
+    def __init__(self, tabla, bidireccional=True):
+        self.valores = list(tabla.values())
+        self.claves = [normalizar_clave(k) for k in tabla]
+        self.bidireccional = bidireccional
+
+        self.exactos = {}
+        self.automata = AhoCorasick()
+        for orden, clave in enumerate(self.claves):
+            self.exactos.setdefault(clave, orden)
+            self.automata.agregar(clave, orden)
+        self.automata.construir()
+
+    def emparejar(self, nombres):
+        """
+        Empareja un lote de nombres contra la tabla.
+
+        Returns:
+            Lista paralela a `nombres` con la info de noticia o None.
+        """
+        normalizados = [normalizar_clave(n) for n in nombres]
+        candidatos = [None] * len(nombres)
+
+        # Nombre contenido en alguna clave: un autómata sobre los nombres del lote
+        if self.bidireccional:
+            automata_nombres = AhoCorasick()
+            for idx, nombre in enumerate(normalizados):
+                automata_nombres.agregar(nombre, idx)
+            automata_nombres.construir()
+            for orden, clave in enumerate(self.claves):
+                for _, _, idx in automata_nombres.buscar(clave):
+                    if candidatos[idx] is None or orden < candidatos[idx]:
+                        candidatos[idx] = orden
+
+        resultado = []
+        for idx, nombre in enumerate(normalizados):
+            if not nombre:
+                resultado.append(None)
+                continue
+
+            orden = self.exactos.get(nombre)
+            if orden is None:
+                # Clave contenida en el nombre
+                orden = candidatos[idx]
+                for _, _, o in self.automata.buscar(nombre):
+                    if orden is None or o < orden:
+                        orden = o
+
+            resultado.append(self.valores[orden] if orden is not None else None)
+
+        return resultado
 
 def main():
     print("=" * 60)
@@ -446,29 +128,22 @@ def main():
     actualizados = 0
     noticias_agregadas = 0
 
-    for registro in dataset:
-        nombre = registro.get("nombre", "")
+    # Emparejar todo el lote contra cada tabla (en orden de prioridad)
+    noticias_conflictos, noticias_adicionales, ocmal_noticias = cargar_tablas_noticias()
+    nombres = [r.get("nombre", "") or "" for r in dataset]
+    match_conflictos = IndiceNoticias(noticias_conflictos).emparejar(nombres)
+    match_adicionales = IndiceNoticias(noticias_adicionales).emparejar(nombres)
+    match_ocmal = IndiceNoticias(ocmal_noticias, bidireccional=False).emparejar(nombres)
 
-        # Buscar coincidencia en el mapeo
-        info = None
-        for key, value in NOTICIAS_CONFLICTOS.items():
-            if key in nombre or nombre in key:
-                info = value
-                break
+    for i, registro in enumerate(dataset):
+        nombre = nombres[i]
 
-        # Si no encontramos, buscar en noticias adicionales
-        if not info:
-            for key, value in NOTICIAS_ADICIONALES.items():
-                if key in nombre or nombre in key:
-                    info = value
-                    break
+        # Buscar en el mapeo principal, luego en noticias adicionales
+        info = match_conflictos[i] or match_adicionales[i]
 
         # Si no encontramos, buscar en OCMAL
         if not info and registro.get("fuente_principal") == "OCMAL":
-            for key, value in OCMAL_NOTICIAS.items():
-                if key.lower() in nombre.lower():
-                    info = value
-                    break
+            info = match_ocmal[i]
 
         if info:
             # Agregar URL de noticia
@@ -521,6 +196,8 @@ def main():
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(dataset, f, ensure_ascii=False, indent=2)
     print(f"\nGuardado: {output_file}")
+    if guardar_parquet(dataset, ruta_parquet("noticias")):
+        print(f"Parquet: {ruta_parquet('noticias')}")
 
     # Mostrar cobertura final
     def cobertura(campo):
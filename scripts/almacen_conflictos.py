@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Almacenamiento columnar (Parquet) del dataset consolidado de conflictos.
+
+Los scripts de consolidación escriben, junto a cada JSON, una versión Parquet
+con tipos explícitos:
+- Categóricas: fuente_principal, region, sector, estado (vacíos y nulos = SIN_DATO)
+- Enteros nulables: id_indh, id_ejatlas, id_ocmal, año_inicio
+- Listas de texto: impactos, actores, resistencias, resultados
+
+Los consumidores leen solo las columnas que necesitan con cargar_conflictos().
+Si el Parquet no existe, está desactualizado o falta pyarrow, se cae al JSON.
+
+Para convertir los JSON existentes sin re-ejecutar la consolidación:
+    python almacen_conflictos.py
+
+Requiere: pandas, pyarrow
+"""
+
+import json
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+DATOS_DIR = BASE_DIR / "datos" / "conflictos"
+
+# Versiones del dataset consolidado: nombre -> archivo base (sin extensión)
+VERSIONES = {
+    "ids": "conflictos_consolidados_ids",
+    "completo": "conflictos_consolidados_completo",
+    "noticias": "conflictos_consolidados_noticias",
+}
+
+COLUMNAS_CATEGORICAS = ["fuente_principal", "region", "sector", "estado"]
+COLUMNAS_ENTERAS = ["id_indh", "id_ejatlas", "id_ocmal", "año_inicio"]
+COLUMNAS_DECIMALES = ["latitud", "longitud"]
+COLUMNAS_BOOLEANAS = ["territorio_indigena", "en_ejatlas", "en_ocmal"]
+COLUMNAS_LISTA = ["impactos", "actores", "resistencias", "resultados"]
+
+# Valor único de las categóricas sin dato (nulas, vacías o solo espacios)
+SIN_DATO = "Sin dato"
+
+
+def ruta_json(version="noticias"):
+    """Ruta del JSON de una versión del dataset."""
+    return DATOS_DIR / f"{VERSIONES[version]}.json"
+
+
+def ruta_parquet(version="noticias"):
+    """Ruta del Parquet de una versión del dataset."""
+    return DATOS_DIR / f"{VERSIONES[version]}.parquet"
+
+
+def normalizar_categoricas(df):
+    """Categóricas como category, con SIN_DATO en los valores nulos o vacíos."""
+    for col in COLUMNAS_CATEGORICAS:
+        if col in df.columns:
+            texto = df[col].astype(object).where(df[col].notna(), "").astype(str).str.strip()
+            df[col] = texto.mask(texto == "", SIN_DATO).astype("category")
+    return df
+
+
+def tipar_dataframe(df):
+    """Aplica los tipos del esquema columnar a un DataFrame de conflictos."""
+    import pandas as pd
+
+    normalizar_categoricas(df)
+    for col in COLUMNAS_ENTERAS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+    for col in COLUMNAS_DECIMALES:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    for col in COLUMNAS_BOOLEANAS:
+        if col in df.columns:
+            df[col] = df[col].astype("boolean")
+    for col in COLUMNAS_LISTA:
+        if col in df.columns:
+            df[col] = df[col].apply(lambda v: list(v) if isinstance(v, (list, tuple)) else [])
+    return df
+
+
+def guardar_parquet(dataset, ruta):
+    """
+    Guarda una lista de registros como Parquet tipado.
+
+    Retorna False (sin fallar) si pandas/pyarrow no están instalados.
+    """
+    try:
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("pyarrow no instalado, se omite Parquet. Ejecuta: pip install pyarrow")
+        return False
+
+    df = tipar_dataframe(pd.DataFrame(dataset))
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+
+    # Forzar list<string> aunque todas las listas de una columna vengan vacías
+    for col in COLUMNAS_LISTA:
+        if col in df.columns:
+            idx = tabla.schema.get_field_index(col)
+            tabla = tabla.set_column(idx, col, pa.array(df[col].tolist(), type=pa.list_(pa.string())))
+
+    pq.write_table(tabla, ruta, compression="zstd")
+    return True
+
+
+def columnas_disponibles(version="noticias"):
+    """
+    Columnas presentes en el Parquet de una versión.
+
+    Retorna None si no existe o si es más antiguo que el JSON (desactualizado).
+    """
+    ruta = ruta_parquet(version)
+    if not ruta.exists():
+        return None
+    json_path = ruta_json(version)
+    if json_path.exists() and json_path.stat().st_mtime > ruta.stat().st_mtime:
+        return None
+    import pyarrow.parquet as pq
+    return pq.read_schema(ruta).names
+
+
+def cargar_conflictos(columnas=None, version="noticias"):
+    """
+    Carga el dataset consolidado como DataFrame tipado.
+
+    Args:
+        columnas: Lista de columnas a leer (None = todas). Las que no existan
+                  en el archivo se omiten.
+        version: "ids", "completo" o "noticias"
+
+    Returns:
+        pandas.DataFrame
+    """
+    import pandas as pd
+
+    try:
+        disponibles = columnas_disponibles(version)
+    except ImportError:
+        disponibles = None
+
+    if disponibles is not None:
+        if columnas is not None:
+            columnas = [c for c in columnas if c in disponibles]
+        # Parquet escritos antes de SIN_DATO guardaban "" en las categóricas
+        return normalizar_categoricas(pd.read_parquet(ruta_parquet(version), columns=columnas))
+
+    # Fallback: JSON completo
+    with open(ruta_json(version), encoding="utf-8") as f:
+        df = pd.DataFrame(json.load(f))
+    if columnas is not None:
+        df = df[[c for c in columnas if c in df.columns]]
+    return tipar_dataframe(df)
+
+
+def cargar_registros(columnas=None, version="noticias"):
+    """
+    Carga el dataset como lista de dicts con tipos nativos de Python
+    (None para nulos y SIN_DATO, listas para las columnas de lista).
+    """
+    import pandas as pd
+
+    df = cargar_conflictos(columnas, version)
+    registros = []
+    for fila in df.astype(object).to_dict("records"):
+        for col, valor in fila.items():
+            if col in COLUMNAS_LISTA:
+                fila[col] = [] if valor is None else list(valor)
+            elif pd.isna(valor) or (col in COLUMNAS_CATEGORICAS and valor == SIN_DATO):
+                fila[col] = None
+        registros.append(fila)
+    return registros
+
+
+def main():
+    """Convierte a Parquet las versiones JSON existentes del dataset."""
+    for version in VERSIONES:
+        origen = ruta_json(version)
+        if not origen.exists():
+            print(f"  {origen.name}: no existe, se omite")
+            continue
+        with open(origen, encoding="utf-8") as f:
+            dataset = json.load(f)
+        if guardar_parquet(dataset, ruta_parquet(version)):
+            kb_json = origen.stat().st_size / 1024
+            kb_parquet = ruta_parquet(version).stat().st_size / 1024
+            print(f"  {ruta_parquet(version).name}: {len(dataset)} registros "
+                  f"({kb_json:.0f} KB JSON -> {kb_parquet:.0f} KB Parquet)")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,9 +13,9 @@ from datetime import datetime
 
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
-BASE_DIR = Path(r"G:\Mi unidad\tribunal_pdf\corpus\descarga_completa\documentos")
-OUTPUT_DIR = Path(r"G:\Mi unidad\tribunal_pdf\datos\estadisticas")
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+BASE_DIR = Path(__file__).parent.parent
+DOCUMENTOS_DIR = BASE_DIR / "corpus" / "descarga_completa" / "documentos"
+OUTPUT_DIR = BASE_DIR / "datos" / "estadisticas"
 
 def extract_rol(filename):
     """Extrae número de ROL del nombre de archivo"""
@@ -64,6 +64,15 @@ def extract_doc_type(filename):
     else:
         return 'Otro'
 
+PROCEDIMIENTOS = {'R': 'Reclamación', 'D': 'Demanda', 'S': 'Solicitud', 'C': 'Consulta'}
+
+def extract_procedimiento(filename):
+    """Tipo de procedimiento según la letra del ROL (R-, D-, S-, C-)"""
+    match = re.search(r'(?<![A-Za-z])([RDSC])[-_ ]?(?:N[°º]?[-_ ]?)?\d+[-_]\d{4}', filename, re.IGNORECASE)
+    if match:
+        return PROCEDIMIENTOS[match.group(1).upper()]
+    return 'Sin dato'
+
 def get_tribunal_from_path(filepath):
     """Determina el tribunal según la ruta del archivo"""
     path_str = str(filepath).lower()
@@ -76,6 +85,11 @@ def get_tribunal_from_path(filepath):
 
 def analyze_corpus():
     """Analiza todo el corpus"""
+    # Sin el corpus descargado no se sobrescriben las salidas con conteos vacíos
+    if not DOCUMENTOS_DIR.exists():
+        print(f"ERROR: No existe {DOCUMENTOS_DIR}. Ejecuta descargar_tribunales.py")
+        sys.exit(1)
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     print("="*60)
     print("ANÁLISIS ESTADÍSTICO DEL CORPUS")
     print("="*60)
@@ -97,7 +111,7 @@ def analyze_corpus():
 
     # Escanear todos los archivos
     print("\nEscaneando archivos...")
-    for filepath in BASE_DIR.rglob("*"):
+    for filepath in DOCUMENTOS_DIR.rglob("*"):
         if filepath.is_file():
             stats['total_files'] += 1
 
@@ -129,6 +143,7 @@ def analyze_corpus():
                 'rol': rol,
                 'year': year,
                 'type': doc_type,
+                'procedure': extract_procedimiento(filename),
                 'extension': ext,
                 'size_kb': filepath.stat().st_size / 1024
             })
@@ -203,7 +218,7 @@ def analyze_corpus():
 
     # Crear CSV
     with open(OUTPUT_DIR / 'listado_archivos.csv', 'w', encoding='utf-8') as f:
-        f.write('filename,tribunal,rol,year,type,extension,size_kb\n')
+        f.write('filename,tribunal,rol,year,type,procedure,extension,size_kb\n')
         for file in all_files:
             row = [
                 file['filename'].replace('"', "'"),
@@ -211,6 +226,7 @@ def analyze_corpus():
                 file['rol'] or '',
                 str(file['year']) if file['year'] else '',
                 file['type'],
+                file['procedure'],
                 file['extension'],
                 f"{file['size_kb']:.1f}"
             ]
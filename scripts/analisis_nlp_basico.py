@@ -18,6 +18,10 @@ from pathlib import Path
 from collections import Counter
 from html import unescape
 
+sys.path.insert(0, str(Path(__file__).parent))
+
+from almacen_conflictos import cargar_registros
+
 BASE_DIR = Path(__file__).parent.parent
 DATOS_DIR = BASE_DIR / "datos" / "conflictos"
 OUTPUT_DIR = BASE_DIR / "datos" / "estadisticas"
@@ -168,8 +172,8 @@ def main():
     print("ANÁLISIS NLP BÁSICO DE CONFLICTOS")
     print("=" * 60)
 
-    with open(DATOS_DIR / "conflictos_categorizados.json", encoding="utf-8") as f:
-        conflictos = json.load(f)
+    # Solo las columnas de texto del dataset consolidado
+    conflictos = cargar_registros(["nombre", "descripcion", "empresa"])
 
     print(f"\nTotal conflictos: {len(conflictos)}")
 
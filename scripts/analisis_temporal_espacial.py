@@ -7,6 +7,9 @@ Genera:
 2. Distribución geográfica por región
 3. Cruces temporales por sector
 4. Mapas de calor por década
+
+Los conteos por año, sector y región salen del cubo temporal
+(cubo_temporal.py), el mismo que usa la plataforma.
 """
 
 import sys
@@ -17,30 +20,48 @@ from pathlib import Path
 from collections import Counter, defaultdict
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).parent))
+
+from almacen_conflictos import cargar_registros
+from cubo_temporal import CuboTemporal
+
 BASE_DIR = Path(__file__).parent.parent
 DATOS_DIR = BASE_DIR / "datos" / "conflictos"
 OUTPUT_DIR = BASE_DIR / "datos" / "estadisticas"
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Columnas del dataset consolidado usadas en los análisis
+COLUMNAS = [
+    "nombre", "region", "localidad", "latitud", "longitud", "sector", "año_inicio",
+    "impactos", "actores", "resistencias", "resultados"
+]
+
+
 def cargar_datos():
-    """Carga el dataset categorizado."""
-    with open(DATOS_DIR / "conflictos_categorizados.json", encoding="utf-8") as f:
-        return json.load(f)
+    """Carga el dataset consolidado (solo las columnas usadas en el análisis)."""
+    conflictos = cargar_registros(COLUMNAS)
+    for c in conflictos:
+        c["categorias"] = {
+            "impactos": c["impactos"],
+            "actores": c["actores"],
+            "resistencias": c["resistencias"],
+            "resultados": c["resultados"]
+        }
+    return conflictos
 
 
-def analisis_temporal(conflictos):
-    """Analiza la evolución temporal de los conflictos."""
+def analisis_temporal(cubo):
+    """Analiza la evolución temporal de los conflictos (cubo temporal)."""
     print("\n" + "=" * 60)
     print("ANÁLISIS TEMPORAL")
     print("=" * 60)
 
-    # Conflictos con año de inicio
-    con_año = [c for c in conflictos if c.get("año_inicio")]
-    print(f"\nConflictos con año de inicio: {len(con_año)} / {len(conflictos)}")
-
-    # Distribución por año
-    años = Counter(c["año_inicio"] for c in con_año)
-    años_ordenados = sorted(años.items())
+    # Distribución por año (conflictos con año de inicio)
+    años_ordenados = cubo.serie("año")
+    años = dict(años_ordenados)
+    total = cubo.total()
+    con_año = sum(años.values())
+    print(f"\nConflictos con año de inicio: {con_año} / {total}")
 
     print("\nDistribución por año de inicio:")
     print("-" * 40)
@@ -73,13 +94,13 @@ def analisis_temporal(conflictos):
         "por_año": dict(años),
         "por_decada": dict(decadas),
         "evolucion_acumulada": evolucion,
-        "total_con_año": len(con_año),
-        "total_sin_año": len(conflictos) - len(con_año)
+        "total_con_año": con_año,
+        "total_sin_año": total - con_año
     }
 
 
-def analisis_temporal_por_sector(conflictos):
-    """Analiza la evolución temporal por sector."""
+def analisis_temporal_por_sector(cubo):
+    """Analiza la evolución temporal por sector (cubo temporal)."""
     print("\n" + "=" * 60)
     print("EVOLUCIÓN POR SECTOR")
     print("=" * 60)
@@ -87,12 +108,7 @@ def analisis_temporal_por_sector(conflictos):
     # Sectores principales
     sectores_principales = ["Minería", "Energía", "Pesca y acuicultura", "Forestal"]
 
-    sector_año = defaultdict(lambda: defaultdict(int))
-    for c in conflictos:
-        año = c.get("año_inicio")
-        sector = c.get("sector", "Otro")
-        if año and sector:
-            sector_año[sector][año] += 1
+    sector_año = cubo.tabla("sector", "año")
 
     resultados = {}
     for sector in sectores_principales:
@@ -152,22 +168,16 @@ def analisis_geografico(conflictos):
     }
 
 
-def analisis_region_sector(conflictos):
-    """Cruza región con sector."""
+def analisis_region_sector(cubo):
+    """Cruza región con sector (cubo temporal)."""
     print("\n" + "=" * 60)
     print("CRUCE REGIÓN-SECTOR")
     print("=" * 60)
 
-    cruce = defaultdict(lambda: defaultdict(int))
-    for c in conflictos:
-        region = c.get("region")
-        sector = c.get("sector")
-        if region and sector:
-            cruce[region][sector] += 1
+    cruce = cubo.tabla("region", "sector")
 
     # Top 5 regiones con sus sectores principales
-    regiones_top = Counter(c.get("region") for c in conflictos
-                           if c.get("region")).most_common(5)
+    regiones_top = cubo.desglosar("region", limite=5)
 
     print("\nTop 5 regiones y sus sectores principales:")
     for region, total in regiones_top:
@@ -237,13 +247,14 @@ def main():
     print("=" * 60)
 
     conflictos = cargar_datos()
+    cubo = CuboTemporal.cargar()
     print(f"\nTotal conflictos: {len(conflictos)}")
 
     # Ejecutar análisis
-    temporal = analisis_temporal(conflictos)
-    temporal_sector = analisis_temporal_por_sector(conflictos)
+    temporal = analisis_temporal(cubo)
+    temporal_sector = analisis_temporal_por_sector(cubo)
     geografico = analisis_geografico(conflictos)
-    region_sector = analisis_region_sector(conflictos)
+    region_sector = analisis_region_sector(cubo)
     cruces = analisis_categorias_cruzado(conflictos)
 
     # Guardar resultados
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Autómata Aho-Corasick para búsqueda simultánea de muchos patrones.
+
+Encuentra todas las ocurrencias de un conjunto de patrones en una sola
+pasada sobre el texto, en tiempo lineal en el largo del texto más el número
+de coincidencias (independiente de cuántos patrones haya).
+
+Uso:
+    automata = AhoCorasick()
+    automata.agregar("puchuncavi", "Puchuncaví")
+    automata.agregar("quintero", "Quintero")
+    automata.construir()
+    for inicio, fin, valor in automata.buscar(texto):
+        ...
+"""
+
+from collections import deque
+
+
+class AhoCorasick:
+    """Autómata de búsqueda multi-patrón (sin dependencias externas)."""
+
+    def __init__(self):
+        self._transiciones = [{}]   # nodo -> {caracter: nodo}
+        self._fallo = [0]           # nodo -> nodo de fallo
+        self._salidas = [[]]        # nodo -> [(largo_patron, valor)]
+        self._construido = False
+
+    def agregar(self, patron: str, valor=None):
+        """Agrega un patrón; `valor` se retorna en cada coincidencia (por defecto el patrón)."""
+        if self._construido:
+            raise RuntimeError("No se pueden agregar patrones a un autómata ya construido")
+        if not patron:
+            return
+        nodo = 0
+        for caracter in patron:
+            siguiente = self._transiciones[nodo].get(caracter)
+            if siguiente is None:
+                siguiente = len(self._transiciones)
+                self._transiciones[nodo][caracter] = siguiente
+                self._transiciones.append({})
+                self._fallo.append(0)
+                self._salidas.append([])
+            nodo = siguiente
+        self._salidas[nodo].append((len(patron), patron if valor is None else valor))
+
+    def construir(self):
+        """Calcula los enlaces de fallo (BFS). Se llama una vez tras agregar los patrones."""
+        cola = deque()
+        for nodo in self._transiciones[0].values():
+            self._fallo[nodo] = 0
+            cola.append(nodo)
+
+        while cola:
+            actual = cola.popleft()
+            for caracter, siguiente in self._transiciones[actual].items():
+                cola.append(siguiente)
+                fallo = self._fallo[actual]
+                while fallo and caracter not in self._transiciones[fallo]:
+                    fallo = self._fallo[fallo]
+                destino = self._transiciones[fallo].get(caracter, 0)
+                self._fallo[siguiente] = destino if destino != siguiente else 0
+                # Heredar las salidas del sufijo más largo que también es patrón
+                self._salidas[siguiente] = self._salidas[siguiente] + self._salidas[self._fallo[siguiente]]
+
+        self._construido = True
+        return self
+
+    def buscar(self, texto: str):
+        """
+        Genera todas las coincidencias en el texto.
+
+        Yields:
+            Tuplas (inicio, fin, valor) con fin exclusivo, en orden de fin.
+        """
+        if not self._construido:
+            self.construir()
+
+        transiciones = self._transiciones
+        fallo = self._fallo
+        salidas = self._salidas
+        nodo = 0
+        for i, caracter in enumerate(texto):
+            while nodo and caracter not in transiciones[nodo]:
+                nodo = fallo[nodo]
+            nodo = transiciones[nodo].get(caracter, 0)
+            if salidas[nodo]:
+                fin = i + 1
+                for largo, valor in salidas[nodo]:
+                    yield fin - largo, fin, valor
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de las búsquedas de datos_geograficos_chile.
+
+Compara buscar_comuna y buscar_region (índices precalculados) con la
+implementación original de recorrido lineal, verifica que ambas den los
+mismos resultados y reporta búsquedas por segundo.
+
+Consultas:
+- Comunas: todos los nombres de COMUNAS_CHILE con variantes (sin tildes,
+  mayúsculas, espacios) más nombres inexistentes
+- Regiones: fragmentos de texto del tipo "Región de ..." como los que
+  aparecen en las sentencias
+
+Uso:
+    python benchmark_geografico.py [--repeticiones N]
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from datos_geograficos_chile import (
+    COMUNAS_CHILE, REGIONES_ALIAS, REGIONES_CHILE,
+    buscar_comuna, buscar_region, normalizar_nombre
+)
+
+
+# ============================================================
+# IMPLEMENTACIÓN ORIGINAL (referencia)
+# ============================================================
+
+def buscar_region_lineal(texto):
+    texto_lower = texto.lower()
+    for alias, region in REGIONES_ALIAS.items():
+        if alias in texto_lower:
+            return region
+    for region in REGIONES_CHILE.keys():
+        if normalizar_nombre(region) in normalizar_nombre(texto):
+            return region
+    return None
+
+
+def buscar_comuna_lineal(nombre):
+    nombre_norm = normalizar_nombre(nombre)
+    for comuna, datos in COMUNAS_CHILE.items():
+        if normalizar_nombre(comuna) == nombre_norm:
+            return {"nombre": comuna, **datos}
+    return None
+
+
+# ============================================================
+# CONSULTAS
+# ============================================================
+
+def consultas_comunas():
+    consultas = []
+    for comuna in COMUNAS_CHILE:
+        consultas += [comuna, normalizar_nombre(comuna), comuna.upper(), f"  {comuna} "]
+    consultas += ["Gotham", "Springfield", "Macondo", "Villa Alegre Norte", ""]
+    return consultas
+
+
+def consultas_regiones():
+    consultas = []
+    for region in REGIONES_CHILE:
+        consultas += [
+            f"Región de {region}",
+            f"la Región de {region}, Chile",
+            f"Region del {normalizar_nombre(region)}",
+        ]
+    for alias in REGIONES_ALIAS:
+        consultas.append(f"provincia de {alias.title()}")
+    consultas += ["Región Metropolitana de Santiago", "Región del Libertador General Bernardo O'Higgins",
+                  "Región de Aysén del General Carlos Ibáñez del Campo", "Región Desconocida", ""]
+    return consultas
+
+
+def medir(funcion, consultas, repeticiones):
+    """Búsquedas por segundo de `funcion` sobre las consultas."""
+    funcion(consultas[0])  # construir índices fuera de la medición
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for consulta in consultas:
+            funcion(consulta)
+    segundos = time.perf_counter() - inicio
+    return repeticiones * len(consultas) / segundos
+
+
+def main(repeticiones=50):
+    print("=" * 60)
+    print("BENCHMARK: BÚSQUEDAS GEOGRÁFICAS")
+    print("=" * 60)
+
+    casos = [
+        ("buscar_comuna", consultas_comunas(), buscar_comuna_lineal, buscar_comuna),
+        ("buscar_region", consultas_regiones(), buscar_region_lineal, buscar_region),
+    ]
+
+    for nombre, consultas, antes, despues in casos:
+        diferencias = [c for c in consultas if antes(c) != despues(c)]
+        if diferencias:
+            print(f"\nERROR: {nombre} difiere de la implementación original en {len(diferencias)} consultas:")
+            for c in diferencias[:10]:
+                print(f"  {c!r}: {antes(c)} != {despues(c)}")
+            return
+
+        por_seg_antes = medir(antes, consultas, repeticiones)
+        por_seg_despues = medir(despues, consultas, repeticiones)
+        print(f"\n{nombre} ({len(consultas)} consultas x {repeticiones}):")
+        print(f"  Lineal:  {por_seg_antes:>12,.0f} búsquedas/s")
+        print(f"  Índice:  {por_seg_despues:>12,.0f} búsquedas/s")
+        print(f"  Mejora:  {por_seg_despues / por_seg_antes:>12.1f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark de búsquedas geográficas')
+    parser.add_argument('--repeticiones', type=int, default=50,
+                        help='Veces que se repite cada lote de consultas (default: 50)')
+    args = parser.parse_args()
+
+    main(repeticiones=args.repeticiones)
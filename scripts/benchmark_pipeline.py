@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de las rutas críticas del pipeline sobre un corpus sintético.
+
+Genera un corpus con corpus_sintetico.py (en un directorio temporal, o en
+--directorio para reutilizarlo) y mide:
+- extract_rol, es_sentencia_oficial (filtrar_sentencias_v2)
+- clasificar_documento (estadisticas_por_tipo), extract_doc_type (analisis_estadisticas)
+- extraer_ubicaciones_texto (geocodificar_conflictos)
+- detectar_categorias, vía analizar_conflicto (categorizar_conflictos)
+- identificar_duplicados (integrar_conflictos)
+- carga de datos de la plataforma: cargar_conflictos desde JSON y desde Parquet
+- conteos por combinación de filtros con las facetas de la plataforma (facetas)
+- clusters del mapa por nivel de zoom sobre 100.000 puntos (servicio_mapa)
+- búsqueda en el índice FTS5 (indice_busqueda), conflictos y sentencias
+- render de la plataforma (vista por defecto) y rerun tras cambiar un filtro,
+  con streamlit.testing sobre los datos reales (solo si streamlit está instalado)
+
+Cada caso se repite N veces y se reporta la mediana. Los resultados se
+guardan en datos/benchmarks/benchmark_<fecha>.json y se comparan con la
+ejecución anterior de la misma escala.
+
+Uso:
+    python benchmark_pipeline.py [--documentos N] [--conflictos N] [--repeticiones N]
+                                 [--directorio DIR] [--solo CASO ...]
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import json
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from corpus_sintetico import SEMILLA, generar_corpus
+
+BASE_DIR = Path(__file__).parent.parent
+BENCHMARKS_DIR = BASE_DIR / "datos" / "benchmarks"
+
+# Columnas que lee plataforma_conflictos.py (COLUMNAS_CONFLICTOS)
+COLUMNAS_PLATAFORMA = [
+    'id_maestro', 'fuente_principal', 'nombre', 'descripcion', 'region', 'sector',
+    'estado', 'año_inicio', 'latitud', 'longitud', 'impactos', 'resistencias', 'resultados'
+]
+
+
+# ============================================================
+# CASOS
+# ============================================================
+# Cada caso recibe el corpus y retorna (función sin argumentos, n elementos)
+
+def caso_extract_rol(corpus):
+    from filtrar_sentencias_v2 import extract_rol
+    nombres = [r.name for r in corpus["documentos"]]
+    return lambda: [extract_rol(n) for n in nombres], len(nombres)
+
+
+def caso_es_sentencia_oficial(corpus):
+    from filtrar_sentencias_v2 import es_sentencia_oficial
+    nombres = [r.name for r in corpus["documentos"]]
+    return lambda: [es_sentencia_oficial(n) for n in nombres], len(nombres)
+
+
+def caso_clasificar_documento(corpus):
+    from estadisticas_por_tipo import clasificar_documento
+    documentos = [(r.name, r) for r in corpus["documentos"]]
+    return lambda: [clasificar_documento(n, r) for n, r in documentos], len(documentos)
+
+
+def caso_extract_doc_type(corpus):
+    from analisis_estadisticas import extract_doc_type
+    nombres = [r.name for r in corpus["documentos"]]
+    return lambda: [extract_doc_type(n) for n in nombres], len(nombres)
+
+
+def caso_extraer_ubicaciones_texto(corpus):
+    from geocodificar_conflictos import extraer_ubicaciones_texto
+    textos = [r.read_text(encoding="utf-8") for r in corpus["textos"]]
+    extraer_ubicaciones_texto(textos[0])  # construir el gazetteer fuera de la medición
+    return lambda: [extraer_ubicaciones_texto(t) for t in textos], len(textos)
+
+
+def caso_detectar_categorias(corpus):
+    from categorizar_conflictos import analizar_conflicto
+    conflictos = _cargar_conflictos(corpus)
+    return lambda: [analizar_conflicto(c) for c in conflictos], len(conflictos)
+
+
+def caso_identificar_duplicados(corpus):
+    from integrar_conflictos import identificar_duplicados, normalizar_texto
+    conflictos = [{**c, "nombre_normalizado": normalizar_texto(c["nombre"])} for c in _cargar_conflictos(corpus)]
+    principal = [c for c in conflictos if c["fuente_principal"] == "INDH"]
+    secundaria = [c for c in conflictos if c["fuente_principal"] != "INDH"]
+    return lambda: identificar_duplicados(principal, secundaria, "EJAtlas"), len(secundaria)
+
+
+def _caso_carga_plataforma(corpus, parquet):
+    import almacen_conflictos
+
+    # El almacén lee de DATOS_DIR: se apunta a una copia en el directorio del corpus
+    datos_dir = corpus["conflictos"].parent / ("almacen_parquet" if parquet else "almacen_json")
+    datos_dir.mkdir(exist_ok=True)
+    conflictos = _cargar_conflictos(corpus)
+    original = almacen_conflictos.DATOS_DIR
+    almacen_conflictos.DATOS_DIR = datos_dir
+    try:
+        with open(almacen_conflictos.ruta_json(), "w", encoding="utf-8") as f:
+            json.dump(conflictos, f, ensure_ascii=False)
+        if parquet and not almacen_conflictos.guardar_parquet(conflictos, almacen_conflictos.ruta_parquet()):
+            return None
+    finally:
+        almacen_conflictos.DATOS_DIR = original
+
+    def cargar():
+        almacen_conflictos.DATOS_DIR = datos_dir
+        try:
+            return almacen_conflictos.cargar_conflictos(COLUMNAS_PLATAFORMA)
+        finally:
+            almacen_conflictos.DATOS_DIR = original
+
+    return cargar, len(conflictos)
+
+
+def caso_carga_plataforma_json(corpus):
+    return _caso_carga_plataforma(corpus, parquet=False)
+
+
+def caso_carga_plataforma_parquet(corpus):
+    return _caso_carga_plataforma(corpus, parquet=True)
+
+
+def caso_facetas_conteos(corpus):
+    import pandas as pd
+    from almacen_conflictos import tipar_dataframe
+    from facetas import Facetas
+
+    facetas = Facetas(tipar_dataframe(pd.DataFrame(_cargar_conflictos(corpus))))
+    fuentes = tuple(facetas.valores["fuente"])
+    combinaciones = [Facetas.clave({"fuente": fuentes, "sector": (s,), "region": r})
+                     for s in facetas.valores["sector"]
+                     for r in [None] + [(v,) for v in facetas.valores["region"]]]
+
+    def calcular():
+        # Sin LRU: se mide el cálculo de máscara y conteos de cada combinación
+        facetas._mascara.cache_clear()
+        return [facetas._calcular_conteos(c) for c in combinaciones]
+
+    return calcular, len(combinaciones)
+
+
+def caso_mapa_clusters(corpus):
+    from servicio_mapa import NIVELES_ZOOM, puntos_aleatorios
+
+    # Independiente del tamaño del corpus: 100.000 puntos en Chile continental
+    indice = puntos_aleatorios(100_000)
+    zooms = sorted(NIVELES_ZOOM)
+    return lambda: [indice.consultar(zoom=z) for z in zooms], len(zooms)
+
+
+def caso_busqueda_indice(corpus):
+    import indice_busqueda
+
+    # El índice se construye en el directorio del corpus, sin tocar datos/busqueda
+    directorio = corpus["conflictos"].parent
+    originales = (indice_busqueda.CONFLICTOS_FILE, indice_busqueda.TEXTOS_DIR,
+                  indice_busqueda.INDICE_DIR, indice_busqueda.INDICE_FILE)
+    indice_busqueda.CONFLICTOS_FILE = corpus["conflictos"]
+    indice_busqueda.TEXTOS_DIR = corpus["textos"][0].parent
+    indice_busqueda.INDICE_DIR = directorio / "busqueda"
+    indice_busqueda.INDICE_FILE = indice_busqueda.INDICE_DIR / "indice_busqueda.sqlite"
+    try:
+        ruta = indice_busqueda.construir_indice()
+    finally:
+        (indice_busqueda.CONFLICTOS_FILE, indice_busqueda.TEXTOS_DIR,
+         indice_busqueda.INDICE_DIR, indice_busqueda.INDICE_FILE) = originales
+
+    consultas = ["contaminacion rio", "relave minero", "Puchuncaví", "reclamación ambiental",
+                 "central termoelectrica", "comunidad indigena"]
+
+    def buscar():
+        conn = indice_busqueda.conectar(ruta)
+        try:
+            for consulta in consultas:
+                indice_busqueda.buscar_conflictos(consulta, conn=conn)
+                indice_busqueda.buscar_sentencias(consulta, conn=conn)
+        finally:
+            conn.close()
+
+    return buscar, len(consultas) * 2
+
+
+def caso_plataforma_render(corpus):
+    from streamlit.testing.v1 import AppTest
+    ruta = str(BASE_DIR / "plataforma_conflictos.py")
+    return lambda: AppTest.from_file(ruta, default_timeout=120).run(), 1
+
+
+def caso_plataforma_rerun(corpus):
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(str(BASE_DIR / "plataforma_conflictos.py"), default_timeout=120).run()
+    selector = app.sidebar.selectbox[0]
+    opciones = list(selector.options)
+    estado = {"i": 0}
+
+    def rerun():
+        # Alterna el filtro de sector entre sus primeras opciones
+        estado["i"] = (estado["i"] + 1) % min(3, len(opciones))
+        app.sidebar.selectbox[0].set_value(opciones[estado["i"]]).run()
+
+    return rerun, 1
+
+
+CASOS = {
+    "extract_rol": caso_extract_rol,
+    "es_sentencia_oficial": caso_es_sentencia_oficial,
+    "clasificar_documento": caso_clasificar_documento,
+    "extract_doc_type": caso_extract_doc_type,
+    "extraer_ubicaciones_texto": caso_extraer_ubicaciones_texto,
+    "detectar_categorias": caso_detectar_categorias,
+    "identificar_duplicados": caso_identificar_duplicados,
+    "carga_plataforma_json": caso_carga_plataforma_json,
+    "carga_plataforma_parquet": caso_carga_plataforma_parquet,
+    "facetas_conteos": caso_facetas_conteos,
+    "mapa_clusters": caso_mapa_clusters,
+    "busqueda_indice": caso_busqueda_indice,
+    "plataforma_render": caso_plataforma_render,
+    "plataforma_rerun": caso_plataforma_rerun,
+}
+
+
+def _cargar_conflictos(corpus):
+    with open(corpus["conflictos"], encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ============================================================
+# MEDICIÓN Y RESULTADOS
+# ============================================================
+
+def medir(funcion, repeticiones):
+    """Tiempos (segundos) de cada repetición."""
+    funcion()  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def ejecutar_casos(corpus, repeticiones, solo=None):
+    resultados = {}
+    for nombre, preparar in CASOS.items():
+        if solo and nombre not in solo:
+            continue
+        try:
+            preparado = preparar(corpus)
+        except ImportError as e:
+            print(f"  {nombre:<28} omitido ({e})")
+            continue
+        if preparado is None:
+            print(f"  {nombre:<28} omitido")
+            continue
+
+        funcion, n = preparado
+        tiempos = medir(funcion, repeticiones)
+        mediana = statistics.median(tiempos)
+        resultados[nombre] = {
+            "n": n,
+            "segundos_mediana": round(mediana, 6),
+            "segundos_min": round(min(tiempos), 6),
+            "por_segundo": round(n / mediana, 1) if mediana > 0 else None,
+        }
+        print(f"  {nombre:<28} {mediana * 1000:>10.2f} ms  ({n / mediana:>12,.0f} /s, n={n})")
+    return resultados
+
+
+def ultimo_resultado(parametros):
+    """Resultado más reciente con la misma escala (o None)."""
+    if not BENCHMARKS_DIR.exists():
+        return None
+    for ruta in sorted(BENCHMARKS_DIR.glob("benchmark_*.json"), reverse=True):
+        with open(ruta, encoding="utf-8") as f:
+            previo = json.load(f)
+        if previo.get("parametros") == parametros:
+            return previo
+    return None
+
+
+def comparar(resultados, previo):
+    print(f"\nComparación con {previo['fecha'][:19]}:")
+    for nombre, r in resultados.items():
+        antes = previo["casos"].get(nombre)
+        if antes and antes["segundos_mediana"] > 0:
+            cambio = r["segundos_mediana"] / antes["segundos_mediana"] - 1
+            print(f"  {nombre:<28} {cambio:>+8.1%}")
+
+
+def main(documentos=500, conflictos=300, parrafos=40, repeticiones=5, directorio=None, solo=None):
+    print("=" * 60)
+    print("BENCHMARK DEL PIPELINE (corpus sintético)")
+    print("=" * 60)
+
+    parametros = {"documentos": documentos, "conflictos": conflictos, "parrafos": parrafos,
+                  "semilla": SEMILLA, "repeticiones": repeticiones}
+
+    temporal = None
+    if directorio is None:
+        temporal = tempfile.TemporaryDirectory(prefix="corpus_sintetico_")
+        directorio = temporal.name
+
+    try:
+        inicio = time.perf_counter()
+        corpus = generar_corpus(directorio, documentos, conflictos, parrafos)
+        print(f"\nCorpus: {documentos} documentos, {conflictos} conflictos en {directorio} "
+              f"({time.perf_counter() - inicio:.1f}s)")
+        print(f"Repeticiones: {repeticiones}\n")
+        resultados = ejecutar_casos(corpus, repeticiones, solo)
+    finally:
+        if temporal is not None:
+            temporal.cleanup()
+
+    previo = ultimo_resultado(parametros)
+
+    registro = {
+        "fecha": datetime.now().isoformat(),
+        "parametros": parametros,
+        "entorno": {"python": platform.python_version(), "plataforma": platform.platform()},
+        "casos": resultados,
+    }
+    BENCHMARKS_DIR.mkdir(parents=True, exist_ok=True)
+    salida = BENCHMARKS_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(salida, "w", encoding="utf-8") as f:
+        json.dump(registro, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados: {salida}")
+
+    if previo:
+        comparar(resultados, previo)
+    return registro
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark de las rutas críticas del pipeline')
+    parser.add_argument('--documentos', type=int, default=500, help='Documentos del corpus (default: 500)')
+    parser.add_argument('--conflictos', type=int, default=300, help='Conflictos (default: 300)')
+    parser.add_argument('--parrafos', type=int, default=40, help='Párrafos por sentencia (default: 40)')
+    parser.add_argument('--repeticiones', type=int, default=5, help='Repeticiones por caso (default: 5)')
+    parser.add_argument('--directorio', help='Directorio del corpus (default: temporal)')
+    parser.add_argument('--solo', nargs='+', choices=list(CASOS), help='Ejecutar solo estos casos')
+    args = parser.parse_args()
+
+    main(args.documentos, args.conflictos, args.parrafos, args.repeticiones, args.directorio, args.solo)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Caché de gráficos ya construidos de la plataforma.
+
+Guarda cada figura plotly serializada (JSON) bajo la clave
+(id del gráfico, estado de los filtros, versión de los datos), en un LRU
+compartido por todas las sesiones del proceso. Un acierto entrega la
+figura como dict, listo para st.plotly_chart, sin volver a agrupar datos
+ni a construir la figura con plotly.express.
+
+Las vistas por defecto (sin filtros, las que ve la mayoría al entrar) se
+precalculan una vez por versión de los datos con precalcular().
+
+Ejemplo:
+    cache = CacheGraficos()
+    figura = cache.obtener("conflictos_sector", filtros, version, construir, agregados)
+    if figura is not None:
+        st.plotly_chart(figura)
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+TAMANO_CACHE = 256
+
+
+class CacheGraficos:
+    """LRU de figuras serializadas por (id del gráfico, filtros, versión de los datos)."""
+
+    def __init__(self, tamano=TAMANO_CACHE):
+        self.tamano = tamano
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def clave(id_grafico, filtros, version):
+        return (id_grafico, filtros, version)
+
+    def _serializada(self, clave, construir, args):
+        with self._lock:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave]
+
+        # None = sin datos para el gráfico (también se guarda, para no recalcular)
+        figura = construir(*args)
+        texto = figura.to_json() if figura is not None else None
+        with self._lock:
+            self.fallos += 1
+            self._entradas[clave] = texto
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.tamano:
+                self._entradas.popitem(last=False)
+        return texto
+
+    def obtener(self, id_grafico, filtros, version, construir, *args):
+        """
+        Figura (dict) de un gráfico, construyéndola solo si no está en caché.
+
+        Args:
+            id_grafico: Identificador del gráfico
+            filtros: Estado de los filtros que lo afectan (hashable)
+            version: Versión de los datos de origen
+            construir: Función que retorna la figura plotly (o None si no hay datos)
+            *args: Argumentos de construir
+
+        Returns:
+            dict de la figura (una copia nueva en cada llamada) o None
+        """
+        texto = self._serializada(self.clave(id_grafico, filtros, version), construir, args)
+        return json.loads(texto) if texto is not None else None
+
+    def precalcular(self, graficos):
+        """
+        Construye los gráficos que aún no están en caché.
+
+        Args:
+            graficos: Iterable de (id_grafico, filtros, version, construir, args)
+
+        Returns:
+            Número de gráficos construidos
+        """
+        antes = self.fallos
+        for id_grafico, filtros, version, construir, args in graficos:
+            self._serializada(self.clave(id_grafico, filtros, version), construir, args)
+        return self.fallos - antes
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "bytes": sum(len(t) for t in self._entradas.values() if t is not None),
+            }
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Capas precalculadas para los mapas de causas y conflictos.
+
+Agrega una sola vez los puntos (causas geocodificadas + conflictos del
+dataset consolidado) y guarda capas GeoJSON en datos/geografico/capas/:
+- tribunales: un punto por tribunal con el total de causas
+- regiones: un punto por región (centroide) con causas y conflictos
+- comunas: un punto por ubicación con causas y conflictos
+- clusters_z<N>: puntos agrupados en una grilla por nivel de zoom
+- puntos: puntos individuales (zoom alto)
+
+Las capas se regeneran solo si cambia el hash de los datos de entrada
+(o VERSION_CAPAS); los mapas de geocodificar_conflictos.py las leen en
+vez de agregar y dibujar cada causa en cada ejecución.
+
+Uso:
+    python capas_mapa.py [--refrescar]
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import hashlib
+import json
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from datos_geograficos_chile import JURISDICCION_TRIBUNALES, REGIONES_CHILE, buscar_region
+
+BASE_DIR = Path(__file__).parent.parent
+GEOCODIFICACION_FILE = BASE_DIR / "datos" / "geografico" / "geocodificacion.json"
+CAPAS_DIR = BASE_DIR / "datos" / "geografico" / "capas"
+MANIFIESTO_FILE = CAPAS_DIR / "manifiesto.json"
+
+# Cambiar cuando cambie el formato de las capas
+VERSION_CAPAS = 1
+
+# Nivel de zoom (Leaflet) -> tamaño de celda de la grilla de clusters, en grados.
+# Cada capa se muestra desde su zoom hasta el siguiente; sobre ZOOM_PUNTOS
+# se muestran los puntos individuales.
+NIVELES_ZOOM = {
+    4: 2.0,
+    5: 1.0,
+    6: 0.5,
+    7: 0.25,
+    8: 0.1,
+}
+ZOOM_PUNTOS = 10
+
+MAX_EJEMPLOS = 5
+
+
+def puntos_de_causas(causas):
+    """
+    Puntos normalizados a partir de geocodificacion.json["causas"].
+
+    Causas y conflictos traen las mismas propiedades (None las que no
+    aplican), así un popup con campos fijos sirve para ambos tipos.
+    """
+    return [
+        {
+            "tipo": "causa",
+            "id": c["rol"],
+            "lat": c["lat"],
+            "lon": c["lon"],
+            "nombre": None,
+            "tribunal": c.get("tribunal"),
+            "comuna": c.get("comuna"),
+            "region": c.get("region"),
+            "sector": None,
+            "precision": c.get("precision"),
+        }
+        for c in causas
+        if c.get("lat") is not None and c.get("lon") is not None
+    ]
+
+
+def puntos_de_conflictos(conflictos):
+    """Puntos normalizados a partir de registros del dataset consolidado (mismas propiedades que las causas)."""
+    puntos = []
+    for c in conflictos:
+        lat, lon = c.get("latitud"), c.get("longitud")
+        if lat is None or lon is None:
+            continue
+        puntos.append({
+            "tipo": "conflicto",
+            "id": c.get("id_maestro"),
+            "lat": lat,
+            "lon": lon,
+            "nombre": c.get("nombre"),
+            "tribunal": None,
+            "comuna": None,
+            "region": buscar_region(c["region"]) if c.get("region") else None,
+            "sector": c.get("sector"),
+            "precision": None,
+        })
+    return puntos
+
+
+def hash_entrada(puntos):
+    """Hash estable de los puntos de entrada y la versión de las capas."""
+    contenido = json.dumps([VERSION_CAPAS, NIVELES_ZOOM, ZOOM_PUNTOS, puntos],
+                           sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+def _feature(lat, lon, propiedades):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [round(lon, 5), round(lat, 5)]},
+        "properties": propiedades,
+    }
+
+
+def _coleccion(features):
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _resumen_grupo(puntos):
+    """Propiedades comunes a un grupo de puntos."""
+    por_tipo = Counter(p["tipo"] for p in puntos)
+    por_tribunal = Counter(p["tribunal"] for p in puntos if p.get("tribunal"))
+    return {
+        "n": len(puntos),
+        "causas": por_tipo.get("causa", 0),
+        "conflictos": por_tipo.get("conflicto", 0),
+        "por_tribunal": dict(por_tribunal),
+        "tribunal_principal": por_tribunal.most_common(1)[0][0] if por_tribunal else None,
+    }
+
+
+def capa_tribunales(puntos):
+    conteo = Counter(p["tribunal"] for p in puntos if p["tipo"] == "causa")
+    features = []
+    for codigo, info in JURISDICCION_TRIBUNALES.items():
+        lat, lon = info["coords"]
+        features.append(_feature(lat, lon, {
+            "codigo": codigo, "sede": info["sede"], "causas": conteo.get(codigo, 0),
+        }))
+    return _coleccion(features)
+
+
+def capa_regiones(puntos):
+    grupos = {}
+    for p in puntos:
+        if p.get("region") in REGIONES_CHILE:
+            grupos.setdefault(p["region"], []).append(p)
+    features = []
+    for region, grupo in grupos.items():
+        datos = REGIONES_CHILE[region]
+        features.append(_feature(datos["lat"], datos["lon"], {"region": region, **_resumen_grupo(grupo)}))
+    return _coleccion(features)
+
+
+def capa_comunas(puntos):
+    """Un punto por ubicación (coordenadas exactas), como el mapa de nivel 2."""
+    grupos = {}
+    for p in puntos:
+        grupos.setdefault((p["lat"], p["lon"]), []).append(p)
+    features = []
+    for (lat, lon), grupo in grupos.items():
+        comuna = next((p["comuna"] for p in grupo if p.get("comuna")), None)
+        region = next((p["region"] for p in grupo if p.get("region")), None)
+        features.append(_feature(lat, lon, {"comuna": comuna, "region": region, **_resumen_grupo(grupo)}))
+    return _coleccion(features)
+
+
+def capa_clusters(puntos, tamaño_celda):
+    """Agrupa los puntos en celdas de la grilla; cada cluster va al centroide de sus puntos."""
+    celdas = {}
+    for p in puntos:
+        clave = (int(p["lat"] // tamaño_celda), int(p["lon"] // tamaño_celda))
+        celdas.setdefault(clave, []).append(p)
+    features = []
+    for grupo in celdas.values():
+        lat = sum(p["lat"] for p in grupo) / len(grupo)
+        lon = sum(p["lon"] for p in grupo) / len(grupo)
+        features.append(_feature(lat, lon, {
+            **_resumen_grupo(grupo),
+            "ejemplos": [p["id"] for p in grupo[:MAX_EJEMPLOS]],
+        }))
+    return _coleccion(features)
+
+
+def capa_puntos(puntos):
+    # Se conservan los None: el popup del mapa exige los mismos campos en todos los puntos
+    features = []
+    for p in puntos:
+        propiedades = {k: v for k, v in p.items() if k not in ("lat", "lon")}
+        features.append(_feature(p["lat"], p["lon"], propiedades))
+    return _coleccion(features)
+
+
+def generar_capas(puntos):
+    """Todas las capas a partir de la lista de puntos: {nombre: FeatureCollection}."""
+    capas = {
+        "tribunales": capa_tribunales(puntos),
+        "regiones": capa_regiones(puntos),
+        "comunas": capa_comunas(puntos),
+        "puntos": capa_puntos(puntos),
+    }
+    for zoom, tamaño in NIVELES_ZOOM.items():
+        capas[f"clusters_z{zoom}"] = capa_clusters(puntos, tamaño)
+    return capas
+
+
+def rangos_zoom():
+    """[(nombre_capa, zoom_min, zoom_max_exclusivo)] para alternar capas según el zoom."""
+    niveles = sorted(NIVELES_ZOOM)
+    rangos = []
+    for i, zoom in enumerate(niveles):
+        hasta = niveles[i + 1] if i + 1 < len(niveles) else ZOOM_PUNTOS
+        rangos.append((f"clusters_z{zoom}", 0 if i == 0 else zoom, hasta))
+    rangos.append(("puntos", ZOOM_PUNTOS, 99))
+    return rangos
+
+
+def _leer_cache(hash_actual):
+    if not MANIFIESTO_FILE.exists():
+        return None
+    try:
+        with open(MANIFIESTO_FILE, encoding="utf-8") as f:
+            manifiesto = json.load(f)
+        if manifiesto.get("hash") != hash_actual:
+            return None
+        capas = {}
+        for nombre in manifiesto["capas"]:
+            with open(CAPAS_DIR / f"{nombre}.geojson", encoding="utf-8") as f:
+                capas[nombre] = json.load(f)
+        return capas
+    except (OSError, KeyError, json.JSONDecodeError):
+        return None
+
+
+def _guardar_cache(capas, hash_actual):
+    CAPAS_DIR.mkdir(parents=True, exist_ok=True)
+    for nombre, capa in capas.items():
+        with open(CAPAS_DIR / f"{nombre}.geojson", "w", encoding="utf-8") as f:
+            json.dump(capa, f, ensure_ascii=False, separators=(",", ":"))
+    # El manifiesto se escribe al final: si falla a medio camino, no queda vigente
+    with open(MANIFIESTO_FILE, "w", encoding="utf-8") as f:
+        json.dump({"hash": hash_actual, "version": VERSION_CAPAS, "capas": sorted(capas)}, f, indent=2)
+
+
+def cargar_conflictos_mapa():
+    """Conflictos con coordenadas del dataset consolidado (lista vacía si no está disponible)."""
+    try:
+        from almacen_conflictos import cargar_registros
+        return cargar_registros(["id_maestro", "nombre", "region", "sector", "latitud", "longitud"])
+    except (ImportError, OSError, ValueError):
+        return []
+
+
+def construir_capas(causas, conflictos=None, refrescar=False):
+    """
+    Capas del mapa, desde la caché si los datos de entrada no cambiaron.
+
+    Args:
+        causas: geocodificacion.json["causas"]
+        conflictos: Registros del dataset consolidado (None = cargarlos)
+        refrescar: Regenerar aunque la caché esté vigente
+
+    Returns:
+        (capas, desde_cache)
+    """
+    if conflictos is None:
+        conflictos = cargar_conflictos_mapa()
+    puntos = puntos_de_causas(causas) + puntos_de_conflictos(conflictos)
+    hash_actual = hash_entrada(puntos)
+
+    if not refrescar:
+        capas = _leer_cache(hash_actual)
+        if capas is not None:
+            return capas, True
+
+    capas = generar_capas(puntos)
+    _guardar_cache(capas, hash_actual)
+    return capas, False
+
+
+def main(refrescar=False):
+    print("=" * 60)
+    print("CAPAS DEL MAPA")
+    print("=" * 60)
+
+    if not GEOCODIFICACION_FILE.exists():
+        print(f"ERROR: No existe {GEOCODIFICACION_FILE}. Ejecuta geocodificar_conflictos.py")
+        return None
+
+    with open(GEOCODIFICACION_FILE, encoding="utf-8") as f:
+        causas = json.load(f)["causas"]
+
+    capas, desde_cache = construir_capas(causas, refrescar=refrescar)
+    print(f"\nCapas {'en caché (sin cambios)' if desde_cache else 'generadas'} en {CAPAS_DIR}:")
+    for nombre, capa in capas.items():
+        print(f"  {nombre}: {len(capa['features'])} features")
+    return capas
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generar capas precalculadas del mapa')
+    parser.add_argument('--refrescar', action='store_true',
+                        help='Regenerar las capas aunque los datos no hayan cambiado')
+    args = parser.parse_args()
+
+    main(refrescar=args.refrescar)
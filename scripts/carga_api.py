@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de la API de la plataforma (api_plataforma.py).
+
+Abre N conexiones HTTP/1.1 keep-alive concurrentes (asyncio, sin
+dependencias) que piden durante un tiempo fijo una mezcla de URLs como la
+de los consumidores: listas filtradas, facetas, búsqueda, mapa y
+tribunales. Reporta peticiones por segundo, latencias (p50, p95, p99) y
+conteo de estados HTTP, en total y por URL.
+
+Con --etag cada conexión reenvía el último ETag de cada URL
+(If-None-Match) para medir las respuestas 304.
+
+Uso:
+    python api_plataforma.py &
+    python carga_api.py [--url http://127.0.0.1:8000] [--conexiones 50] [--duracion 10] [--etag]
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote, urlparse
+
+BASE_DIR = Path(__file__).parent.parent
+BENCHMARKS_DIR = BASE_DIR / "datos" / "benchmarks"
+
+# Mezcla de rutas (se repiten según su peso)
+MEZCLA = [
+    ("/conflictos", 3),
+    ("/conflictos?fuente=INDH&pagina=2", 2),
+    ("/conflictos?sector=Miner%C3%ADa&por_pagina=100", 2),
+    ("/facetas", 3),
+    ("/facetas?fuente=OCMAL&fuente=EJAtlas", 2),
+    ("/buscar?q=" + quote("relave"), 2),
+    ("/buscar?q=" + quote("agua") + "&tabla=sentencias&limite=10", 1),
+    ("/mapa?zoom=4", 2),
+    ("/mapa?zoom=7&extension=-38,-74,-32,-70&causas=1", 1),
+    ("/tribunales?dimension=a%C3%B1o&medida=causas", 2),
+    ("/tribunales/oficiales", 1),
+    ("/salud", 1),
+]
+
+
+def rutas_ponderadas(mezcla=MEZCLA):
+    return [ruta for ruta, peso in mezcla for _ in range(peso)]
+
+
+async def _leer_respuesta(lector):
+    """(estado, cabeceras, cuerpo) de una respuesta con Content-Length o chunked."""
+    linea = await lector.readline()
+    if not linea:
+        raise ConnectionError("Conexión cerrada por el servidor")
+    estado = int(linea.split()[1])
+    cabeceras = {}
+    while True:
+        linea = await lector.readline()
+        if linea in (b"\r\n", b"\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        cabeceras[nombre.strip().lower()] = valor.strip()
+
+    if cabeceras.get("transfer-encoding") == "chunked":
+        partes = []
+        while True:
+            tamano = int((await lector.readline()).strip(), 16)
+            if tamano == 0:
+                await lector.readline()
+                break
+            partes.append(await lector.readexactly(tamano))
+            await lector.readline()
+        return estado, cabeceras, b"".join(partes)
+    return estado, cabeceras, await lector.readexactly(int(cabeceras.get("content-length", 0)))
+
+
+async def _cliente(host, puerto, rutas, desfase, hasta, usar_etag, resultados):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    etags = {}
+    i = desfase
+    try:
+        while time.perf_counter() < hasta:
+            ruta = rutas[i % len(rutas)]
+            i += 1
+            peticion = f"GET {ruta} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n"
+            if usar_etag and ruta in etags:
+                peticion += f"If-None-Match: {etags[ruta]}\r\n"
+            inicio = time.perf_counter()
+            escritor.write((peticion + "\r\n").encode("latin-1"))
+            estado, cabeceras, cuerpo = await _leer_respuesta(lector)
+            resultados.append((ruta, estado, time.perf_counter() - inicio, len(cuerpo)))
+            if "etag" in cabeceras:
+                etags[ruta] = cabeceras["etag"]
+    finally:
+        escritor.close()
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def resumir(resultados, segundos):
+    latencias = [r[2] * 1000 for r in resultados]
+    resumen = {
+        "peticiones": len(resultados),
+        "peticiones_por_segundo": round(len(resultados) / segundos, 1),
+        "p50_ms": round(_percentil(latencias, 50), 2),
+        "p95_ms": round(_percentil(latencias, 95), 2),
+        "p99_ms": round(_percentil(latencias, 99), 2),
+        "media_ms": round(statistics.mean(latencias), 2),
+        "estados": dict(Counter(r[1] for r in resultados)),
+        "bytes": sum(r[3] for r in resultados),
+        "por_ruta": {},
+    }
+    por_ruta = defaultdict(list)
+    for ruta, estado, segundos_peticion, _ in resultados:
+        por_ruta[ruta].append(segundos_peticion * 1000)
+    for ruta, valores in sorted(por_ruta.items()):
+        resumen["por_ruta"][ruta] = {"n": len(valores), "p50_ms": round(_percentil(valores, 50), 2),
+                                     "p99_ms": round(_percentil(valores, 99), 2)}
+    return resumen
+
+
+async def cargar(url, conexiones, duracion, usar_etag=False):
+    destino = urlparse(url)
+    host, puerto = destino.hostname, destino.port or 80
+    rutas = rutas_ponderadas()
+    resultados = []
+    inicio = time.perf_counter()
+    hasta = inicio + duracion
+    errores = await asyncio.gather(
+        *[_cliente(host, puerto, rutas, i, hasta, usar_etag, resultados) for i in range(conexiones)],
+        return_exceptions=True)
+    segundos = time.perf_counter() - inicio
+    fallidas = [e for e in errores if isinstance(e, Exception)]
+    return resultados, segundos, fallidas
+
+
+def main(url="http://127.0.0.1:8000", conexiones=50, duracion=10.0, usar_etag=False, guardar=False):
+    print("=" * 60)
+    print("PRUEBA DE CARGA - API DE LA PLATAFORMA")
+    print("=" * 60)
+    print(f"\n{url}: {conexiones} conexiones, {duracion:.0f} s{' (con If-None-Match)' if usar_etag else ''}")
+
+    resultados, segundos, fallidas = asyncio.run(cargar(url, conexiones, duracion, usar_etag))
+    if fallidas:
+        print(f"\n{len(fallidas)} conexiones con error: {fallidas[0]!r}")
+    if not resultados:
+        print("ERROR: Sin respuestas. ¿Está corriendo api_plataforma.py?")
+        return None
+
+    resumen = resumir(resultados, segundos)
+    print(f"\n{resumen['peticiones']} peticiones en {segundos:.1f} s: "
+          f"{resumen['peticiones_por_segundo']} req/s")
+    print(f"Latencia: p50 {resumen['p50_ms']} ms, p95 {resumen['p95_ms']} ms, "
+          f"p99 {resumen['p99_ms']} ms")
+    print(f"Estados: {resumen['estados']}   ({resumen['bytes'] / 1e6:.1f} MB recibidos)")
+    print(f"\n{'Ruta':<58} {'n':>6} {'p50 ms':>8} {'p99 ms':>8}")
+    for ruta, r in resumen["por_ruta"].items():
+        print(f"{ruta[:58]:<58} {r['n']:>6} {r['p50_ms']:>8} {r['p99_ms']:>8}")
+
+    if guardar:
+        BENCHMARKS_DIR.mkdir(parents=True, exist_ok=True)
+        archivo = BENCHMARKS_DIR / f"carga_api_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(archivo, "w", encoding="utf-8") as f:
+            json.dump({"fecha": datetime.now().isoformat(), "url": url, "conexiones": conexiones,
+                       "duracion": duracion, "etag": usar_etag, **resumen}, f, ensure_ascii=False, indent=2)
+        print(f"\nGuardado: {archivo}")
+    return resumen
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Prueba de carga de la API de la plataforma')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='URL base de la API')
+    parser.add_argument('--conexiones', type=int, default=50, help='Conexiones concurrentes (default: 50)')
+    parser.add_argument('--duracion', type=float, default=10.0, help='Segundos de carga (default: 10)')
+    parser.add_argument('--etag', action='store_true', help='Reenviar ETag (If-None-Match)')
+    parser.add_argument('--guardar', action='store_true', help='Guardar en datos/benchmarks/')
+    args = parser.parse_args()
+
+    main(args.url, args.conexiones, args.duracion, args.etag, args.guardar)
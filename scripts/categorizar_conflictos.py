@@ -11,10 +11,15 @@ Extrae categorías adicionales del texto de descripción:
 
 import json
 import re
+import sys
 from pathlib import Path
 from collections import Counter
 from html import unescape
 
+sys.path.insert(0, str(Path(__file__).parent))
+
+from instrumentacion import contar, ejecucion, fase
+
 BASE_DIR = Path(__file__).parent.parent
 DATOS_DIR = BASE_DIR / "datos" / "conflictos"
 
@@ -143,8 +148,9 @@ def main():
     print("=" * 60)
 
     # Cargar datos
-    with open(DATOS_DIR / "conflictos_integrados.json", encoding="utf-8") as f:
+    with fase("cargar"), open(DATOS_DIR / "conflictos_integrados.json", encoding="utf-8") as f:
         conflictos = json.load(f)
+    contar("conflictos", len(conflictos))
 
     print(f"\nTotal conflictos: {len(conflictos)}")
 
@@ -158,18 +164,19 @@ def main():
 
     conflictos_categorizados = []
 
-    for c in conflictos:
-        categorias = analizar_conflicto(c)
+    with fase("categorizar"):
+        for c in conflictos:
+            categorias = analizar_conflicto(c)
 
-        # Actualizar estadísticas
-        for tipo, lista in categorias.items():
-            for cat in lista:
-                stats[tipo][cat] += 1
+            # Actualizar estadísticas
+            for tipo, lista in categorias.items():
+                for cat in lista:
+                    stats[tipo][cat] += 1
 
-        # Agregar categorías al conflicto
-        c_nuevo = c.copy()
-        c_nuevo["categorias"] = categorias
-        conflictos_categorizados.append(c_nuevo)
+            # Agregar categorías al conflicto
+            c_nuevo = c.copy()
+            c_nuevo["categorias"] = categorias
+            conflictos_categorizados.append(c_nuevo)
 
     # Mostrar resultados
     print("\n" + "=" * 60)
@@ -202,7 +209,7 @@ def main():
 
     # Guardar conflictos categorizados (sobrescribe el archivo integrado)
     output_file = DATOS_DIR / "conflictos_integrados.json"
-    with open(output_file, "w", encoding="utf-8") as f:
+    with fase("guardar"), open(output_file, "w", encoding="utf-8") as f:
         json.dump(conflictos_categorizados, f, ensure_ascii=False, indent=2)
     print(f"\nDataset consolidado actualizado: {output_file}")
 
@@ -226,4 +233,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with ejecucion("categorizar_conflictos"):
+        main()
@@ -10,18 +10,40 @@ Estructura resultante:
   - en_ocmal, id_ocmal, nombre_ocmal
 
 Esto permite ver qué conflictos están documentados en múltiples fuentes.
+
+Los id_maestro son estables entre ejecuciones: se guardan en un registro
+persistente (registro_ids.json) indexado por los IDs de cada fuente. Con
+--incremental solo se recategorizan los registros cuyo contenido cambió, y
+cada ejecución agrega sus inserciones/actualizaciones/eliminaciones a
+cambios_consolidacion.json.
+
+Uso:
+    python consolidar_con_ids.py [--incremental]
 """
 
 import sys
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
 import json
+import hashlib
+from datetime import datetime
 from pathlib import Path
 from collections import Counter
 import re
 
+sys.path.insert(0, str(Path(__file__).parent))
+
+from almacen_conflictos import guardar_parquet, ruta_parquet
+from instrumentacion import contar, ejecucion, fase, medido
+
 BASE_DIR = Path(__file__).parent.parent
 DATOS_DIR = BASE_DIR / "datos" / "conflictos"
+REGISTRO_IDS_FILE = DATOS_DIR / "registro_ids.json"
+CAMBIOS_FILE = DATOS_DIR / "cambios_consolidacion.json"
+
+# Cambiar cuando cambien los patrones de categorizar_conflicto o la forma de
+# los registros: forma parte del hash, así que el modo incremental los rehace
+VERSION_CATEGORIZACION = 1
 
 
 def normalizar_texto(texto):
@@ -39,6 +61,7 @@ def normalizar_texto(texto):
     return texto.strip()
 
 
+@medido()
 def cargar_fuentes_originales():
     """Carga las tres fuentes originales."""
     # INDH
@@ -257,8 +280,278 @@ def inferir_categorias_faltantes(registro):
 
     return reg
 
+# ============================================================
+# CONSTRUCCIÓN DE REGISTROS CONSOLIDADOS
+# ============================================================
+
+def registro_indh(c, info_ej, info_oc, id_maestro):
+    """Construye el registro consolidado de un conflicto INDH."""
+    # Categorizar automáticamente
+    cats = categorizar_conflicto(c["nombre"], c["descripcion"])
+
+    registro = {
+        "id_maestro": id_maestro,
+        "fuente_principal": "INDH",
+        "id_indh": c["id"],
+        "nombre": c["nombre"],
+        "descripcion": c["descripcion"],
+        "region": c["region"],
+        "localidad": c["localidad"],
+        "latitud": c["latitud"],
+        "longitud": c["longitud"],
+        "sector": c["sector"],
+        "estado": c["estado"],
+        "año_inicio": c["año_inicio"],
+        "territorio_indigena": c["territorio_indigena"],
+        "url_indh": c["url"],
+        # Campos de duplicados
+        "en_ejatlas": False,
+        "id_ejatlas": None,
+        "nombre_ejatlas": None,
+        "url_ejatlas": None,
+        "en_ocmal": False,
+        "id_ocmal": None,
+        "nombre_ocmal": None,
+        "url_ocmal": None,
+        # Categorías
+        "impactos": cats.get("impactos", []),
+        "actores": cats.get("actores", []),
+        "resistencias": cats.get("resistencias", []),
+        "resultados": cats.get("resultados", [])
+    }
+
+    # Verificar si está en EJAtlas
+    if info_ej:
+        registro["en_ejatlas"] = True
+        registro["id_ejatlas"] = info_ej["id"]
+        registro["nombre_ejatlas"] = info_ej["nombre"]
+        registro["url_ejatlas"] = info_ej["url"]
+
+    # Verificar si está en OCMAL
+    if info_oc:
+        registro["en_ocmal"] = True
+        registro["id_ocmal"] = info_oc["id"]
+        registro["nombre_ocmal"] = info_oc["nombre"]
+        registro["url_ocmal"] = info_oc["url"]
+
+    return registro
+
+
+def registro_ejatlas(c, info_oc, id_maestro):
+    """Construye el registro consolidado de un conflicto EJAtlas único."""
+    cats = categorizar_conflicto(c["nombre"], c["descripcion"])
+
+    registro = {
+        "id_maestro": id_maestro,
+        "fuente_principal": "EJAtlas",
+        "id_indh": None,
+        "nombre": c["nombre"],
+        "descripcion": c["descripcion"],
+        "region": "",
+        "localidad": "",
+        "latitud": None,
+        "longitud": None,
+        "sector": "",
+        "estado": "",
+        "año_inicio": None,
+        "territorio_indigena": None,
+        "url_indh": None,
+        "en_ejatlas": True,
+        "id_ejatlas": c["id"],
+        "nombre_ejatlas": c["nombre"],
+        "url_ejatlas": c["url"],
+        "en_ocmal": False,
+        "id_ocmal": None,
+        "nombre_ocmal": None,
+        "url_ocmal": None,
+        # Categorías
+        "impactos": cats.get("impactos", []),
+        "actores": cats.get("actores", []),
+        "resistencias": cats.get("resistencias", []),
+        "resultados": cats.get("resultados", [])
+    }
+
+    # Verificar si está en OCMAL (duplicado EJAtlas-OCMAL)
+    if info_oc:
+        registro["en_ocmal"] = True
+        registro["id_ocmal"] = info_oc["id"]
+        registro["nombre_ocmal"] = info_oc["nombre"]
+        registro["url_ocmal"] = info_oc["url"]
+
+    return registro
+
+
+def registro_ocmal(c, id_maestro):
+    """Construye el registro consolidado de un conflicto OCMAL único."""
+    # Categorizar automáticamente (OCMAL no tiene descripción)
+    cats = categorizar_conflicto(c["nombre"], "")
+
+    return {
+        "id_maestro": id_maestro,
+        "fuente_principal": "OCMAL",
+        "id_indh": None,
+        "nombre": c["nombre"],
+        "descripcion": "",
+        "region": c.get("region", ""),
+        "localidad": c.get("ubicacion", ""),
+        "latitud": None,
+        "longitud": None,
+        "sector": "Minería",
+        "estado": "",
+        "año_inicio": c.get("año_inicio"),
+        "territorio_indigena": None,
+        "url_indh": None,
+        "en_ejatlas": False,
+        "id_ejatlas": None,
+        "nombre_ejatlas": None,
+        "url_ejatlas": None,
+        "en_ocmal": True,
+        "id_ocmal": c["id"],
+        "nombre_ocmal": c["nombre"],
+        "url_ocmal": c["url"],
+        # Categorías
+        "impactos": cats.get("impactos", []),
+        "actores": cats.get("actores", []),
+        "resistencias": cats.get("resistencias", []),
+        "resultados": cats.get("resultados", [])
+    }
+
+
+# ============================================================
+# REGISTRO PERSISTENTE DE IDs Y CAMBIOS
+# ============================================================
+
+def claves_fuente(id_indh=None, id_ejatlas=None, id_ocmal=None):
+    """
+    Claves de fuente de un conflicto, en orden de prioridad.
+    Ej: ["indh:111", "ejatlas:2345"]
+    """
+    claves = []
+    if id_indh is not None:
+        claves.append(f"indh:{id_indh}")
+    if id_ejatlas is not None:
+        claves.append(f"ejatlas:{id_ejatlas}")
+    if id_ocmal is not None:
+        claves.append(f"ocmal:{id_ocmal}")
+    return claves
+
+
+def hash_contenido(fuentes):
+    """Hash estable del contenido de los registros fuente de un conflicto
+    y de la versión de las reglas con que se construye el registro."""
+    payload = json.dumps([VERSION_CATEGORIZACION, fuentes], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+@medido()
+def cargar_dataset_previo():
+    """Carga el último dataset BASE consolidado, indexado por id_maestro."""
+    archivo = DATOS_DIR / "conflictos_consolidados_ids.json"
+    if not archivo.exists():
+        return {}
+    with open(archivo, encoding="utf-8") as f:
+        return {r["id_maestro"]: r for r in json.load(f)}
+
+
+def cargar_registro_ids(previos):
+    """
+    Carga el registro persistente de IDs maestros.
+
+    Si aún no existe, se siembra desde el dataset previo para conservar
+    los id_maestro ya publicados.
+    """
+    if REGISTRO_IDS_FILE.exists():
+        with open(REGISTRO_IDS_FILE, encoding="utf-8") as f:
+            return json.load(f)
+
+    registro_ids = {"ultimo_id": 0, "claves": {}, "hashes": {}}
+    for id_maestro, r in previos.items():
+        for clave in claves_fuente(r.get("id_indh"), r.get("id_ejatlas"), r.get("id_ocmal")):
+            registro_ids["claves"].setdefault(clave, id_maestro)
+        numero = int(id_maestro.split("-")[1])
+        registro_ids["ultimo_id"] = max(registro_ids["ultimo_id"], numero)
+    return registro_ids
+
+
+def asignar_id_maestro(registro_ids, claves, usados):
+    """
+    Retorna el id_maestro de un conflicto según sus claves de fuente.
 
-def main():
+    Reutiliza el ID de la primera clave ya registrada que no haya sido tomada
+    por otro conflicto en esta ejecución; si no hay, asigna uno nuevo.
+    """
+    id_maestro = None
+    for clave in claves:
+        candidato = registro_ids["claves"].get(clave)
+        if candidato and candidato not in usados:
+            id_maestro = candidato
+            break
+
+    if id_maestro is None:
+        registro_ids["ultimo_id"] += 1
+        id_maestro = f"CONF-{registro_ids['ultimo_id']:04d}"
+
+    for clave in claves:
+        registro_ids["claves"][clave] = id_maestro
+    usados.add(id_maestro)
+    return id_maestro
+
+
+def consolidar_registro(contexto, claves, fuentes, constructor):
+    """
+    Asigna el id_maestro estable y construye el registro consolidado.
+
+    En modo incremental, si el hash de las fuentes coincide con el de la
+    ejecución anterior se reutiliza el registro previo sin recategorizar.
+    """
+    registro_ids = contexto["registro_ids"]
+    id_maestro = asignar_id_maestro(registro_ids, claves, contexto["usados"])
+    h = hash_contenido(fuentes)
+
+    previo = contexto["previos"].get(id_maestro)
+    if contexto["incremental"] and previo and registro_ids["hashes"].get(id_maestro) == h:
+        contexto["reutilizados"] += 1
+        return previo
+
+    registro_ids["hashes"][id_maestro] = h
+    contexto["procesados"] += 1
+    return constructor(*fuentes, id_maestro)
+
+
+def calcular_cambios(previos, dataset):
+    """Compara el dataset nuevo con el previo y retorna inserts/updates/deletes."""
+    nuevos = {r["id_maestro"]: r for r in dataset}
+    return {
+        "insertados": [i for i in nuevos if i not in previos],
+        "actualizados": [i for i, r in nuevos.items() if i in previos and previos[i] != r],
+        "eliminados": [i for i in previos if i not in nuevos],
+    }
+
+
+@medido()
+def guardar_registro_y_cambios(registro_ids, cambios, incremental):
+    """Persiste el registro de IDs y agrega la entrada de cambios al historial."""
+    # Descartar hashes de IDs que ya no existen
+    vigentes = set(registro_ids["claves"].values())
+    registro_ids["hashes"] = {i: h for i, h in registro_ids["hashes"].items() if i in vigentes}
+
+    with open(REGISTRO_IDS_FILE, "w", encoding="utf-8") as f:
+        json.dump(registro_ids, f, ensure_ascii=False, indent=2)
+
+    historial = []
+    if CAMBIOS_FILE.exists():
+        with open(CAMBIOS_FILE, encoding="utf-8") as f:
+            historial = json.load(f)
+    historial.append({
+        "fecha": datetime.now().isoformat(),
+        "modo": "incremental" if incremental else "completo",
+        **cambios
+    })
+    with open(CAMBIOS_FILE, "w", encoding="utf-8") as f:
+        json.dump(historial, f, ensure_ascii=False, indent=2)
+
+
+def main(incremental=False):
     print("=" * 60)
     print("CONSOLIDACIÓN CON IDs MAESTROS")
     print("=" * 60)
@@ -305,159 +598,68 @@ def main():
     print(f"  OCMAL → INDH: {len(ocmal_duplicados)}")
     print(f"  EJAtlas → OCMAL: {len(ejatlas_ocmal_duplicados)}")
 
-    # Construir dataset consolidado
+    # Construir dataset consolidado con IDs estables
+    previos = cargar_dataset_previo()
+    contexto = {
+        "registro_ids": cargar_registro_ids(previos),
+        "previos": previos,
+        "usados": set(),
+        "incremental": incremental,
+        "procesados": 0,
+        "reutilizados": 0,
+    }
     dataset = []
-    id_maestro = 1
-
-    # 1. Agregar todos los INDH con info de duplicados
-    nombres_ejatlas_usados = set()
-    nombres_ocmal_usados = set()
-
-    for c in indh:
-        # Categorizar automáticamente
-        cats = categorizar_conflicto(c["nombre"], c["descripcion"])
-
-        registro = {
-            "id_maestro": f"CONF-{id_maestro:04d}",
-            "fuente_principal": "INDH",
-            "id_indh": c["id"],
-            "nombre": c["nombre"],
-            "descripcion": c["descripcion"],
-            "region": c["region"],
-            "localidad": c["localidad"],
-            "latitud": c["latitud"],
-            "longitud": c["longitud"],
-            "sector": c["sector"],
-            "estado": c["estado"],
-            "año_inicio": c["año_inicio"],
-            "territorio_indigena": c["territorio_indigena"],
-            "url_indh": c["url"],
-            # Campos de duplicados
-            "en_ejatlas": False,
-            "id_ejatlas": None,
-            "nombre_ejatlas": None,
-            "url_ejatlas": None,
-            "en_ocmal": False,
-            "id_ocmal": None,
-            "nombre_ocmal": None,
-            "url_ocmal": None,
-            # Categorías
-            "impactos": cats.get("impactos", []),
-            "actores": cats.get("actores", []),
-            "resistencias": cats.get("resistencias", []),
-            "resultados": cats.get("resultados", [])
-        }
-
-        # Verificar si está en EJAtlas
-        if c["nombre"] in ejatlas_duplicados:
-            info_ej = ejatlas_duplicados[c["nombre"]]
-            registro["en_ejatlas"] = True
-            registro["id_ejatlas"] = info_ej["id"]
-            registro["nombre_ejatlas"] = info_ej["nombre"]
-            registro["url_ejatlas"] = info_ej["url"]
-            nombres_ejatlas_usados.add(info_ej["nombre"])
-
-        # Verificar si está en OCMAL
-        if c["nombre"] in ocmal_duplicados:
-            info_oc = ocmal_duplicados[c["nombre"]]
-            registro["en_ocmal"] = True
-            registro["id_ocmal"] = info_oc["id"]
-            registro["nombre_ocmal"] = info_oc["nombre"]
-            registro["url_ocmal"] = info_oc["url"]
-            nombres_ocmal_usados.add(info_oc["nombre"])
-
-        dataset.append(registro)
-        id_maestro += 1
-
-    # 2. Agregar EJAtlas únicos (no duplicados de INDH)
-    ejatlas_unicos = 0
-    for c in ejatlas:
-        if c["nombre"] not in nombres_ejatlas_usados:
-            # Categorizar automáticamente
-            cats = categorizar_conflicto(c["nombre"], c["descripcion"])
-
-            registro = {
-                "id_maestro": f"CONF-{id_maestro:04d}",
-                "fuente_principal": "EJAtlas",
-                "id_indh": None,
-                "nombre": c["nombre"],
-                "descripcion": c["descripcion"],
-                "region": "",
-                "localidad": "",
-                "latitud": None,
-                "longitud": None,
-                "sector": "",
-                "estado": "",
-                "año_inicio": None,
-                "territorio_indigena": None,
-                "url_indh": None,
-                "en_ejatlas": True,
-                "id_ejatlas": c["id"],
-                "nombre_ejatlas": c["nombre"],
-                "url_ejatlas": c["url"],
-                "en_ocmal": False,
-                "id_ocmal": None,
-                "nombre_ocmal": None,
-                "url_ocmal": None,
-                # Categorías
-                "impactos": cats.get("impactos", []),
-                "actores": cats.get("actores", []),
-                "resistencias": cats.get("resistencias", []),
-                "resultados": cats.get("resultados", [])
-            }
-
-            # Verificar si está en OCMAL (duplicado EJAtlas-OCMAL)
-            if c["nombre"] in ejatlas_ocmal_duplicados:
-                info_oc = ejatlas_ocmal_duplicados[c["nombre"]]
-                registro["en_ocmal"] = True
-                registro["id_ocmal"] = info_oc["id"]
-                registro["nombre_ocmal"] = info_oc["nombre"]
-                registro["url_ocmal"] = info_oc["url"]
+
+    # Una sola fase para todos los registros: medir cada categorización por
+    # separado costaría más que la propia categorización
+    with fase("categorizar"):
+        # 1. Agregar todos los INDH con info de duplicados
+        nombres_ejatlas_usados = set()
+        nombres_ocmal_usados = set()
+
+        for c in indh:
+            info_ej = ejatlas_duplicados.get(c["nombre"])
+            info_oc = ocmal_duplicados.get(c["nombre"])
+            if info_ej:
+                nombres_ejatlas_usados.add(info_ej["nombre"])
+            if info_oc:
                 nombres_ocmal_usados.add(info_oc["nombre"])
 
-            dataset.append(registro)
-            id_maestro += 1
-            ejatlas_unicos += 1
-
-    # 3. Agregar OCMAL únicos (no duplicados)
-    ocmal_unicos = 0
-    for c in ocmal:
-        if c["nombre"] not in nombres_ocmal_usados:
-            # Categorizar automáticamente (OCMAL no tiene descripción)
-            cats = categorizar_conflicto(c["nombre"], "")
-
-            registro = {
-                "id_maestro": f"CONF-{id_maestro:04d}",
-                "fuente_principal": "OCMAL",
-                "id_indh": None,
-                "nombre": c["nombre"],
-                "descripcion": "",
-                "region": c.get("region", ""),
-                "localidad": c.get("ubicacion", ""),
-                "latitud": None,
-                "longitud": None,
-                "sector": "Minería",
-                "estado": "",
-                "año_inicio": c.get("año_inicio"),
-                "territorio_indigena": None,
-                "url_indh": None,
-                "en_ejatlas": False,
-                "id_ejatlas": None,
-                "nombre_ejatlas": None,
-                "url_ejatlas": None,
-                "en_ocmal": True,
-                "id_ocmal": c["id"],
-                "nombre_ocmal": c["nombre"],
-                "url_ocmal": c["url"],
-                # Categorías
-                "impactos": cats.get("impactos", []),
-                "actores": cats.get("actores", []),
-                "resistencias": cats.get("resistencias", []),
-                "resultados": cats.get("resultados", [])
-            }
-            dataset.append(registro)
-            id_maestro += 1
-            ocmal_unicos += 1
+            claves = claves_fuente(c["id"], info_ej and info_ej["id"], info_oc and info_oc["id"])
+            dataset.append(consolidar_registro(contexto, claves, (c, info_ej, info_oc), registro_indh))
+
+        # 2. Agregar EJAtlas únicos (no duplicados de INDH)
+        ejatlas_unicos = 0
+        for c in ejatlas:
+            if c["nombre"] not in nombres_ejatlas_usados:
+                info_oc = ejatlas_ocmal_duplicados.get(c["nombre"])
+                if info_oc:
+                    nombres_ocmal_usados.add(info_oc["nombre"])
+
+                claves = claves_fuente(None, c["id"], info_oc and info_oc["id"])
+                dataset.append(consolidar_registro(contexto, claves, (c, info_oc), registro_ejatlas))
+                ejatlas_unicos += 1
+
+        # 3. Agregar OCMAL únicos (no duplicados)
+        ocmal_unicos = 0
+        for c in ocmal:
+            if c["nombre"] not in nombres_ocmal_usados:
+                claves = claves_fuente(None, None, c["id"])
+                dataset.append(consolidar_registro(contexto, claves, (c,), registro_ocmal))
+                ocmal_unicos += 1
+
+    contar("registros", len(dataset))
+    contar("registros_procesados", contexto["procesados"])
+    contar("registros_reutilizados", contexto["reutilizados"])
+
+    cambios = calcular_cambios(previos, dataset)
+    print(f"\nModo: {'incremental' if incremental else 'completo'}")
+    print(f"  Registros procesados: {contexto['procesados']}")
+    print(f"  Registros reutilizados: {contexto['reutilizados']}")
+    print(f"\nCambios respecto a la ejecución anterior:")
+    print(f"  Insertados: {len(cambios['insertados'])}")
+    print(f"  Actualizados: {len(cambios['actualizados'])}")
+    print(f"  Eliminados: {len(cambios['eliminados'])}")
 
     # Estadísticas
     print(f"\n" + "=" * 60)
@@ -492,6 +694,8 @@ def main():
     with open(output_base, "w", encoding="utf-8") as f:
         json.dump(dataset, f, ensure_ascii=False, indent=2)
     print(f"\n[1] Dataset BASE guardado: {output_base}")
+    if guardar_parquet(dataset, ruta_parquet("ids")):
+        print(f"    Parquet: {ruta_parquet('ids')}")
 
     # 2. VERSION COMPLETA: con categorías inferidas para registros sin datos
     dataset_completo = [inferir_categorias_faltantes(r) for r in dataset]
@@ -500,6 +704,8 @@ def main():
     with open(output_completo, "w", encoding="utf-8") as f:
         json.dump(dataset_completo, f, ensure_ascii=False, indent=2)
     print(f"[2] Dataset COMPLETO guardado: {output_completo}")
+    if guardar_parquet(dataset_completo, ruta_parquet("completo")):
+        print(f"    Parquet: {ruta_parquet('completo')}")
 
     # Estadísticas de inferencia
     inferidos_impactos = sum(1 for r in dataset_completo if r.get("impactos_inferido"))
@@ -543,6 +749,10 @@ def main():
         writer.writerows(dataset_completo)
     print(f"CSV COMPLETO: {csv_completo}")
 
+    guardar_registro_y_cambios(contexto["registro_ids"], cambios, incremental)
+    print(f"\nRegistro de IDs: {REGISTRO_IDS_FILE}")
+    print(f"Historial de cambios: {CAMBIOS_FILE}")
+
     # Mostrar ejemplos de conflictos en múltiples fuentes
     print(f"\n" + "=" * 60)
     print("EJEMPLOS DE CONFLICTOS EN MÚLTIPLES FUENTES")
@@ -566,4 +776,12 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Consolidar conflictos con IDs maestros')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Solo recategorizar registros nuevos o modificados')
+    args = parser.parse_args()
+
+    with ejecucion("consolidar_con_ids", parametros=vars(args)):
+        main(incremental=args.incremental)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Generador de corpus sintéticos para benchmarks.
+
+Produce, con una semilla fija y a la escala pedida:
+- Documentos con nombres de archivo al estilo de cada tribunal (1TA, 2TA,
+  3TA), incluyendo boletines, síntesis, resoluciones e informes que los
+  filtros deben descartar. Con --pdfs se escriben como PDF de una página;
+  si no, como archivos vacíos (solo importa el nombre)
+- Textos de sentencias en español jurídico con comunas, regiones, citas a
+  otras causas y frases "ubicado en ..." como las del corpus real
+- Registros de conflictos con nombre, descripción, región, coordenadas y
+  duplicados aproximados entre fuentes
+
+No usa datos reales: sirve para medir el pipeline sin el corpus privado.
+
+Uso:
+    python corpus_sintetico.py DIRECTORIO [--documentos N] [--conflictos N] [--pdfs]
+
+Estructura generada:
+    DIRECTORIO/documentos/{1ta,sentencias,3ta}/...
+    DIRECTORIO/textos/*.txt
+    DIRECTORIO/conflictos.json
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import json
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from datos_geograficos_chile import COMUNAS_CHILE, JURISDICCION_TRIBUNALES, REGIONES_CHILE
+
+SEMILLA = 2024
+
+# Directorio de documentos de cada tribunal (como en descarga_completa/documentos)
+DIRECTORIOS_TRIBUNAL = {"1TA": "1ta", "2TA": "sentencias", "3TA": "3ta"}
+
+# Estilos de nombre de archivo observados en cada tribunal
+ESTILOS_NOMBRE = {
+    "1TA": [
+        "Sentencia-{t}-{n}-{a}.pdf",
+        "{t}-{n}-{a}_Sentencia_Definitiva.pdf",
+        "Sentencia_{t}_{n}_{a}.pdf",
+    ],
+    "2TA": [
+        "Sentencia_Rol_{t}-{n}-{a}.pdf",
+        "{t}{n}-{a}-sentencia.pdf",
+        "Sentencia-Rol-N°-{n}-{a}.pdf",
+        "Sentencia-{t}-{n}-{a}-Casacion-CS.pdf",
+    ],
+    "3TA": [
+        "3TA-{t}-{n}-{a}-Sentencia.pdf",
+        "Sentencia_{t}_{n}_{a}_casacion.pdf",
+        "{t}{n}.{a} sentencia reemplazo.docx",
+        "Sentencia-{t}-{n}-{a}.doc",
+    ],
+}
+
+# Documentos que no son sentencias (deben ser excluidos o clasificados aparte)
+ESTILOS_RUIDO = [
+    "Boletin_Jurisprudencia_{a}.pdf",
+    "Sintesis-{t}-{n}-{a}.pdf",
+    "Resolucion-{t}-{n}-{a}.pdf",
+    "Informe_pericial_{t}-{n}-{a}.pdf",
+    "Informe-en-Derecho-{t}-{n}-{a}.pdf",
+    "Acta_sesion_{a}.pdf",
+    "Anuario_{a}.pdf",
+]
+PROPORCION_RUIDO = 0.2
+
+TIPOS_CAUSA = ["R"] * 6 + ["D"] * 2 + ["S"]
+
+PROYECTOS = [
+    "Central Termoeléctrica", "Proyecto Minero", "Planta de Celulosa", "Parque Eólico",
+    "Central Hidroeléctrica", "Relleno Sanitario", "Piscicultura", "Puerto", "Planta Desaladora",
+    "Proyecto Inmobiliario", "Fundición", "Línea de Transmisión",
+]
+NOMBRES_PROPIOS = [
+    "Los Robles", "El Morro", "Alto Maipo", "Punta Alcalde", "Pascua Lama", "Dominga",
+    "Río Cuervo", "Santa María", "Las Lajas", "Cerro Dominador", "Mina Invierno", "Neltume",
+    "Quebrada Blanca", "Los Bronces", "Nueva Unión", "Tres Puntas",
+]
+EMPRESAS = ["Minera del Norte S.A.", "Energía Austral SpA", "Celulosa Arauco y Constitución S.A.",
+            "Inversiones El Bosque Ltda.", "Salmones del Sur S.A.", "Aguas Andinas S.A."]
+SECTORES = ["Minería", "Energía", "Forestal", "Acuicultura", "Infraestructura", "Saneamiento"]
+ESTADOS = ["Activo", "Latente", "Cerrado"]
+FUENTES = ["INDH", "EJAtlas", "OCMAL"]
+
+FRASES_CONFLICTO = [
+    "La comunidad denuncia contaminación del agua y la afectación del acuífero",
+    "Vecinos reclaman por emisiones de material particulado MP2.5 y olores",
+    "Comunidades mapuche acusan daño a sitios ceremoniales y al territorio indígena",
+    "Pescadores artesanales reportan mortandad de peces y pérdida de biodiversidad",
+    "Se presentó un recurso de protección ante la Corte de Apelaciones",
+    "Las organizaciones realizaron marchas y movilizaciones durante meses",
+    "El proyecto fue paralizado por resolución judicial",
+    "El proyecto fue aprobado por el Servicio de Evaluación Ambiental",
+    "La causa se encuentra en tramitación ante el Tribunal Ambiental",
+    "Agricultores advierten sobre la sequía y los derechos de agua",
+    "Se registraron impactos en la salud de la población cercana",
+]
+
+PARRAFOS_SENTENCIA = [
+    "VISTOS: Con fecha {fecha}, {empresa} interpuso reclamación en contra de la Resolución Exenta "
+    "N° {resolucion} de la Superintendencia del Medio Ambiente, relativa al proyecto \"{proyecto}\".",
+    "El proyecto se encuentra ubicado en la comuna de {comuna}, Región de {region}, y consiste en "
+    "la construcción y operación de una {instalacion}.",
+    "Que, a fojas {fojas}, la reclamante sostiene que la autoridad no consideró adecuadamente los "
+    "antecedentes del expediente de evaluación ambiental.",
+    "Que, según consta en autos, las obras se emplazan en el sector {sector} de {comuna}, a "
+    "{km} kilómetros del límite comunal.",
+    "Que, como ha resuelto esta Magistratura en causa Rol {rol_citado}, la motivación del acto "
+    "administrativo es un requisito de su validez.",
+    "Que la Corte Suprema, en causa Rol N° {rol_cs}, sostuvo un criterio análogo respecto de la "
+    "participación ciudadana en la Región de {region_citada}.",
+    "Que los informes técnicos acompañados dan cuenta de efectos sobre el recurso hídrico, la "
+    "calidad del aire y los sistemas de vida de las comunidades del área de influencia.",
+    "CONSIDERANDO: Que el artículo 17 N° {numeral} de la Ley N° 20.600 otorga competencia a este "
+    "Tribunal para conocer de la presente reclamación.",
+    "Que la comuna de {comuna_vecina} también forma parte del área de influencia del proyecto.",
+    "SE RESUELVE: {resultado} la reclamación interpuesta, sin costas. Regístrese y notifíquese. "
+    "Rol {rol}.",
+]
+INSTALACIONES = ["planta de tratamiento", "central de generación", "faena minera", "línea de transmisión",
+                 "piscicultura en tierra", "planta desaladora"]
+SECTORES_GEOGRAFICOS = ["Las Vertientes", "El Salto", "La Greda", "Punta Chungo", "Ventanas", "Los Maitenes"]
+RESULTADOS = ["Se acoge", "Se rechaza", "Se acoge parcialmente"]
+
+
+def _rol(rng, tipo=None):
+    return f"{tipo or rng.choice(TIPOS_CAUSA)}-{rng.randint(1, 450)}-{rng.randint(2013, 2025)}"
+
+
+def generar_nombres_documentos(n, rng):
+    """
+    Lista de (tribunal, directorio, nombre_archivo, rol) con los estilos de cada tribunal.
+
+    Los nombres son únicos; cerca de PROPORCION_RUIDO no son sentencias.
+    """
+    documentos = []
+    usados = set()
+    while len(documentos) < n:
+        tribunal = rng.choice(list(ESTILOS_NOMBRE))
+        tipo, numero, año = rng.choice(TIPOS_CAUSA), rng.randint(1, 450), rng.randint(2013, 2025)
+        estilos = ESTILOS_RUIDO if rng.random() < PROPORCION_RUIDO else ESTILOS_NOMBRE[tribunal]
+        nombre = rng.choice(estilos).format(t=tipo, n=numero, a=año)
+        if (tribunal, nombre) in usados:
+            continue
+        usados.add((tribunal, nombre))
+        documentos.append((tribunal, DIRECTORIOS_TRIBUNAL[tribunal], nombre, f"{tipo}-{numero}-{año}"))
+    return documentos
+
+
+def generar_texto_sentencia(rng, rol, tribunal, parrafos=40):
+    """Texto de una sentencia sintética de ~parrafos párrafos."""
+    regiones = JURISDICCION_TRIBUNALES.get(tribunal, {}).get("regiones") or list(REGIONES_CHILE)
+    comunas_jurisdiccion = [c for c, d in COMUNAS_CHILE.items() if d["region"] in regiones] or list(COMUNAS_CHILE)
+    comuna = rng.choice(comunas_jurisdiccion)
+    causa = {
+        "fecha": f"{rng.randint(1, 28)} de marzo de {rng.randint(2013, 2025)}",
+        "empresa": rng.choice(EMPRESAS),
+        "resolucion": rng.randint(100, 2500),
+        "proyecto": f"{rng.choice(PROYECTOS)} {rng.choice(NOMBRES_PROPIOS)}",
+        "comuna": comuna,
+        "region": COMUNAS_CHILE[comuna]["region"],
+        "instalacion": rng.choice(INSTALACIONES),
+        "resultado": rng.choice(RESULTADOS),
+        "rol": rol,
+    }
+
+    def variables():
+        """Valores que cambian de un párrafo a otro."""
+        return {
+            "fojas": rng.randint(1, 900),
+            "sector": rng.choice(SECTORES_GEOGRAFICOS),
+            "km": rng.randint(1, 40),
+            "rol_citado": _rol(rng),
+            "rol_cs": f"{rng.randint(1000, 99999)}-{rng.randint(2013, 2025)}",
+            "region_citada": rng.choice(list(REGIONES_CHILE)),
+            "numeral": rng.randint(1, 8),
+            "comuna_vecina": rng.choice(comunas_jurisdiccion),
+        }
+
+    # Encabezado y resolución fijos; el cuerpo se arma con párrafos al azar
+    cuerpo = [rng.choice(PARRAFOS_SENTENCIA[2:-1]) for _ in range(max(0, parrafos - 3))]
+    plantillas = PARRAFOS_SENTENCIA[:2] + cuerpo + PARRAFOS_SENTENCIA[-1:]
+    return f"{tribunal} - Rol {rol}\n\n" + "\n\n".join(p.format(**causa, **variables()) for p in plantillas)
+
+
+def generar_conflictos(n, rng, proporcion_duplicados=0.15):
+    """
+    Registros de conflictos con el esquema del dataset consolidado.
+
+    Cerca de proporcion_duplicados son variantes del nombre de otro
+    conflicto en otra fuente (para identificar_duplicados).
+    """
+    comunas = list(COMUNAS_CHILE)
+    conflictos = []
+    for i in range(n):
+        if conflictos and rng.random() < proporcion_duplicados:
+            original = rng.choice(conflictos)
+            nombre = f"Conflicto {original['nombre']}"
+            comuna = original["comuna"]
+        else:
+            comuna = rng.choice(comunas)
+            nombre = f"{rng.choice(PROYECTOS)} {rng.choice(NOMBRES_PROPIOS)} en {comuna}"
+        datos = COMUNAS_CHILE[comuna]
+        frases = rng.sample(FRASES_CONFLICTO, rng.randint(2, 5))
+        conflictos.append({
+            "id_maestro": f"SIN-{i + 1:05d}",
+            "fuente_principal": rng.choice(FUENTES),
+            "nombre": nombre,
+            "descripcion": ". ".join(frases) + f". El conflicto afecta a la comuna de {comuna}.",
+            "comuna": comuna,
+            "region": datos["region"],
+            "sector": rng.choice(SECTORES),
+            "estado": rng.choice(ESTADOS),
+            "año_inicio": rng.randint(1990, 2025),
+            "latitud": round(datos["lat"] + rng.uniform(-0.05, 0.05), 5),
+            "longitud": round(datos["lon"] + rng.uniform(-0.05, 0.05), 5),
+            "impactos": [],
+            "resistencias": [],
+            "resultados": [],
+        })
+    return conflictos
+
+
+def escribir_pdf(ruta, texto):
+    """PDF mínimo de una página con las primeras líneas del texto (Helvetica)."""
+    lineas = texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").splitlines()[:45]
+    contenido = "BT /F1 9 Tf 40 800 Td 11 TL\n" + "\n".join(
+        f"({l[:110]}) '" for l in lineas) + "\nET"
+    contenido = contenido.encode("latin-1", "replace")
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n" % len(contenido) + contenido + b"\nendstream",
+    ]
+    salida = bytearray(b"%PDF-1.4\n")
+    posiciones = []
+    for i, objeto in enumerate(objetos, 1):
+        posiciones.append(len(salida))
+        salida += b"%d 0 obj\n" % i + objeto + b"\nendobj\n"
+    inicio_xref = len(salida)
+    salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    salida += b"".join(b"%010d 00000 n \n" % p for p in posiciones)
+    salida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    ruta.write_bytes(bytes(salida))
+
+
+def generar_corpus(directorio, documentos=500, conflictos=300, parrafos=40, pdfs=False, semilla=SEMILLA):
+    """
+    Escribe un corpus sintético completo en `directorio`.
+
+    Returns:
+        {"documentos": [rutas], "textos": [rutas], "conflictos": ruta_json}
+    """
+    rng = random.Random(semilla)
+    directorio = Path(directorio)
+    textos_dir = directorio / "textos"
+    textos_dir.mkdir(parents=True, exist_ok=True)
+
+    rutas_documentos, rutas_textos = [], []
+    for tribunal, subdirectorio, nombre, rol in generar_nombres_documentos(documentos, rng):
+        carpeta = directorio / "documentos" / subdirectorio
+        carpeta.mkdir(parents=True, exist_ok=True)
+        ruta = carpeta / nombre
+        texto = generar_texto_sentencia(rng, rol, tribunal, parrafos)
+        if pdfs and ruta.suffix == ".pdf":
+            escribir_pdf(ruta, texto)
+        else:
+            ruta.touch()
+        rutas_documentos.append(ruta)
+
+        ruta_texto = textos_dir / f"{ruta.stem}_{subdirectorio}.txt"
+        ruta_texto.write_text(texto, encoding="utf-8")
+        rutas_textos.append(ruta_texto)
+
+    ruta_conflictos = directorio / "conflictos.json"
+    with open(ruta_conflictos, "w", encoding="utf-8") as f:
+        json.dump(generar_conflictos(conflictos, rng), f, ensure_ascii=False)
+
+    return {"documentos": rutas_documentos, "textos": rutas_textos, "conflictos": ruta_conflictos}
+
+
+def main(directorio, documentos=500, conflictos=300, parrafos=40, pdfs=False, semilla=SEMILLA):
+    print("=" * 60)
+    print("CORPUS SINTÉTICO")
+    print("=" * 60)
+
+    corpus = generar_corpus(directorio, documentos, conflictos, parrafos, pdfs, semilla)
+    mb_textos = sum(r.stat().st_size for r in corpus["textos"]) / 1024 / 1024
+    print(f"\nDocumentos: {len(corpus['documentos'])} ({'PDF' if pdfs else 'vacíos'})")
+    print(f"Textos: {len(corpus['textos'])} ({mb_textos:.1f} MB)")
+    print(f"Conflictos: {conflictos} -> {corpus['conflictos']}")
+    return corpus
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generar un corpus sintético para benchmarks')
+    parser.add_argument('directorio', help='Directorio de salida')
+    parser.add_argument('--documentos', type=int, default=500, help='Número de documentos (default: 500)')
+    parser.add_argument('--conflictos', type=int, default=300, help='Número de conflictos (default: 300)')
+    parser.add_argument('--parrafos', type=int, default=40, help='Párrafos por sentencia (default: 40)')
+    parser.add_argument('--pdfs', action='store_true', help='Escribir PDFs reales en vez de archivos vacíos')
+    parser.add_argument('--semilla', type=int, default=SEMILLA, help=f'Semilla aleatoria (default: {SEMILLA})')
+    args = parser.parse_args()
+
+    main(args.directorio, args.documentos, args.conflictos, args.parrafos, args.pdfs, args.semilla)
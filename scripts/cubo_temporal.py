@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Cubo de conflictos por año × sector × región × fuente × estado.
+
+Cuenta con un solo groupby los conflictos del dataset consolidado en cada
+combinación de las cinco dimensiones. Como los conteos son aditivos, solo
+se guardan las celdas base (unos cientos de filas). Los agregados (rollup:
+por año, por sector y año, ...) y los desgloses de un corte (drill-down:
+regiones de un sector, ...) son un groupby-sum sobre esa tabla pequeña,
+sin recorrer el dataset.
+
+Lo usan analisis_temporal_espacial.py y la vista Temporal de la plataforma.
+
+Se guarda en datos/estadisticas/cubo_temporal.parquet, junto con las
+dimensiones de cada conflicto (cubo_temporal_registros.parquet). Al
+regenerar se comparan con el dataset actual y solo se restan y suman las
+celdas de los conflictos nuevos, modificados o eliminados.
+
+Ejemplo:
+    cubo = CuboTemporal.cargar()
+    cubo.serie("año", sector="Minería")              # [(1990, 2), (1991, 1), ...]
+    cubo.agregar("sector", "año", fuente=["INDH"])   # DataFrame sector, año, conflictos
+    cubo.desglosar("region", sector="Minería")       # [("Antofagasta", 20), ...]
+
+Uso:
+    python cubo_temporal.py [--completo]
+
+Requiere: pandas (pyarrow para guardar el cubo)
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import almacen_conflictos
+from almacen_conflictos import SIN_DATO
+
+BASE_DIR = Path(__file__).parent.parent
+STATS_DIR = BASE_DIR / "datos" / "estadisticas"
+CUBO_FILE = STATS_DIR / "cubo_temporal.parquet"
+REGISTROS_FILE = STATS_DIR / "cubo_temporal_registros.parquet"
+
+# Dimensión -> columna del dataset consolidado (mismos nombres que facetas.py)
+DIMENSIONES = {
+    "año": "año_inicio",
+    "sector": "sector",
+    "region": "region",
+    "fuente": "fuente_principal",
+    "estado": "estado",
+}
+MEDIDA = "conflictos"
+
+
+def dimensiones_de(df):
+    """id_maestro y dimensiones del cubo de cada conflicto (año nulable; textos sin dato = SIN_DATO)."""
+    import pandas as pd
+
+    registros = pd.DataFrame({"id_maestro": df["id_maestro"].astype(str)}).reset_index(drop=True)
+    for dim, columna in DIMENSIONES.items():
+        serie = df[columna].reset_index(drop=True)
+        if dim == "año":
+            registros[dim] = pd.to_numeric(serie, errors="coerce").astype("Int64")
+        else:
+            registros[dim] = serie.astype(object).fillna(SIN_DATO).astype(str)
+    return registros
+
+
+def contar(registros):
+    """Celdas base: conflictos por combinación de las dimensiones."""
+    return (registros.groupby(list(DIMENSIONES), dropna=False, observed=True).size()
+            .rename(MEDIDA).reset_index())
+
+
+def _ordenar(celdas):
+    celdas = celdas[celdas[MEDIDA] != 0]
+    return celdas.sort_values(list(DIMENSIONES), na_position="last").reset_index(drop=True)
+
+
+def actualizar_celdas(celdas, anteriores, actuales):
+    """
+    Aplica a las celdas los cambios entre dos versiones de los registros.
+
+    Resta las celdas de los conflictos eliminados o modificados y suma las de
+    los nuevos o modificados (en su nueva combinación de dimensiones).
+
+    Returns:
+        (celdas, {"nuevos": n, "modificados": n, "eliminados": n})
+    """
+    import pandas as pd
+
+    dims = list(DIMENSIONES)
+    cruce = anteriores.merge(actuales, on="id_maestro", how="outer", suffixes=("_antes", ""), indicator=True)
+    nuevos = cruce["_merge"] == "right_only"
+    eliminados = cruce["_merge"] == "left_only"
+
+    distinto = pd.Series(False, index=cruce.index)
+    for dim in dims:
+        antes, ahora = cruce[f"{dim}_antes"], cruce[dim]
+        iguales = (antes == ahora).fillna(False).astype(bool) | (antes.isna() & ahora.isna())
+        distinto |= ~iguales
+    modificados = (cruce["_merge"] == "both") & distinto
+
+    restar = cruce.loc[eliminados | modificados, [f"{d}_antes" for d in dims]].set_axis(dims, axis=1)
+    sumar = cruce.loc[nuevos | modificados, dims]
+    restadas = contar(restar)
+    restadas[MEDIDA] = -restadas[MEDIDA]
+
+    total = (pd.concat([celdas, contar(sumar), restadas], ignore_index=True)
+             .groupby(dims, dropna=False, observed=True)[MEDIDA].sum().reset_index())
+    cambios = {"nuevos": int(nuevos.sum()), "modificados": int(modificados.sum()),
+               "eliminados": int(eliminados.sum())}
+    return _ordenar(total), cambios
+
+
+def guardar(celdas, registros, ruta=CUBO_FILE, ruta_registros=REGISTROS_FILE):
+    """Guarda celdas y registros como Parquet (escritura atómica)."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    for tabla, destino in ((celdas, ruta), (registros, ruta_registros)):
+        tmp = destino.with_suffix(".tmp")
+        tabla.to_parquet(tmp, index=False)
+        tmp.replace(destino)
+
+
+def _desactualizado(ruta, version):
+    """True si el cubo no existe o es más antiguo que el JSON o el Parquet del dataset."""
+    if not ruta.exists():
+        return True
+    origenes = [almacen_conflictos.ruta_json(version), almacen_conflictos.ruta_parquet(version)]
+    return any(o.exists() and o.stat().st_mtime > ruta.stat().st_mtime for o in origenes)
+
+
+class CuboTemporal:
+    """Agregados (rollup) y desgloses (drill-down) sobre las celdas base del cubo."""
+
+    def __init__(self, celdas):
+        self.celdas = celdas
+        self.dimensiones = list(DIMENSIONES)
+        self.valores = {
+            dim: sorted(v for v in celdas[dim].dropna().unique().tolist() if v != SIN_DATO)
+            for dim in self.dimensiones
+        }
+
+    @classmethod
+    def desde_dataframe(cls, df):
+        """Cubo calculado en memoria desde un DataFrame del dataset consolidado."""
+        return cls(_ordenar(contar(dimensiones_de(df))))
+
+    @classmethod
+    def cargar(cls, ruta=CUBO_FILE, df=None, version="noticias"):
+        """
+        Lee el cubo guardado; si no existe, está desactualizado o falta
+        pyarrow, lo calcula en memoria (desde `df` o desde el dataset).
+        """
+        import pandas as pd
+
+        if not _desactualizado(ruta, version):
+            try:
+                return cls(pd.read_parquet(ruta))
+            except ImportError:
+                pass
+        if df is None:
+            df = almacen_conflictos.cargar_conflictos(["id_maestro"] + list(DIMENSIONES.values()), version)
+        return cls.desde_dataframe(df)
+
+    def _filtrar(self, filtros):
+        """Celdas del corte: cada filtro es un valor o una lista de valores (None = todos)."""
+        celdas = self.celdas
+        for dim, valor in filtros.items():
+            if dim not in DIMENSIONES:
+                raise KeyError(f"Dimensión desconocida: {dim}")
+            if valor is None:
+                continue
+            valores = list(valor) if isinstance(valor, (list, tuple, set)) else [valor]
+            celdas = celdas[celdas[dim].isin(valores)]
+        return celdas
+
+    def total(self, **filtros):
+        """Conflictos del corte."""
+        return int(self._filtrar(filtros)[MEDIDA].sum())
+
+    def agregar(self, *dimensiones, **filtros):
+        """
+        Rollup: conflictos por las dimensiones dadas dentro del corte.
+
+        Returns:
+            DataFrame con las columnas de `dimensiones` y MEDIDA
+        """
+        desconocidas = set(dimensiones) - set(DIMENSIONES)
+        if desconocidas:
+            raise KeyError(f"Dimensiones desconocidas: {sorted(desconocidas)}")
+        return (self._filtrar(filtros).groupby(list(dimensiones), dropna=False, observed=True)[MEDIDA]
+                .sum().reset_index())
+
+    def serie(self, dimension, incluir_vacios=False, **filtros):
+        """Pares (valor, conflictos) ordenados por valor (sin SIN_DATO ni nulos salvo incluir_vacios)."""
+        agregado = self.agregar(dimension, **filtros)
+        pares = [(_nativo(v), int(n)) for v, n in zip(agregado[dimension], agregado[MEDIDA])]
+        if not incluir_vacios:
+            pares = [(v, n) for v, n in pares if v is not None and v != SIN_DATO]
+        return sorted(pares, key=lambda p: (p[0] is None, p[0]))
+
+    def desglosar(self, dimension, limite=None, **filtros):
+        """Drill-down: pares (valor, conflictos) de una dimensión dentro del corte, de mayor a menor."""
+        pares = sorted(self.serie(dimension, **filtros), key=lambda p: -p[1])
+        return pares[:limite] if limite else pares
+
+    def tabla(self, filas, columnas, **filtros):
+        """Tabla cruzada {valor de filas: {valor de columnas: conflictos}} sin SIN_DATO ni nulos."""
+        tabla = {}
+        agregado = self.agregar(filas, columnas, **filtros)
+        for fila, columna, n in zip(agregado[filas], agregado[columnas], agregado[MEDIDA]):
+            fila, columna = _nativo(fila), _nativo(columna)
+            if fila in (None, SIN_DATO) or columna in (None, SIN_DATO):
+                continue
+            tabla.setdefault(fila, {})[columna] = int(n)
+        return tabla
+
+
+def _nativo(valor):
+    """Escalares numpy a tipos de Python; nulos de pandas a None."""
+    import pandas as pd
+
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    return valor.item() if hasattr(valor, "item") else valor
+
+
+def main(completo=False, version="noticias"):
+    print("=" * 60)
+    print("CUBO TEMPORAL DE CONFLICTOS")
+    print("=" * 60)
+
+    if not almacen_conflictos.ruta_json(version).exists():
+        print(f"ERROR: No existe {almacen_conflictos.ruta_json(version)}")
+        return None
+
+    import pandas as pd
+
+    inicio = time.perf_counter()
+    df = almacen_conflictos.cargar_conflictos(["id_maestro"] + list(DIMENSIONES.values()), version)
+    registros = dimensiones_de(df)
+
+    if not completo and CUBO_FILE.exists() and REGISTROS_FILE.exists():
+        celdas, cambios = actualizar_celdas(pd.read_parquet(CUBO_FILE), pd.read_parquet(REGISTROS_FILE), registros)
+        print(f"\nIncremental: {cambios['nuevos']} nuevos, {cambios['modificados']} modificados, "
+              f"{cambios['eliminados']} eliminados")
+    else:
+        celdas = _ordenar(contar(registros))
+        print(f"\nCompleto: {len(registros)} conflictos")
+
+    guardar(celdas, registros)
+    cubo = CuboTemporal(celdas)
+    print(f"{len(celdas)} celdas en {CUBO_FILE} ({(time.perf_counter() - inicio) * 1000:.0f} ms)")
+
+    print(f"\nTotal: {cubo.total()} conflictos")
+    for dimension in ("fuente", "estado", "sector"):
+        print(f"\nPor {dimension}:")
+        for valor, n in cubo.desglosar(dimension, limite=8):
+            print(f"  {str(valor):<30} {n:>5}")
+    return cubo
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Cubo año × sector × región × fuente × estado de los conflictos')
+    parser.add_argument('--completo', action='store_true', help='Recalcular todo (sin comparar con el cubo anterior)')
+    args = parser.parse_args()
+
+    main(completo=args.completo)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Cubo de agregados del corpus de los Tribunales Ambientales.
+
+A partir del listado de archivos del corpus (analisis_estadisticas.py)
+precalcula todas las combinaciones de las dimensiones
+    tribunal × año × tipo de documento × procedimiento
+incluyendo los subtotales: cada dimensión puede valer TODOS ("*"). Por
+cada celda guarda el número de documentos y de causas (pares tribunal + ROL
+distintos: cada tribunal numera sus ROL, así que R-5-2018 del 1TA y del
+2TA son dos causas). Las causas no se pueden sumar entre celdas de una
+misma dimensión cualquiera y por eso se calculan al construir.
+
+Consultar un corte o un subtotal es una búsqueda en un diccionario; la
+plataforma no recorre el listado ni suma celdas.
+
+El cubo se guarda en datos/estadisticas/cubo_tribunales.json. Las cifras
+oficiales de los tribunales (cuentas públicas) están en
+datos/estadisticas/cifras_oficiales.json, para actualizarlas sin tocar
+código.
+
+Uso:
+    python cubo_tribunales.py
+
+Al construir se verifica que la suma de causas por tribunal sea igual al
+total (verificar_cubo).
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import csv
+import json
+from collections import defaultdict
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+BASE_DIR = Path(__file__).parent.parent
+STATS_DIR = BASE_DIR / "datos" / "estadisticas"
+LISTADO_FILE = STATS_DIR / "listado_archivos.csv"
+CUBO_FILE = STATS_DIR / "cubo_tribunales.json"
+CIFRAS_OFICIALES_FILE = STATS_DIR / "cifras_oficiales.json"
+
+TODOS = "*"
+DIMENSIONES = ["tribunal", "año", "tipo", "procedimiento"]
+
+NOMBRES_TRIBUNAL = {"1TA": "Antofagasta", "2TA": "Santiago", "3TA": "Valdivia"}
+
+
+def leer_listado(ruta=LISTADO_FILE):
+    """Registros {tribunal, año, tipo, procedimiento, rol} del listado del corpus."""
+    from analisis_estadisticas import extract_procedimiento
+
+    registros = []
+    with open(ruta, encoding="utf-8") as f:
+        for fila in csv.DictReader(f):
+            registros.append({
+                "tribunal": fila["tribunal"],
+                "año": int(fila["year"]) if fila.get("year") else None,
+                "tipo": fila["type"],
+                "procedimiento": fila.get("procedure") or extract_procedimiento(fila["filename"]),
+                "rol": fila.get("rol") or None,
+            })
+    return registros
+
+
+def construir_cubo(registros):
+    """
+    Todas las celdas del cubo: {(tribunal, año, tipo, procedimiento): (documentos, causas)}.
+
+    Cada registro suma en las 2^4 celdas que lo contienen (su valor o TODOS
+    en cada dimensión). Las causas se cuentan por (tribunal, ROL).
+    """
+    documentos = defaultdict(int)
+    roles = defaultdict(set)
+    for r in registros:
+        valores = [r[d] for d in DIMENSIONES]
+        for celda in product(*[(v, TODOS) for v in valores]):
+            documentos[celda] += 1
+            if r["rol"]:
+                roles[celda].add((r["tribunal"], r["rol"]))
+    return {celda: (n, len(roles.get(celda, ()))) for celda, n in documentos.items()}
+
+
+def verificar_cubo(celdas):
+    """
+    Errores de consistencia del cubo: la suma por tribunal de documentos y
+    de causas debe ser igual al total (una causa es de un solo tribunal).
+
+    Returns:
+        Lista de mensajes (vacía si el cubo es consistente)
+    """
+    errores = []
+    total = celdas.get((TODOS,) * len(DIMENSIONES), (0, 0))
+    por_tribunal = [m for c, m in celdas.items() if c[0] != TODOS and all(v == TODOS for v in c[1:])]
+    for i, medida in enumerate(("documentos", "causas")):
+        suma = sum(m[i] for m in por_tribunal)
+        if suma != total[i]:
+            errores.append(f"{medida}: suma por tribunal {suma} != total {total[i]}")
+    return errores
+
+
+def guardar_cubo(celdas, ruta=CUBO_FILE, origen=None):
+    valores = {d: sorted({c[i] for c in celdas if c[i] != TODOS}, key=lambda v: (v is None, v))
+               for i, d in enumerate(DIMENSIONES)}
+    salida = {
+        "fecha": datetime.now().isoformat(),
+        "origen": str(origen) if origen else None,
+        "dimensiones": DIMENSIONES,
+        "todos": TODOS,
+        "valores": valores,
+        "columnas": DIMENSIONES + ["documentos", "causas"],
+        "celdas": [list(celda) + list(medidas) for celda, medidas in sorted(
+            celdas.items(), key=lambda kv: [(v == TODOS, v is None, str(v)) for v in kv[0]])],
+    }
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ruta.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(salida, f, ensure_ascii=False, separators=(",", ":"))
+    tmp.replace(ruta)
+    return salida
+
+
+class CuboTribunales:
+    """Consultas de corte y subtotales sobre el cubo precalculado."""
+
+    def __init__(self, datos):
+        self.dimensiones = datos["dimensiones"]
+        self.valores = datos["valores"]
+        self._celdas = {tuple(fila[:4]): (fila[4], fila[5]) for fila in datos["celdas"]}
+
+    @classmethod
+    def cargar(cls, ruta=CUBO_FILE, listado=LISTADO_FILE):
+        """Lee el cubo guardado; si no existe o es más antiguo que el listado, lo calcula en memoria."""
+        if ruta.exists() and (not listado.exists() or ruta.stat().st_mtime >= listado.stat().st_mtime):
+            with open(ruta, encoding="utf-8") as f:
+                return cls(json.load(f))
+        if not listado.exists():
+            return None
+        celdas = construir_cubo(leer_listado(listado))
+        return cls({
+            "dimensiones": DIMENSIONES,
+            "valores": {d: sorted({c[i] for c in celdas if c[i] != TODOS}, key=lambda v: (v is None, v))
+                        for i, d in enumerate(DIMENSIONES)},
+            "celdas": [list(c) + list(m) for c, m in celdas.items()],
+        })
+
+    def _celda(self, filtros):
+        desconocidas = set(filtros) - set(self.dimensiones)
+        if desconocidas:
+            raise KeyError(f"Dimensiones desconocidas: {sorted(desconocidas)}")
+        return tuple(filtros.get(d, TODOS) for d in self.dimensiones)
+
+    def documentos(self, **filtros):
+        """Documentos de un corte (dimensiones omitidas = TODOS)."""
+        return self._celdas.get(self._celda(filtros), (0, 0))[0]
+
+    def causas(self, **filtros):
+        """Causas (pares tribunal + ROL distintos) de un corte."""
+        return self._celdas.get(self._celda(filtros), (0, 0))[1]
+
+    def serie(self, dimension, medida="documentos", valores=None, **filtros):
+        """
+        Pares (valor, medida) a lo largo de una dimensión, con las demás fijas.
+
+        Args:
+            dimension: Dimensión que varía
+            medida: "documentos" o "causas"
+            valores: Valores de la dimensión a incluir (None = todos)
+            **filtros: Valores fijos de otras dimensiones
+        """
+        indice = 0 if medida == "documentos" else 1
+        serie = []
+        for valor in (valores if valores is not None else self.valores[dimension]):
+            medidas = self._celdas.get(self._celda({**filtros, dimension: valor}))
+            if medidas and medidas[indice]:
+                serie.append((valor, medidas[indice]))
+        return serie
+
+    def suma(self, medida="documentos", **filtros):
+        """
+        Total de una medida aditiva cuando una dimensión toma varios valores
+        (filtros con listas): suma de celdas precalculadas.
+        """
+        listas = {d: v for d, v in filtros.items() if isinstance(v, (list, tuple, set))}
+        fijos = {d: v for d, v in filtros.items() if d not in listas}
+        indice = 0 if medida == "documentos" else 1
+        total = 0
+        for combinacion in product(*listas.values()):
+            medidas = self._celdas.get(self._celda({**fijos, **dict(zip(listas, combinacion))}))
+            if medidas:
+                total += medidas[indice]
+        return total
+
+
+def cargar_cifras_oficiales(ruta=CIFRAS_OFICIALES_FILE):
+    """Cifras oficiales por tribunal (datos/estadisticas/cifras_oficiales.json), o None."""
+    if not ruta.exists():
+        return None
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    print("=" * 60)
+    print("CUBO DE AGREGADOS - TRIBUNALES AMBIENTALES")
+    print("=" * 60)
+
+    if not LISTADO_FILE.exists():
+        print(f"ERROR: No existe {LISTADO_FILE}. Ejecuta analisis_estadisticas.py")
+        return None
+
+    registros = leer_listado()
+    celdas = construir_cubo(registros)
+    errores = verificar_cubo(celdas)
+    if errores:
+        for error in errores:
+            print(f"ERROR: {error}")
+        sys.exit(1)
+    guardar_cubo(celdas, origen=LISTADO_FILE.relative_to(BASE_DIR))
+    cubo = CuboTribunales.cargar()
+
+    print(f"\n{len(registros)} documentos -> {len(celdas)} celdas en {CUBO_FILE}")
+    for dimension in DIMENSIONES:
+        print(f"\nPor {dimension}:")
+        for valor, n in cubo.serie(dimension):
+            print(f"  {str(valor):<22} {n:>6} documentos, {cubo.causas(**{dimension: valor}):>5} causas")
+    return cubo
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,15 @@
 """
 Datos geográficos de Chile: regiones, comunas y coordenadas.
 Para geocodificación de conflictos ambientales del Tribunal Ambiental.
+
+Las búsquedas usan índices precalculados (construidos una sola vez, en el
+primer uso): un diccionario de nombres normalizados para las comunas y tablas
+de alias/nombres de regiones ya normalizados.
 """
 
+import unicodedata
+from functools import lru_cache
+
 # 16 Regiones de Chile con coordenadas centroides
 REGIONES_CHILE = {
     "Arica y Parinacota": {"codigo": "XV", "lat": -18.48, "lon": -70.33},
@@ -381,24 +388,53 @@ JURISDICCION_TRIBUNALES = {
 
 def normalizar_nombre(nombre: str) -> str:
     """Normaliza un nombre de comuna/región para búsqueda."""
-    import unicodedata
     # Quitar tildes
     nombre = unicodedata.normalize('NFKD', nombre).encode('ASCII', 'ignore').decode('ASCII')
     return nombre.lower().strip()
 
 
+# ============================================================
+# ÍNDICES DE BÚSQUEDA (se construyen una vez, en el primer uso)
+# ============================================================
+
+@lru_cache(maxsize=None)
+def indice_comunas() -> dict:
+    """Índice hash: nombre normalizado -> nombre oficial de la comuna."""
+    indice = {}
+    for comuna in COMUNAS_CHILE:
+        # Ante colisiones gana la primera, igual que el recorrido lineal
+        indice.setdefault(normalizar_nombre(comuna), comuna)
+    return indice
+
+
+@lru_cache(maxsize=None)
+def _tablas_regiones() -> tuple:
+    """
+    Alias y nombres de regiones ya normalizados, en orden de prioridad.
+
+    Los fragmentos que recibe buscar_region son cortos, así que la búsqueda
+    de subcadenas nativa sobre tablas precalculadas es más rápida que un
+    autómata; el costo original estaba en re-normalizar en cada llamada.
+    """
+    alias = tuple(REGIONES_ALIAS.items())
+    nombres = tuple((normalizar_nombre(region), region) for region in REGIONES_CHILE)
+    return alias, nombres
+
+
 def buscar_region(texto: str) -> str | None:
     """Busca una región en el texto, retorna nombre normalizado o None."""
-    texto_lower = texto.lower()
+    alias, nombres = _tablas_regiones()
 
     # Primero buscar en alias
-    for alias, region in REGIONES_ALIAS.items():
-        if alias in texto_lower:
+    texto_lower = texto.lower()
+    for patron, region in alias:
+        if patron in texto_lower:
             return region
 
     # Luego buscar nombre exacto
-    for region in REGIONES_CHILE.keys():
-        if normalizar_nombre(region) in normalizar_nombre(texto):
+    texto_norm = normalizar_nombre(texto)
+    for patron, region in nombres:
+        if patron in texto_norm:
             return region
 
     return None
@@ -406,13 +442,10 @@ def buscar_region(texto: str) -> str | None:
 
 def buscar_comuna(nombre: str) -> dict | None:
     """Busca una comuna por nombre, retorna datos o None."""
-    nombre_norm = normalizar_nombre(nombre)
-
-    for comuna, datos in COMUNAS_CHILE.items():
-        if normalizar_nombre(comuna) == nombre_norm:
-            return {"nombre": comuna, **datos}
-
-    return None
+    comuna = indice_comunas().get(normalizar_nombre(nombre))
+    if comuna is None:
+        return None
+    return {"nombre": comuna, **COMUNAS_CHILE[comuna]}
 
 
 def get_coords_region(region: str) -> tuple[float, float] | None:
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Capa de carga de datos compartida por la plataforma (y otros consumidores).
+
+Cada dataset se carga una sola vez por proceso y se comparte entre todas
+las sesiones. Se recarga solo cuando cambian sus archivos de origen: la
+huella del dataset es (tamaño, mtime) de cada archivo, que se verifica con
+un stat barato en cada acceso, a lo más una vez por INTERVALO_VERIFICACION.
+
+La recarga la hace un solo hilo; mientras tanto las demás sesiones siguen
+recibiendo la copia anterior. Al terminar, la nueva copia reemplaza a la
+anterior en una sola asignación (hot-swap atómico), así que nadie ve un
+dataset a medio cargar.
+
+Modo multi-proceso (varios workers de Streamlit o de la API): con la
+variable de entorno PLATAFORMA_COMPARTIDA=1 el dataset preparado se
+escribe una sola vez como archivo Arrow IPC en datos/compartido/ y cada
+proceso lo mapea en memoria sin copiarlo (textos y listas quedan como
+columnas respaldadas por Arrow). La memoria por worker no crece con los
+datos y los workers que arrancan después no vuelven a leer el JSON. El
+primer proceso que encuentra el archivo ausente o desactualizado lo
+escribe (con un lock de archivo); los demás esperan y lo mapean.
+
+Ejemplo:
+    from datos_plataforma import dataset_conflictos
+    dataset = dataset_conflictos(columnas)
+    df, version = dataset.obtener()
+
+Uso (estado de los datasets):
+    python datos_plataforma.py
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import almacen_conflictos
+
+BASE_DIR = Path(__file__).parent.parent
+COMPARTIDO_DIR = BASE_DIR / "datos" / "compartido"
+
+# Segundos entre verificaciones de los archivos de origen
+INTERVALO_VERIFICACION = 1.0
+
+# Variable de entorno que activa el modo multi-proceso (datasets mapeados)
+VARIABLE_COMPARTIDA = "PLATAFORMA_COMPARTIDA"
+
+# Datasets de este proceso: nombre -> DatasetCompartido
+_DATASETS = {}
+_DATASETS_LOCK = threading.Lock()
+
+
+def huella_archivos(rutas):
+    """Huella de un conjunto de archivos: (nombre, tamaño, mtime) o None si no existe."""
+    huella = []
+    for ruta in rutas:
+        try:
+            stat = ruta.stat()
+            huella.append((ruta.name, stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            huella.append((ruta.name, None, None))
+    return tuple(huella)
+
+
+class DatasetCompartido:
+    """
+    Un dataset cargado en memoria que se recarga cuando cambian sus archivos.
+
+    Args:
+        cargar: Función sin argumentos que retorna el dataset.
+        archivos: Función sin argumentos que retorna las rutas de origen
+                  (se evalúa en cada verificación, para seguir cambios de DATOS_DIR).
+    """
+
+    def __init__(self, cargar, archivos):
+        self._cargar = cargar
+        self._archivos = archivos
+        self._lock = threading.Lock()
+        # (huella, datos, version): se reemplaza completo, nunca se modifica
+        self._actual = None
+        self._verificado = 0.0
+        self.recargas = 0
+
+    def obtener(self):
+        """Retorna (datos, version). version es un hash de la huella de los archivos."""
+        actual = self._actual
+        ahora = time.monotonic()
+        if actual is not None and ahora - self._verificado < INTERVALO_VERIFICACION:
+            return actual[1], actual[2]
+
+        huella = huella_archivos(self._archivos())
+        self._verificado = ahora
+        if actual is not None and actual[0] == huella:
+            return actual[1], actual[2]
+
+        # Si otro hilo ya está recargando, se sigue sirviendo la copia anterior
+        if actual is not None and not self._lock.acquire(blocking=False):
+            return actual[1], actual[2]
+        if actual is None:
+            self._lock.acquire()
+        try:
+            actual = self._actual
+            if actual is None or actual[0] != huella:
+                datos = self._cargar()
+                self.recargas += 1
+                version = hashlib.sha1(repr(huella).encode()).hexdigest()[:12]
+                self._actual = actual = (huella, datos, version)
+        finally:
+            self._lock.release()
+        return actual[1], actual[2]
+
+    def version(self):
+        """Versión vigente del dataset (lo carga si hace falta)."""
+        return self.obtener()[1]
+
+    def invalidar(self):
+        """Fuerza una verificación de los archivos en el próximo acceso."""
+        self._verificado = 0.0
+
+
+def dataset(nombre, cargar, archivos):
+    """DatasetCompartido del proceso registrado con `nombre` (se crea la primera vez)."""
+    with _DATASETS_LOCK:
+        if nombre not in _DATASETS:
+            _DATASETS[nombre] = DatasetCompartido(cargar, archivos)
+        return _DATASETS[nombre]
+
+
+# ============================================================
+# MODO MULTI-PROCESO (ARROW MAPEADO EN MEMORIA)
+# ============================================================
+
+def modo_compartido():
+    """True si los datasets se comparten entre procesos como archivos Arrow mapeados."""
+    return os.environ.get(VARIABLE_COMPARTIDA, "") not in ("", "0")
+
+
+def _tipo_arrow_mapeado(tipo):
+    """Columnas que quedan respaldadas por el archivo mapeado (textos y listas) en vez de copiarse."""
+    import pandas as pd
+    import pyarrow as pa
+
+    if pa.types.is_string(tipo) or pa.types.is_large_string(tipo) or pa.types.is_list(tipo):
+        return pd.ArrowDtype(tipo)
+    return None
+
+
+def publicar_arrow(df, ruta):
+    """Escribe un DataFrame como archivo Arrow IPC sin comprimir (escritura atómica)."""
+    import pyarrow as pa
+
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as f:
+        with pa.ipc.new_file(f, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+    os.replace(tmp, ruta)
+
+
+def mapear_arrow(ruta):
+    """DataFrame sobre un archivo Arrow IPC mapeado en memoria (sin copiar textos ni listas)."""
+    import pyarrow as pa
+
+    tabla = pa.ipc.open_file(pa.memory_map(str(ruta))).read_all()
+    return tabla.to_pandas(types_mapper=_tipo_arrow_mapeado)
+
+
+class _LockArchivo:
+    """Lock exclusivo entre procesos (fcntl; sin efecto donde no existe, p. ej. Windows)."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = None
+
+    def __enter__(self):
+        try:
+            import fcntl
+        except ImportError:
+            return self
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self._archivo = open(self.ruta, "w")
+        fcntl.flock(self._archivo, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._archivo is not None:
+            self._archivo.close()
+
+
+def cargar_mapeado(base, huella, cargar, directorio=None):
+    """
+    Dataset preparado desde su archivo Arrow mapeado, escribiéndolo si hace falta.
+
+    El archivo se llama <base>_<huella>.arrow: cada versión de los datos
+    origen tiene su propio archivo, así nunca se reemplaza uno que otro
+    proceso tiene mapeado. Las versiones anteriores se borran (en POSIX los
+    procesos que aún las mapean siguen leyéndolas sin problema).
+
+    Args:
+        base: Prefijo del archivo (identifica dataset, columnas y preparación)
+        huella: Huella de los archivos de origen (huella_archivos)
+        cargar: Función sin argumentos que retorna el DataFrame preparado
+        directorio: Carpeta de los archivos (default: datos/compartido/)
+    """
+    directorio = directorio or COMPARTIDO_DIR
+    ruta = directorio / f"{base}_{hashlib.sha1(repr(huella).encode()).hexdigest()[:12]}.arrow"
+    if not ruta.exists():
+        with _LockArchivo(directorio / f"{base}.lock"):
+            # Otro proceso pudo escribirlo mientras se esperaba el lock
+            if not ruta.exists():
+                publicar_arrow(cargar(), ruta)
+                for anterior in directorio.glob(f"{base}_*.arrow"):
+                    if anterior != ruta:
+                        try:
+                            anterior.unlink()
+                        except OSError:
+                            pass
+    return mapear_arrow(ruta)
+
+
+def dataset_conflictos(columnas=None, version="noticias", preparar=None):
+    """
+    Dataset consolidado de conflictos (DataFrame) compartido por el proceso.
+
+    Se recarga cuando cambia el JSON o el Parquet de la versión. `preparar`
+    recibe el DataFrame recién cargado y puede agregarle columnas derivadas;
+    el resultado no debe modificarse después, porque lo comparten todas las
+    sesiones. En modo multi-proceso (PLATAFORMA_COMPARTIDA=1) se comparte
+    además entre procesos (ver cargar_mapeado).
+    """
+    def preparado():
+        df = almacen_conflictos.cargar_conflictos(columnas, version)
+        return preparar(df) if preparar else df
+
+    def archivos():
+        return [almacen_conflictos.ruta_json(version), almacen_conflictos.ruta_parquet(version)]
+
+    nombre = ("conflictos", version, tuple(columnas) if columnas else None,
+              getattr(preparar, "__qualname__", None))
+
+    def cargar():
+        if not modo_compartido():
+            return preparado()
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("pyarrow no instalado, cada proceso carga su copia. Ejecuta: pip install pyarrow")
+            return preparado()
+        base = f"conflictos_{version}_{hashlib.sha1(repr(nombre).encode()).hexdigest()[:8]}"
+        return cargar_mapeado(base, huella_archivos(archivos()), preparado)
+
+    return dataset(nombre, cargar, archivos)
+
+
+# Filas por bloque al exportar CSV
+FILAS_POR_BLOQUE = 5000
+
+FORMATOS_EXPORTACION = {
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def iterar_csv(df, filas_por_bloque=FILAS_POR_BLOQUE):
+    """CSV (UTF-8 con BOM, para Excel) de un DataFrame en bloques de bytes."""
+    import pandas as pd
+
+    # Listas respaldadas por Arrow (modo multi-proceso): mismo formato que las listas de Python
+    listas = [c for c in df.columns if isinstance(df[c].dtype, pd.ArrowDtype) and str(df[c].dtype).startswith("list")]
+    yield "\ufeff".encode("utf-8")
+    for inicio in range(0, max(len(df), 1), filas_por_bloque):
+        bloque = df.iloc[inicio:inicio + filas_por_bloque]
+        if listas:
+            bloque = bloque.assign(**{c: pd.Series(bloque[c].tolist(), index=bloque.index, dtype=object)
+                                      for c in listas})
+        yield bloque.to_csv(index=False, header=(inicio == 0)).encode("utf-8")
+
+
+def exportar_dataframe(df, formato="csv"):
+    """Bytes de un DataFrame en `formato` ("csv" o "parquet")."""
+    if formato == "csv":
+        return b"".join(iterar_csv(df))
+    if formato == "parquet":
+        import io
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("pyarrow no instalado. Ejecuta: pip install pyarrow")
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False, compression="zstd")
+        return buffer.getvalue()
+    raise ValueError(f"Formato desconocido: {formato}")
+
+
+def main():
+    print("=" * 60)
+    print("DATASETS DE LA PLATAFORMA")
+    print("=" * 60)
+
+    for version in almacen_conflictos.VERSIONES:
+        if not almacen_conflictos.ruta_json(version).exists():
+            print(f"\n{version}: sin datos")
+            continue
+        compartido = dataset_conflictos(version=version)
+        inicio = time.perf_counter()
+        df, etiqueta = compartido.obtener()
+        carga = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        compartido.invalidar()
+        compartido.obtener()
+        verificacion = time.perf_counter() - inicio
+        print(f"\n{version}: {len(df)} registros, versión {etiqueta}")
+        print(f"  carga: {carga * 1000:.1f} ms, verificación sin cambios: {verificacion * 1e6:.0f} µs")
+
+    print(f"\nModo multi-proceso ({VARIABLE_COMPARTIDA}): {'activo' if modo_compartido() else 'inactivo'}")
+    for ruta in sorted(COMPARTIDO_DIR.glob("*.arrow")):
+        print(f"  {ruta.name}: {ruta.stat().st_size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ Fecha: Enero 2026
 
 import json
 import os
+import sys
 import time
 from datetime import datetime
 from pathlib import Path
@@ -21,6 +22,9 @@ from pathlib import Path
 import requests
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, str(Path(__file__).parent))
+from instrumentacion import ejecucion, medido
+
 # Configuración
 BASE_DIR = Path(__file__).parent.parent
 DATOS_DIR = BASE_DIR / "datos" / "conflictos"
@@ -31,6 +35,7 @@ HEADERS = {
 }
 
 
+@medido()
 def descargar_indh():
     """
     Descarga datos del Mapa de Conflictos Socioambientales del INDH.
@@ -90,6 +95,7 @@ def descargar_indh():
     return None
 
 
+@medido()
 def descargar_ejatlas():
     """
     Descarga datos del Environmental Justice Atlas para Chile.
@@ -192,6 +198,7 @@ def descargar_ejatlas():
     return None
 
 
+@medido()
 def documentar_olca():
     """
     Documenta la fuente OLCA (requiere revisión manual).
@@ -233,6 +240,7 @@ def documentar_olca():
     return info
 
 
+@medido()
 def documentar_ocmal():
     """
     Documenta la fuente OCMAL (conflictos mineros).
@@ -284,6 +292,7 @@ def documentar_ocmal():
     return info
 
 
+@medido()
 def documentar_acled():
     """
     Documenta la fuente ACLED (requiere registro para API).
@@ -425,4 +434,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with ejecucion("descargar_conflictos"):
+        main()
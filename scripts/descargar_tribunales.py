@@ -28,6 +28,9 @@ from bs4 import BeautifulSoup
 
 sys.stdout.reconfigure(encoding='utf-8')
 
+sys.path.insert(0, str(Path(__file__).parent))
+from instrumentacion import contar, ejecucion, fase, medido
+
 # -----------------------------
 # Configuracion
 # -----------------------------
@@ -124,6 +127,7 @@ def get_extension(url: str) -> str:
 # -----------------------------
 # Descarga
 # -----------------------------
+@medido()
 def extraer_enlaces_documentos(session: requests.Session, url: str) -> List[Dict]:
     """Extrae todos los enlaces a documentos de una pagina."""
     documentos = []
@@ -153,6 +157,7 @@ def extraer_enlaces_documentos(session: requests.Session, url: str) -> List[Dict
     return documentos
 
 
+@medido()
 def descargar_documento(session: requests.Session, url: str, out_dir: Path) -> Dict:
     """Descarga un documento."""
     rec = {
@@ -201,6 +206,7 @@ def descargar_documento(session: requests.Session, url: str, out_dir: Path) -> D
     return rec
 
 
+@medido()
 def descargar_desde_api(session: requests.Session, base_url: str, out_dir: Path, tribunal_id: str) -> List[Dict]:
     """Descarga documentos desde la API de WordPress."""
     log(f"  Obteniendo documentos desde API...")
@@ -402,8 +408,12 @@ def main():
     with requests.Session() as session:
         for tribunal_id in tribunales:
             try:
-                stats = procesar_tribunal(tribunal_id, session)
+                with fase(tribunal_id):
+                    stats = procesar_tribunal(tribunal_id, session)
                 all_stats.append(stats)
+                contar("documentos_descargados", stats["documentos_descargados"])
+                contar("documentos_fallidos", stats["documentos_fallidos"])
+                contar("bytes", stats["bytes_totales"])
             except Exception as e:
                 log(f"Error procesando {tribunal_id}: {e}")
 
@@ -425,4 +435,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with ejecucion("descargar_tribunales", parametros={"tribunales": sys.argv[1:] or ["todos"]}):
+        main()
@@ -21,6 +21,10 @@ CORPUS_DIR = BASE_DIR / "corpus" / "descarga_completa"
 TEXTOS_DIR = BASE_DIR / "corpus" / "textos"
 LOG_DIR = BASE_DIR / "datos"
 
+sys.path.insert(0, str(SCRIPT_DIR))
+from instrumentacion import contar, ejecucion, fase, medido
+
+@medido()
 def extraer_pdf_pdfplumber(pdf_path, output_path):
     """Extrae texto de PDF usando pdfplumber."""
     try:
@@ -54,6 +58,7 @@ def extraer_pdf_pdfplumber(pdf_path, output_path):
     except Exception as e:
         return False, 0, str(e)
 
+@medido()
 def extraer_word(doc_path, output_path):
     """Extrae texto de documentos Word."""
     try:
@@ -108,8 +113,9 @@ def procesar_corpus(limite=None, solo_tipo=None):
         extensiones = [solo_tipo]
 
     archivos = []
-    for ext in extensiones:
-        archivos.extend(CORPUS_DIR.rglob(f"*{ext}"))
+    with fase("listar_archivos"):
+        for ext in extensiones:
+            archivos.extend(CORPUS_DIR.rglob(f"*{ext}"))
 
     total = len(archivos)
     print(f"Archivos encontrados: {total}")
@@ -169,6 +175,12 @@ def procesar_corpus(limite=None, solo_tipo=None):
     # Guardar log final
     guardar_log(stats)
 
+    contar("procesados", stats['procesados'])
+    contar("exitosos", stats['exitosos'])
+    contar("escaneados", len(stats['escaneados']))
+    contar("errores", len(stats['errores']))
+    contar("omitidos", stats['omitidos'])
+
     return stats
 
 def guardar_log(stats):
@@ -227,5 +239,6 @@ if __name__ == '__main__':
     print(f"Destino: {TEXTOS_DIR}")
     print()
 
-    stats = procesar_corpus(limite=limite, solo_tipo=args.tipo)
+    with ejecucion("extraer_corpus_completo", parametros=vars(args)):
+        stats = procesar_corpus(limite=limite, solo_tipo=args.tipo)
     mostrar_resumen(stats)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Facetas precalculadas del dataset de conflictos para los filtros de la plataforma.
+
+Al construir Facetas se codifica una vez cada dimensión (fuente, sector,
+región, estado, año) como un arreglo de códigos enteros y, por cada valor,
+un bitmap (arreglo booleano) con las filas que lo tienen. Para una
+combinación de filtros:
+- la máscara es el OR de los bitmaps de los valores elegidos en cada
+  dimensión, y el AND entre dimensiones
+- los conteos de todas las dimensiones salen de un np.bincount por
+  dimensión sobre las filas seleccionadas (una sola pasada)
+
+Los resultados se guardan en un LRU por combinación de filtros.
+
+Ejemplo:
+    facetas = Facetas(df)
+    conteos = facetas.conteos(fuente=("INDH", "OCMAL"), sector=("Minería",))
+    conteos["total"], conteos["region"]      # {"Antofagasta": 12, ...}
+    df.iloc[facetas.indices(fuente=("INDH",))]
+
+Requiere: pandas, numpy
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+from functools import lru_cache
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+# Dimensión -> columna del dataset consolidado
+DIMENSIONES = {
+    "fuente": "fuente_principal",
+    "sector": "sector",
+    "region": "region",
+    "estado": "estado",
+    "año": "año_inicio",
+}
+
+TAMANO_CACHE = 256
+
+
+class Facetas:
+    """Bitmaps por valor y conteos por combinación de filtros de un DataFrame."""
+
+    def __init__(self, df, dimensiones=DIMENSIONES, tamano_cache=TAMANO_CACHE):
+        import numpy as np
+        import pandas as pd
+
+        self.n = len(df)
+        self.valores = {}
+        self.codigos = {}
+        self.bitmaps = {}
+        for dim, columna in dimensiones.items():
+            if columna not in df.columns:
+                continue
+            serie = df[columna]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                serie = serie.cat.remove_unused_categories()
+                categorias, codigos = list(serie.cat.categories), serie.cat.codes.to_numpy()
+            else:
+                codigos, categorias = pd.factorize(serie, sort=True)
+                categorias = list(categorias)
+            self.valores[dim] = [_nativo(v) for v in categorias]
+            self.codigos[dim] = np.asarray(codigos, dtype=np.int32)
+            self.bitmaps[dim] = {v: self.codigos[dim] == i for i, v in enumerate(self.valores[dim])}
+
+        self._todas = np.ones(self.n, dtype=bool)
+        self._mascara = lru_cache(maxsize=tamano_cache)(self._calcular_mascara)
+        self._conteos = lru_cache(maxsize=tamano_cache)(self._calcular_conteos)
+
+    @staticmethod
+    def clave(filtros):
+        """Clave hashable de unos filtros: dimensiones ordenadas, None = sin filtro."""
+        return tuple(sorted((dim, tuple(valores)) for dim, valores in filtros.items() if valores is not None))
+
+    def _calcular_mascara(self, clave):
+        mascara = self._todas
+        for dim, valores in clave:
+            bitmaps = self.bitmaps.get(dim)
+            if bitmaps is None:
+                raise KeyError(f"Dimensión desconocida: {dim}")
+            seleccion = None
+            for valor in valores:
+                bitmap = bitmaps.get(valor)
+                if bitmap is not None:
+                    seleccion = bitmap if seleccion is None else seleccion | bitmap
+            if seleccion is None:
+                return ~self._todas
+            mascara = mascara & seleccion
+        return mascara
+
+    def _calcular_conteos(self, clave):
+        import numpy as np
+
+        mascara = self._mascara(clave)
+        conteos = {"total": int(mascara.sum())}
+        for dim, codigos in self.codigos.items():
+            seleccion = codigos[mascara]
+            frecuencias = np.bincount(seleccion[seleccion >= 0], minlength=len(self.valores[dim]))
+            conteos[dim] = {self.valores[dim][i]: int(f) for i, f in enumerate(frecuencias) if f > 0}
+        return conteos
+
+    def mascara(self, **filtros):
+        """Arreglo booleano de las filas que cumplen los filtros (no modificar)."""
+        return self._mascara(self.clave(filtros))
+
+    def indices(self, **filtros):
+        """Posiciones (para df.iloc) de las filas que cumplen los filtros."""
+        import numpy as np
+        return np.flatnonzero(self._mascara(self.clave(filtros)))
+
+    def conteos(self, **filtros):
+        """
+        Conteos de todas las dimensiones para una combinación de filtros.
+
+        Args:
+            **filtros: dimensión -> valores permitidos (None o ausente = todos)
+
+        Returns:
+            {"total": n, "fuente": {valor: n}, "sector": {...}, ...} (no modificar)
+        """
+        return self._conteos(self.clave(filtros))
+
+    def cache_info(self):
+        return self._conteos.cache_info()
+
+
+def _nativo(valor):
+    """Convierte escalares numpy a tipos de Python (para claves y JSON)."""
+    return valor.item() if hasattr(valor, "item") else valor
+
+
+def ordenar_conteos(conteos, excluir=(), limite=None):
+    """Pares (valor, n) de mayor a menor, sin los valores en `excluir`."""
+    pares = sorted(((str(v), n) for v, n in conteos.items() if v not in excluir), key=lambda p: -p[1])
+    return pares[:limite] if limite else pares
+
+
+def main():
+    import time
+    from almacen_conflictos import cargar_conflictos
+
+    df = cargar_conflictos(list(DIMENSIONES.values()))
+    inicio = time.perf_counter()
+    facetas = Facetas(df)
+    print(f"Facetas de {facetas.n} conflictos ({(time.perf_counter() - inicio) * 1000:.1f} ms):")
+    for dim, valores in facetas.valores.items():
+        print(f"  {dim:<8} {len(valores):>4} valores")
+
+    inicio = time.perf_counter()
+    conteos = facetas.conteos()
+    print(f"\nConteos sin filtro: {conteos['total']} ({(time.perf_counter() - inicio) * 1000:.2f} ms)")
+    for dim in ("fuente", "estado"):
+        print(f"  {dim}: {ordenar_conteos(conteos[dim])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,9 +13,9 @@ from collections import defaultdict
 
 sys.stdout.reconfigure(encoding='utf-8', errors='replace')
 
-BASE_DIR = Path(r"G:\Mi unidad\tribunal_pdf\corpus\descarga_completa\documentos")
-OUTPUT_DIR = Path(r"G:\Mi unidad\tribunal_pdf\datos\sentencias")
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+BASE_DIR = Path(__file__).parent.parent
+DOCUMENTOS_DIR = BASE_DIR / "corpus" / "descarga_completa" / "documentos"
+OUTPUT_DIR = BASE_DIR / "datos" / "sentencias"
 
 def es_sentencia_oficial(filename):
     """Determina si es una sentencia oficial (no boletín ni síntesis)"""
@@ -78,6 +78,11 @@ def get_tribunal(filepath):
         return '2TA'
 
 def main():
+    # Sin el corpus descargado no se sobrescriben las salidas con conteos vacíos
+    if not DOCUMENTOS_DIR.exists():
+        print(f"ERROR: No existe {DOCUMENTOS_DIR}. Ejecuta descargar_tribunales.py")
+        sys.exit(1)
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     print("="*60)
     print("FILTRADO DE SENTENCIAS OFICIALES v2")
     print("="*60)
@@ -88,7 +93,7 @@ def main():
 
     # Escanear archivos
     print("\nEscaneando corpus...")
-    for filepath in BASE_DIR.rglob("*"):
+    for filepath in DOCUMENTOS_DIR.rglob("*"):
         if not filepath.is_file():
             continue
 
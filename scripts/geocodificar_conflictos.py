@@ -4,23 +4,33 @@ Geocodificación de conflictos ambientales del Tribunal Ambiental de Chile.
 Extrae ubicaciones de sentencias y genera mapas estáticos e interactivos.
 
 Uso:
-    python geocodificar_conflictos.py
+    python geocodificar_conflictos.py [--incremental] [--procesos N]
+
+Con --incremental solo se procesan los textos nuevos o modificados (según
+el hash de su contenido); el resto se toma de datos/geografico/cache/.
 """
 
+import hashlib
 import json
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache
 
 # Agregar el directorio de scripts al path para importar módulos locales
 sys.path.insert(0, str(Path(__file__).parent))
 
+from automata_patrones import AhoCorasick
+from capas_mapa import CAPAS_DIR, construir_capas
 from datos_geograficos_chile import (
-    COMUNAS_CHILE, REGIONES_CHILE, JURISDICCION_TRIBUNALES,
+    COMUNAS_CHILE, REGIONES_ALIAS, REGIONES_CHILE, JURISDICCION_TRIBUNALES,
     buscar_comuna, buscar_region, get_coords_tribunal, normalizar_nombre
 )
+from instrumentacion import contar, ejecucion, fase, medido
 
 # ============================================================
 # CONFIGURACIÓN
@@ -29,24 +39,19 @@ BASE_DIR = Path(__file__).parent.parent
 TEXTOS_DIR = BASE_DIR / "corpus" / "textos"
 CAUSAS_FILE = BASE_DIR / "datos" / "sentencias" / "causas_unicas.json"
 OUTPUT_DIR = BASE_DIR / "datos" / "geografico"
+CACHE_EXTRACCION_FILE = OUTPUT_DIR / "cache" / "extraccion_textos.json"
 FIGURAS_DIR = BASE_DIR / "paper" / "figuras"
 
+# Cambiar cuando cambie la extracción o la ubicación principal: invalida la
+# caché del modo incremental
+VERSION_EXTRACCION = 3
+
 # ============================================================
 # PATRONES REGEX PARA EXTRACCIÓN DE UBICACIONES
 # ============================================================
+# Comunas y regiones se extraen con el gazetteer (ver más abajo); estos
+# patrones capturan texto libre que no está en las tablas geográficas.
 PATRONES = {
-    # "comuna de [NOMBRE]" o "Comuna de [NOMBRE]"
-    "comuna": re.compile(
-        r'[Cc]omuna\s+de\s+([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+(?:de\s+)?[A-ZÁÉÍÓÚÑ]?[a-záéíóúñ]+)*)',
-        re.UNICODE
-    ),
-
-    # "Región de [NOMBRE]" o "Región [NOMBRE]" o "Región Metropolitana"
-    "region": re.compile(
-        r'[Rr]egi[oó]n\s+(?:de\s+)?(?:la\s+)?([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?:\s+(?:y\s+)?[A-ZÁÉÍÓÚÑ]?[a-záéíóúñ\']+)*)',
-        re.UNICODE
-    ),
-
     # "ubicado/a en [lugar]"
     "ubicado": re.compile(
         r'ubicad[oa]\s+en\s+(?:el\s+|la\s+)?(.+?)(?:,\s*(?:comuna|provincia|[Rr]egi[oó]n)|\.)',
@@ -60,6 +65,144 @@ PATRONES = {
     ),
 }
 
+# ============================================================
+# GAZETTEER: COMUNAS Y REGIONES EN UNA SOLA PASADA
+# ============================================================
+# Normalización que conserva el largo del texto (las posiciones de las
+# menciones sirven directamente sobre el texto original)
+_SIN_TILDES = [("á", "a"), ("é", "e"), ("í", "i"), ("ó", "o"), ("ú", "u"), ("ü", "u"), ("ñ", "n")]
+
+# Tokens de palabra sobre texto normalizado (las menciones calzan palabras completas)
+TOKEN = re.compile(r'([a-z0-9]+)')
+
+# Contexto que debe preceder a la mención (sobre texto normalizado)
+PREFIJO_CONTEXTO = {
+    "comuna": re.compile(r'comunas?\s+(?:de\s+)?$'),
+    "region": re.compile(r'region\s+(?:(?:de|del)\s+)?(?:la\s+)?$'),
+}
+VENTANA_PREFIJO = 25
+
+# Frases que anuncian la ubicación del proyecto ("ubicado en ..."); se buscan
+# en la misma pasada del gazetteer como menciones de tipo "ancla"
+ANCLAS_UBICACION = [
+    "ubicado en", "ubicada en", "ubicados en", "ubicadas en",
+    "emplazado en", "emplazada en", "localizado en", "localizada en",
+    "situado en", "situada en",
+]
+
+# Contexto de cita a otras causas o fallos (la mención no es la del proyecto)
+PREFIJO_CITA = re.compile(r'\b(?:rol|causa|corte|considerando)\b')
+VENTANA_CITA = 80
+
+# ============================================================
+# PUNTAJE DE UBICACIONES
+# ============================================================
+PESOS_UBICACION = {
+    "con_contexto": 1.0,         # "comuna de X" / "región de X"
+    "sin_contexto": 0.2,         # X suelto (solo suma si el lugar ya califica)
+    "primera_pagina": 2.0,       # multiplicador: carátula / primera página
+    "cita": 0.3,                 # multiplicador: dentro de una cita a otra causa
+    "ubicado_en": 2.0,           # multiplicador: cerca de "ubicado en"
+    "fuera_jurisdiccion": 0.5,   # multiplicador: región fuera del tribunal
+}
+PRIMERA_PAGINA = 3000            # caracteres
+VENTANA_ANCLA = 200              # caracteres después de "ubicado en"
+UMBRAL_PUNTAJE = 0.5             # puntaje mínimo para aceptar un candidato
+PUNTAJE_SATURACION = 4.0         # puntaje a partir del cual la confianza no sube
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas sin tildes, del mismo largo que el texto original."""
+    normalizado = texto.lower()
+    if len(normalizado) != len(texto):
+        # Algunos caracteres cambian de largo al pasar a minúsculas (ej: 'İ')
+        normalizado = "".join(c.lower()[:1] or c for c in texto)
+    # str.replace por carácter es mucho más rápido que str.translate con tabla
+    for con_tilde, sin_tilde in _SIN_TILDES:
+        normalizado = normalizado.replace(con_tilde, sin_tilde)
+    return normalizado
+
+
+@lru_cache(maxsize=None)
+def construir_gazetteer() -> AhoCorasick:
+    """
+    Autómata sobre secuencias de tokens de comunas, regiones, alias y
+    frases ancla ("ubicado en").
+
+    El valor de cada patrón es (tipo, nombre oficial).
+    """
+    automata = AhoCorasick()
+    for comuna in COMUNAS_CHILE:
+        tokens = tuple(TOKEN.findall(normalizar_nombre(comuna)))
+        automata.agregar(tokens, ("comuna", comuna))
+
+    nombres_region = {normalizar_nombre(region): region for region in REGIONES_CHILE}
+    nombres_region.update(REGIONES_ALIAS)
+    for patron, region in nombres_region.items():
+        automata.agregar(tuple(TOKEN.findall(patron)), ("region", region))
+
+    for ancla in ANCLAS_UBICACION:
+        automata.agregar(tuple(TOKEN.findall(ancla)), ("ancla", "ubicado en"))
+
+    return automata.construir()
+
+
+def extraer_menciones(texto: str) -> list[dict]:
+    """
+    Encuentra todas las menciones de comunas y regiones en una pasada.
+
+    El texto se tokeniza una vez y el autómata recorre los tokens, así que
+    solo hay coincidencias de palabras completas. En comunas y regiones,
+    `contexto` indica si la mención va precedida de "comuna de" / "región de"
+    y `cita` si aparece justo después de una referencia a otra causa.
+
+    Returns:
+        Lista de menciones {"tipo", "nombre", "inicio", "fin", ["contexto", "cita"]}
+        en orden de aparición (posiciones sobre el texto original). `tipo`
+        es "comuna", "region" o "ancla".
+    """
+    normalizado = normalizar_texto(texto)
+
+    # split con grupo alterna [separador, token, separador, token, ...]; el
+    # token k es partes[2k + 1] y su posición es la suma de los largos previos.
+    # Las coincidencias salen en orden de fin, así que el fin se calcula
+    # avanzando un cursor (cada parte se suma una sola vez).
+    partes = TOKEN.split(normalizado)
+    cursor_parte = cursor_pos = 0
+
+    menciones = []
+    for i, j, (tipo, nombre) in construir_gazetteer().buscar(partes[1::2]):
+        fin_parte = 2 * j
+        cursor_pos += sum(map(len, partes[cursor_parte:fin_parte]))
+        cursor_parte = fin_parte
+        fin = cursor_pos
+        inicio = fin - sum(map(len, partes[2 * i + 1:fin_parte]))
+
+        mencion = {"tipo": tipo, "nombre": nombre, "inicio": inicio, "fin": fin}
+        if tipo != "ancla":
+            prefijo = normalizado[max(0, inicio - VENTANA_PREFIJO):inicio]
+            mencion["contexto"] = bool(PREFIJO_CONTEXTO[tipo].search(prefijo))
+            mencion["cita"] = bool(PREFIJO_CITA.search(normalizado, max(0, inicio - VENTANA_CITA), inicio))
+        menciones.append(mencion)
+
+    # Alias solapados del mismo lugar ("region metropolitana" / "metropolitana",
+    # "arica y parinacota" / "arica") cuentan como una sola mención
+    menciones.sort(key=lambda m: (m["inicio"], -m["fin"]))
+    ultima = {}
+    unicas = []
+    for m in menciones:
+        tipo = m["tipo"]
+        clave = (tipo, m["nombre"])
+        previa = ultima.get(clave)
+        if previa and m["inicio"] < previa["fin"]:
+            previa["fin"] = max(previa["fin"], m["fin"])
+            if tipo != "ancla":
+                previa["contexto"] = previa["contexto"] or m["contexto"]
+            continue
+        ultima[clave] = m
+        unicas.append(m)
+    return unicas
+
 
 def extraer_ubicaciones_texto(texto: str) -> dict:
     """
@@ -69,89 +212,181 @@ def extraer_ubicaciones_texto(texto: str) -> dict:
         texto: Contenido del archivo de texto de la sentencia
 
     Returns:
-        Diccionario con comunas, regiones y direcciones encontradas
+        Diccionario con comunas, regiones y direcciones encontradas.
+        "comunas" y "regiones" son las introducidas por "comuna de" /
+        "región de", en orden de primera aparición; "conteos" cuenta
+        todas sus menciones y "menciones" trae las posiciones.
     """
+    menciones = extraer_menciones(texto)
+
+    # Conjuntos ordenados (dict conserva el orden de inserción)
+    encontrados = {"comuna": {}, "region": {}}
+    for m in menciones:
+        if m["tipo"] != "ancla" and m["contexto"]:
+            encontrados[m["tipo"]].setdefault(m["nombre"], None)
+
+    conteos = {"comuna": Counter(), "region": Counter()}
+    for m in menciones:
+        if m["tipo"] != "ancla" and m["nombre"] in encontrados[m["tipo"]]:
+            conteos[m["tipo"]][m["nombre"]] += 1
+
     resultado = {
-        "comunas": [],
-        "regiones": [],
+        "comunas": list(encontrados["comuna"]),
+        "regiones": list(encontrados["region"]),
         "provincias": [],
         "direcciones": [],
+        "conteos": {"comunas": dict(conteos["comuna"]), "regiones": dict(conteos["region"])},
+        "menciones": menciones,
     }
 
-    # Extraer comunas
-    for match in PATRONES["comuna"].finditer(texto):
-        comuna = match.group(1).strip()
-        # Validar que existe en nuestra tabla
-        if buscar_comuna(comuna):
-            if comuna not in resultado["comunas"]:
-                resultado["comunas"].append(comuna)
-
-    # Extraer regiones
-    for match in PATRONES["region"].finditer(texto):
-        region_texto = match.group(1).strip()
-        region = buscar_region(region_texto)
-        if region and region not in resultado["regiones"]:
-            resultado["regiones"].append(region)
-
     # Extraer provincias (informativo)
+    provincias = {}
     for match in PATRONES["provincia"].finditer(texto):
-        provincia = match.group(1).strip()
-        if provincia not in resultado["provincias"]:
-            resultado["provincias"].append(provincia)
+        provincias.setdefault(match.group(1).strip(), None)
+    resultado["provincias"] = list(provincias)
 
     # Extraer direcciones/ubicaciones específicas (primeras 3)
+    direcciones = {}
     for match in PATRONES["ubicado"].finditer(texto):
         direccion = match.group(1).strip()[:200]  # Limitar longitud
-        if len(direccion) > 10 and direccion not in resultado["direcciones"]:
-            resultado["direcciones"].append(direccion)
-            if len(resultado["direcciones"]) >= 3:
+        if len(direccion) > 10:
+            direcciones.setdefault(direccion, None)
+            if len(direcciones) >= 3:
                 break
+    resultado["direcciones"] = list(direcciones)
 
     return resultado
 
 
+def puntuar_ubicaciones(menciones: list[dict], tribunal: str) -> list[dict]:
+    """
+    Puntúa los lugares candidatos a partir de la tabla de menciones.
+
+    Cada mención suma un peso (ver PESOS_UBICACION) según si va precedida de
+    "comuna de"/"región de", si está en la primera página, si está dentro de
+    una cita a otra causa y si sigue a un "ubicado en". El total de cada lugar
+    se multiplica por 0,5 si su región no es de la jurisdicción del tribunal.
+    Las menciones sueltas de la ciudad sede del tribunal no suman (son el
+    encabezado y la dirección del propio tribunal).
+
+    Solo son candidatos los lugares con al menos una mención con contexto o
+    anclada (primera página o tras "ubicado en"); las menciones sueltas solo
+    suman a esos lugares. Así un nombre común ("Constitución Política") no
+    llega al umbral por repetición.
+
+    Returns:
+        Candidatos {"tipo", "nombre", "region", "puntaje", "confianza",
+        "menciones"} ordenados por puntaje descendente. La confianza es la
+        fracción del puntaje de su tipo, atenuada si el puntaje es bajo.
+    """
+    jurisdiccion = JURISDICCION_TRIBUNALES.get(tribunal, {})
+    regiones_tribunal = set(jurisdiccion.get("regiones", []))
+    sede = jurisdiccion.get("sede")
+    region_sede = buscar_region(sede) if sede else None
+
+    anclas = [m["inicio"] for m in menciones if m["tipo"] == "ancla"]
+    candidatos = {}
+
+    for m in menciones:
+        tipo, nombre = m["tipo"], m["nombre"]
+        if tipo == "ancla":
+            continue
+        if not m["contexto"] and (nombre == sede if tipo == "comuna" else nombre == region_sede):
+            continue
+
+        peso = PESOS_UBICACION["con_contexto" if m["contexto"] else "sin_contexto"]
+        califica = m["contexto"]
+        if m["inicio"] < PRIMERA_PAGINA:
+            peso *= PESOS_UBICACION["primera_pagina"]
+            califica = True
+        if m.get("cita"):
+            peso *= PESOS_UBICACION["cita"]
+        # Ancla más cercana antes de la mención
+        k = bisect_right(anclas, m["inicio"]) - 1
+        if k >= 0 and m["inicio"] - anclas[k] <= VENTANA_ANCLA:
+            peso *= PESOS_UBICACION["ubicado_en"]
+            califica = True
+
+        candidato = candidatos.get((tipo, nombre))
+        if candidato is None:
+            region = COMUNAS_CHILE[nombre]["region"] if tipo == "comuna" else nombre
+            candidato = candidatos[(tipo, nombre)] = {
+                "tipo": tipo, "nombre": nombre, "region": region,
+                "puntaje": 0.0, "confianza": 0.0, "menciones": 0, "califica": False,
+            }
+        candidato["puntaje"] += peso
+        candidato["menciones"] += 1
+        candidato["califica"] = candidato["califica"] or califica
+
+    candidatos = {clave: c for clave, c in candidatos.items() if c.pop("califica")}
+
+    total_por_tipo = Counter()
+    for c in candidatos.values():
+        if regiones_tribunal and c["region"] not in regiones_tribunal:
+            c["puntaje"] *= PESOS_UBICACION["fuera_jurisdiccion"]
+        total_por_tipo[c["tipo"]] += c["puntaje"]
+
+    for c in candidatos.values():
+        fraccion = c["puntaje"] / total_por_tipo[c["tipo"]] if total_por_tipo[c["tipo"]] else 0.0
+        c["confianza"] = round(fraccion * min(1.0, c["puntaje"] / PUNTAJE_SATURACION), 2)
+        c["puntaje"] = round(c["puntaje"], 2)
+
+    return sorted(candidatos.values(), key=lambda c: (-c["puntaje"], c["tipo"], c["nombre"]))
+
+
 def determinar_ubicacion_principal(ubicaciones: dict, tribunal: str) -> dict:
     """
     Determina la ubicación principal de una causa basándose en las menciones.
 
     Prioridad:
-    1. Primera comuna mencionada
-    2. Primera región mencionada
+    1. Comuna con mayor puntaje (si supera UMBRAL_PUNTAJE)
+    2. Región con mayor puntaje (si supera UMBRAL_PUNTAJE)
     3. Sede del tribunal
 
     Args:
-        ubicaciones: Diccionario con comunas, regiones, etc.
+        ubicaciones: Diccionario con comunas, regiones, etc. Si trae
+                     "candidatos" (de puntuar_ubicaciones) se usan; si no,
+                     se puntúan sus "menciones".
         tribunal: Código del tribunal (1TA, 2TA, 3TA)
 
     Returns:
-        Diccionario con lat, lon, precision, comuna, region
+        Diccionario con lat, lon, precision, comuna, region, confianza
     """
+    candidatos = ubicaciones.get("candidatos")
+    if candidatos is None:
+        candidatos = puntuar_ubicaciones(ubicaciones.get("menciones", []), tribunal)
+
+    mejores = {}
+    for c in candidatos:
+        if c["puntaje"] >= UMBRAL_PUNTAJE:
+            mejores.setdefault(c["tipo"], c)
+
     # Prioridad 1: Comuna
-    if ubicaciones["comunas"]:
-        comuna = ubicaciones["comunas"][0]
-        datos_comuna = buscar_comuna(comuna)
-        if datos_comuna:
-            return {
-                "lat": datos_comuna["lat"],
-                "lon": datos_comuna["lon"],
-                "precision": "media",
-                "comuna": comuna,
-                "region": datos_comuna["region"],
-                "fuente": "texto_comuna"
-            }
+    if "comuna" in mejores:
+        c = mejores["comuna"]
+        datos_comuna = buscar_comuna(c["nombre"])
+        return {
+            "lat": datos_comuna["lat"],
+            "lon": datos_comuna["lon"],
+            "precision": "media",
+            "comuna": c["nombre"],
+            "region": datos_comuna["region"],
+            "fuente": "texto_comuna",
+            "confianza": c["confianza"],
+        }
 
     # Prioridad 2: Región
-    if ubicaciones["regiones"]:
-        region = ubicaciones["regiones"][0]
-        if region in REGIONES_CHILE:
-            return {
-                "lat": REGIONES_CHILE[region]["lat"],
-                "lon": REGIONES_CHILE[region]["lon"],
-                "precision": "baja",
-                "comuna": None,
-                "region": region,
-                "fuente": "texto_region"
-            }
+    if "region" in mejores:
+        c = mejores["region"]
+        return {
+            "lat": REGIONES_CHILE[c["nombre"]]["lat"],
+            "lon": REGIONES_CHILE[c["nombre"]]["lon"],
+            "precision": "baja",
+            "comuna": None,
+            "region": c["nombre"],
+            "fuente": "texto_region",
+            "confianza": c["confianza"],
+        }
 
     # Prioridad 3: Fallback a tribunal
     coords = get_coords_tribunal(tribunal)
@@ -162,14 +397,114 @@ def determinar_ubicacion_principal(ubicaciones: dict, tribunal: str) -> dict:
         "precision": "tribunal",
         "comuna": sede,
         "region": buscar_region(sede) or "Metropolitana",
-        "fuente": "tribunal"
+        "fuente": "tribunal",
+        "confianza": 0.0,
+    }
+
+
+def identificar_causa(txt_file: Path) -> tuple[str, str]:
+    """
+    Obtiene (ROL, tribunal) a partir del nombre de un archivo de texto.
+
+    Si no se reconoce un ROL se usa el nombre del archivo; el tribunal por
+    defecto es 2TA.
+    """
+    # Extraer ROL del nombre del archivo
+    rol_match = re.search(r'([RDS])-?(\d+)-(\d{4})', txt_file.name)
+    if rol_match:
+        tipo, num, año = rol_match.groups()
+        rol = f"{tipo}-{num}-{año}"
+    else:
+        rol = txt_file.stem
+
+    # Determinar tribunal del nombre
+    tribunal = "2TA"  # Default
+    if "1ta" in txt_file.name.lower() or "s1ta" in txt_file.name.lower():
+        tribunal = "1TA"
+    elif "3ta" in txt_file.name.lower():
+        tribunal = "3TA"
+
+    return rol, tribunal
+
+
+def procesar_archivo(txt_file: Path) -> dict:
+    """
+    Extrae las ubicaciones de un archivo de texto.
+
+    Returns:
+        {"archivo", "rol", "entrada"} con la entrada de ubicaciones_extraidas.json,
+        o {"archivo", "error"} si no se pudo leer.
+    """
+    try:
+        texto = txt_file.read_text(encoding='utf-8', errors='ignore')
+    except Exception as e:
+        return {"archivo": txt_file.name, "error": str(e)}
+
+    rol, tribunal = identificar_causa(txt_file)
+
+    # Extraer ubicaciones
+    ubicaciones = extraer_ubicaciones_texto(texto)
+    ubicaciones["candidatos"] = puntuar_ubicaciones(ubicaciones["menciones"], tribunal)
+    ubicacion_principal = determinar_ubicacion_principal(ubicaciones, tribunal)
+
+    return {
+        "archivo": txt_file.name,
+        "rol": rol,
+        "entrada": {
+            "tribunal": tribunal,
+            "archivo": txt_file.name,
+            "comunas_mencionadas": ubicaciones["comunas"],
+            "regiones_mencionadas": ubicaciones["regiones"],
+            "conteo_menciones": ubicaciones["conteos"],
+            "direcciones": ubicaciones["direcciones"][:2],
+            "candidatos": ubicaciones["candidatos"][:5],
+            "ubicacion_principal": ubicacion_principal
+        },
     }
 
 
-def procesar_textos():
+def hash_archivo(ruta: Path) -> str:
+    """SHA-1 del contenido de un archivo."""
+    return hashlib.sha1(ruta.read_bytes()).hexdigest()
+
+
+def cargar_cache_extraccion() -> dict:
+    """
+    Carga la caché de extracción {archivo: {"hash", "rol", "entrada"}}.
+
+    Se descarta entera si fue generada con otra VERSION_EXTRACCION.
+    """
+    if not CACHE_EXTRACCION_FILE.exists():
+        return {}
+    try:
+        with open(CACHE_EXTRACCION_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if cache.get("version") != VERSION_EXTRACCION:
+        return {}
+    return cache.get("archivos", {})
+
+
+def guardar_cache_extraccion(archivos: dict):
+    """Guarda la caché de extracción (escritura atómica)."""
+    CACHE_EXTRACCION_FILE.parent.mkdir(parents=True, exist_ok=True)
+    temporal = CACHE_EXTRACCION_FILE.with_suffix(".tmp")
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({"version": VERSION_EXTRACCION, "archivos": archivos}, f, ensure_ascii=False)
+    temporal.replace(CACHE_EXTRACCION_FILE)
+
+
+def procesar_textos(incremental: bool = False, procesos: int = 1):
     """
     Procesa todos los textos de sentencias y extrae ubicaciones.
 
+    Args:
+        incremental: Reusar los resultados en caché de los textos cuyo
+                     contenido (hash) no cambió; solo se procesan los nuevos
+                     o modificados
+        procesos: Número de procesos en paralelo para los textos a procesar
+
     Returns:
         Diccionario con ubicaciones por ROL
     """
@@ -182,55 +517,65 @@ def procesar_textos():
     textos = list(TEXTOS_DIR.glob("*.txt"))
     print(f"Encontrados {len(textos)} archivos de texto")
 
-    resultados = {}
-    stats = {"con_comuna": 0, "con_region": 0, "solo_tribunal": 0}
-
-    for i, txt_file in enumerate(textos, 1):
-        if i % 50 == 0:
-            print(f"  Procesando {i}/{len(textos)}...")
-
-        try:
-            texto = txt_file.read_text(encoding='utf-8', errors='ignore')
-        except Exception as e:
-            print(f"  Error leyendo {txt_file.name}: {e}")
-            continue
-
-        # Extraer ROL del nombre del archivo
-        rol_match = re.search(r'([RDS])-?(\d+)-(\d{4})', txt_file.name)
-        if rol_match:
-            tipo, num, año = rol_match.groups()
-            rol = f"{tipo}-{num}-{año}"
+    # Separar textos ya procesados (mismo hash) de los pendientes
+    cache = cargar_cache_extraccion() if incremental else {}
+    hashes = {}
+    pendientes = []
+    with fase("hash_textos"):
+        for txt_file in textos:
+            try:
+                hashes[txt_file.name] = hash_archivo(txt_file)
+            except OSError:
+                hashes[txt_file.name] = None
+            previo = cache.get(txt_file.name)
+            if not previo or previo["hash"] != hashes[txt_file.name]:
+                pendientes.append(txt_file)
+
+    contar("textos", len(textos))
+    contar("textos_procesados", len(pendientes))
+    if incremental:
+        print(f"  En caché: {len(textos) - len(pendientes)}, a procesar: {len(pendientes)}")
+
+    with fase("extraccion"):
+        if procesos > 1 and len(pendientes) > 1:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                nuevos = list(pool.map(procesar_archivo, pendientes, chunksize=8))
         else:
-            rol = txt_file.stem
+            nuevos = []
+            for i, txt_file in enumerate(pendientes, 1):
+                if i % 50 == 0:
+                    print(f"  Procesando {i}/{len(pendientes)}...")
+                nuevos.append(procesar_archivo(txt_file))
+
+    for r in nuevos:
+        if "error" in r:
+            print(f"  Error leyendo {r['archivo']}: {r['error']}")
+            cache.pop(r["archivo"], None)
+            continue
+        cache[r["archivo"]] = {"hash": hashes[r["archivo"]], "rol": r["rol"], "entrada": r["entrada"]}
 
-        # Determinar tribunal del nombre
-        tribunal = "2TA"  # Default
-        if "1ta" in txt_file.name.lower() or "s1ta" in txt_file.name.lower():
-            tribunal = "1TA"
-        elif "3ta" in txt_file.name.lower():
-            tribunal = "3TA"
+    # Textos eliminados salen de la caché
+    cache = {t.name: cache[t.name] for t in textos if t.name in cache}
+    guardar_cache_extraccion(cache)
 
-        # Extraer ubicaciones
-        ubicaciones = extraer_ubicaciones_texto(texto)
-        ubicacion_principal = determinar_ubicacion_principal(ubicaciones, tribunal)
+    # Armar resultados en el orden de los archivos (como antes, el último texto de un ROL gana)
+    resultados = {}
+    stats = {"con_comuna": 0, "con_region": 0, "solo_tribunal": 0}
+    for txt_file in textos:
+        if txt_file.name not in cache:
+            continue
+        registro = cache[txt_file.name]
+        resultados[registro["rol"]] = registro["entrada"]
 
         # Actualizar estadísticas
-        if ubicacion_principal["precision"] == "media":
+        precision = registro["entrada"]["ubicacion_principal"]["precision"]
+        if precision == "media":
             stats["con_comuna"] += 1
-        elif ubicacion_principal["precision"] == "baja":
+        elif precision == "baja":
             stats["con_region"] += 1
         else:
             stats["solo_tribunal"] += 1
 
-        resultados[rol] = {
-            "tribunal": tribunal,
-            "archivo": txt_file.name,
-            "comunas_mencionadas": ubicaciones["comunas"],
-            "regiones_mencionadas": ubicaciones["regiones"],
-            "direcciones": ubicaciones["direcciones"][:2],
-            "ubicacion_principal": ubicacion_principal
-        }
-
     print(f"\nEstadísticas de extracción:")
     print(f"  Con comuna identificada: {stats['con_comuna']}")
     print(f"  Solo región: {stats['con_region']}")
@@ -239,6 +584,7 @@ def procesar_textos():
     return resultados
 
 
+@medido()
 def cargar_causas_adicionales():
     """
     Carga causas del archivo causas_unicas.json que no tienen texto.
@@ -276,6 +622,7 @@ def cargar_causas_adicionales():
     return resultados
 
 
+@medido()
 def generar_geocodificacion_json(ubicaciones: dict):
     """Genera el archivo JSON con todas las coordenadas."""
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -295,6 +642,7 @@ def generar_geocodificacion_json(ubicaciones: dict):
             "lat": ubi["lat"],
             "lon": ubi["lon"],
             "precision": precision,
+            "confianza": ubi.get("confianza"),
             "comuna": ubi.get("comuna"),
             "region": ubi.get("region"),
             "comunas_mencionadas": datos.get("comunas_mencionadas", []),
@@ -329,10 +677,11 @@ def generar_geocodificacion_json(ubicaciones: dict):
     return output
 
 
-def generar_mapa_nivel1(datos: dict):
+@medido()
+def generar_mapa_nivel1(datos: dict, capas: dict):
     """
     Genera mapa estático PNG con los 3 tribunales.
-    Nivel 1: Vista general por tribunal.
+    Nivel 1: Vista general por tribunal (capa precalculada "tribunales").
     """
     try:
         import matplotlib.pyplot as plt
@@ -343,10 +692,8 @@ def generar_mapa_nivel1(datos: dict):
 
     FIGURAS_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Contar causas por tribunal
-    conteo = defaultdict(int)
-    for causa in datos["causas"]:
-        conteo[causa["tribunal"]] += 1
+    # Causas por tribunal
+    conteo = {f["properties"]["codigo"]: f["properties"]["causas"] for f in capas["tribunales"]["features"]}
 
     fig, ax = plt.subplots(figsize=(8, 12))
 
@@ -400,10 +747,11 @@ def generar_mapa_nivel1(datos: dict):
     print(f"Mapa Nivel 1 guardado: {output_path}")
 
 
-def generar_mapa_nivel2(datos: dict):
+@medido()
+def generar_mapa_nivel2(datos: dict, capas: dict):
     """
     Genera mapa estático PNG con distribución por comuna/región.
-    Nivel 2: Detalle geográfico.
+    Nivel 2: Detalle geográfico (capa precalculada "comunas").
     """
     try:
         import matplotlib.pyplot as plt
@@ -413,34 +761,28 @@ def generar_mapa_nivel2(datos: dict):
 
     FIGURAS_DIR.mkdir(parents=True, exist_ok=True)
 
-    # Agrupar por ubicación
-    ubicaciones = defaultdict(lambda: {"count": 0, "tribunal": set()})
-
-    for causa in datos["causas"]:
-        key = (causa["lat"], causa["lon"])
-        ubicaciones[key]["count"] += 1
-        ubicaciones[key]["tribunal"].add(causa["tribunal"])
-        ubicaciones[key]["comuna"] = causa.get("comuna", "")
-        ubicaciones[key]["region"] = causa.get("region", "")
-
     fig, ax = plt.subplots(figsize=(10, 14))
 
     # Colores por tribunal
     colores = {'1TA': '#3498db', '2TA': '#e74c3c', '3TA': '#2ecc71'}
 
-    # Dibujar puntos
-    for (lat, lon), info in ubicaciones.items():
+    # Dibujar puntos (ubicaciones con causas)
+    for feature in capas["comunas"]["features"]:
+        info = feature["properties"]
+        if not info["causas"]:
+            continue
+        lon, lat = feature["geometry"]["coordinates"]
+
         # Color según tribunal predominante
-        tribunal_principal = list(info["tribunal"])[0] if info["tribunal"] else "2TA"
-        color = colores.get(tribunal_principal, '#888888')
+        color = colores.get(info["tribunal_principal"] or "2TA", '#888888')
 
-        size = max(20, info["count"] * 15)
+        size = max(20, info["causas"] * 15)
         ax.scatter(lon, lat, s=size, c=color, alpha=0.6, edgecolor='black', linewidth=0.5)
 
         # Etiqueta para ubicaciones con muchas causas
-        if info["count"] >= 5 and info["comuna"]:
+        if info["causas"] >= 5 and info["comuna"]:
             ax.annotate(
-                f'{info["comuna"]}\n({info["count"]})',
+                f'{info["comuna"]}\n({info["causas"]})',
                 (lon, lat),
                 textcoords="offset points",
                 xytext=(5, 5),
@@ -475,17 +817,45 @@ def generar_mapa_nivel2(datos: dict):
     print(f"Mapa Nivel 2 guardado: {output_path}")
 
 
-def generar_mapa_interactivo(datos: dict):
+# Alterna las capas de clusters según el zoom (se agrega al final del mapa)
+_JS_CAPAS_ZOOM = """
+{% macro script(this, kwargs) %}
+(function() {
+    var mapa = __MAPA__;
+    var capas = __CAPAS__;
+    function actualizarCapas() {
+        var zoom = mapa.getZoom();
+        capas.forEach(function(c) {
+            var visible = zoom >= c[1] && zoom < c[2];
+            if (visible && !mapa.hasLayer(c[0])) { mapa.addLayer(c[0]); }
+            if (!visible && mapa.hasLayer(c[0])) { mapa.removeLayer(c[0]); }
+        });
+    }
+    mapa.on('zoomend', actualizarCapas);
+    actualizarCapas();
+})();
+{% endmacro %}
+"""
+
+
+@medido()
+def generar_mapa_interactivo(datos: dict, capas: dict):
     """
     Genera mapa HTML interactivo con folium.
+
+    Usa las capas precalculadas de capas_mapa.py: un nivel de clusters por
+    rango de zoom (se alternan en el navegador) y los puntos individuales
+    solo con zoom alto, en vez de un marcador por causa.
     """
     try:
         import folium
-        from folium.plugins import MarkerCluster
+        from branca.element import MacroElement, Template
     except ImportError:
         print("folium no instalado. Ejecuta: pip install folium")
         return
 
+    from capas_mapa import rangos_zoom
+
     FIGURAS_DIR.mkdir(parents=True, exist_ok=True)
 
     # Centro de Chile
@@ -495,34 +865,65 @@ def generar_mapa_interactivo(datos: dict):
         tiles='CartoDB positron'
     )
 
-    # Cluster de marcadores
-    marker_cluster = MarkerCluster(name="Causas Ambientales").add_to(mapa)
-
     # Colores por tribunal
     colores = {'1TA': 'blue', '2TA': 'red', '3TA': 'green'}
-    iconos = {'1TA': 'tint', '2TA': 'balance-scale', '3TA': 'leaf'}
-
-    for causa in datos["causas"]:
-        tribunal = causa["tribunal"]
-        color = colores.get(tribunal, 'gray')
-
-        # Popup con información
-        popup_html = f"""
-        <div style="font-family: Arial; width: 200px;">
-            <b>ROL:</b> {causa['rol']}<br>
-            <b>Tribunal:</b> {tribunal}<br>
-            <b>Comuna:</b> {causa.get('comuna') or 'N/D'}<br>
-            <b>Región:</b> {causa.get('region') or 'N/D'}<br>
-            <b>Precisión:</b> {causa['precision']}<br>
-        </div>
-        """
-
-        folium.Marker(
-            location=[causa['lat'], causa['lon']],
-            popup=folium.Popup(popup_html, max_width=250),
-            icon=folium.Icon(color=color, icon='info-sign'),
-            tooltip=f"{causa['rol']} - {tribunal}"
-        ).add_to(marker_cluster)
+    color_conflicto = 'orange'
+
+    def estilo_cluster(feature):
+        p = feature["properties"]
+        color = colores.get(p.get("tribunal_principal"), color_conflicto)
+        return {"radius": min(40, 5 + 3 * p["n"] ** 0.5), "color": color,
+                "fillColor": color, "fillOpacity": 0.5, "weight": 1}
+
+    def estilo_punto(feature):
+        p = feature["properties"]
+        color = colores.get(p.get("tribunal"), 'gray') if p["tipo"] == "causa" else color_conflicto
+        return {"radius": 5, "color": color, "fillColor": color, "fillOpacity": 0.8, "weight": 1}
+
+    # Tribunales (siempre visibles)
+    folium.GeoJson(
+        capas["tribunales"],
+        name="Tribunales",
+        marker=folium.Marker(icon=folium.Icon(color='black', icon='info-sign')),
+        tooltip=folium.GeoJsonTooltip(fields=["codigo", "sede", "causas"],
+                                      aliases=["Tribunal", "Sede", "Causas"]),
+    ).add_to(mapa)
+
+    # Clusters por nivel de zoom y puntos individuales
+    capas_zoom = []
+    for nombre, zoom_min, zoom_max in rangos_zoom():
+        if nombre == "puntos":
+            capa = folium.GeoJson(
+                capas["puntos"],
+                name="Causas y conflictos",
+                marker=folium.CircleMarker(),
+                style_function=estilo_punto,
+                popup=folium.GeoJsonPopup(
+                    fields=["tipo", "id", "nombre", "tribunal", "comuna", "region", "sector", "precision"],
+                    aliases=["Tipo", "ID", "Nombre", "Tribunal", "Comuna", "Región", "Sector", "Precisión"]),
+                control=False,
+            )
+        else:
+            capa = folium.GeoJson(
+                capas[nombre],
+                name=nombre,
+                marker=folium.CircleMarker(),
+                style_function=estilo_cluster,
+                tooltip=folium.GeoJsonTooltip(fields=["n", "causas", "conflictos"],
+                                              aliases=["Total", "Causas", "Conflictos"]),
+                control=False,
+            )
+        capa.add_to(mapa)
+        capas_zoom.append((capa, zoom_min, zoom_max))
+
+    conmutador = MacroElement()
+    conmutador._template = Template(
+        _JS_CAPAS_ZOOM
+        .replace("__MAPA__", mapa.get_name())
+        .replace("__CAPAS__", "[" + ", ".join(
+            f"[{capa.get_name()}, {zoom_min}, {zoom_max}]" for capa, zoom_min, zoom_max in capas_zoom) + "]")
+    )
+    mapa.add_child(conmutador)
 
     # Agregar leyenda
     legend_html = '''
@@ -533,6 +934,7 @@ def generar_mapa_interactivo(datos: dict):
         <i class="fa fa-map-marker" style="color:blue"></i> 1TA Antofagasta<br>
         <i class="fa fa-map-marker" style="color:red"></i> 2TA Santiago<br>
         <i class="fa fa-map-marker" style="color:green"></i> 3TA Valdivia<br>
+        <i class="fa fa-circle" style="color:orange"></i> Conflictos<br>
     </div>
     '''
     mapa.get_root().html.add_child(folium.Element(legend_html))
@@ -547,7 +949,7 @@ def generar_mapa_interactivo(datos: dict):
     print(f"Mapa interactivo guardado: {output_path}")
 
 
-def main():
+def main(incremental=False, procesos=1):
     """Función principal."""
     print("=" * 60)
     print("GEOCODIFICACIÓN DE CONFLICTOS AMBIENTALES")
@@ -556,7 +958,8 @@ def main():
 
     # 1. Procesar textos de sentencias
     print("\n[1/5] Procesando textos de sentencias...")
-    ubicaciones = procesar_textos()
+    with fase("procesar_textos"):
+        ubicaciones = procesar_textos(incremental=incremental, procesos=procesos)
 
     # 2. Cargar causas adicionales (sin texto)
     print("\n[2/5] Cargando causas adicionales...")
@@ -575,12 +978,15 @@ def main():
 
     # 4. Generar mapas estáticos
     print("\n[4/5] Generando mapas estáticos (PNG)...")
-    generar_mapa_nivel1(datos_geo)
-    generar_mapa_nivel2(datos_geo)
+    with fase("construir_capas"):
+        capas, desde_cache = construir_capas(datos_geo["causas"])
+    print(f"Capas del mapa {'en caché' if desde_cache else 'generadas'}: {CAPAS_DIR}")
+    generar_mapa_nivel1(datos_geo, capas)
+    generar_mapa_nivel2(datos_geo, capas)
 
     # 5. Generar mapa interactivo
     print("\n[5/5] Generando mapa interactivo (HTML)...")
-    generar_mapa_interactivo(datos_geo)
+    generar_mapa_interactivo(datos_geo, capas)
 
     print("\n" + "=" * 60)
     print("PROCESO COMPLETADO")
@@ -594,4 +1000,14 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Geocodificar causas de los Tribunales Ambientales')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Procesar solo los textos nuevos o modificados')
+    parser.add_argument('--procesos', type=int, default=1,
+                        help='Número de procesos en paralelo (default: 1)')
+    args = parser.parse_args()
+
+    with ejecucion("geocodificar_conflictos", parametros=vars(args)):
+        main(incremental=args.incremental, procesos=args.procesos)
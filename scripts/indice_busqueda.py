@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Índice de búsqueda de texto completo (SQLite FTS5) para la plataforma.
+
+Indexa:
+- conflictos: nombre y descripción del dataset consolidado (noticias)
+- sentencias: textos extraídos en corpus/textos/
+
+El tokenizador unicode61 con remove_diacritics ignora mayúsculas y tildes
+("rio", "Río" y "RÍO" son el mismo término). Los resultados se ordenan por
+BM25 (el nombre pesa más que la descripción) e incluyen un fragmento con
+los términos encontrados resaltados.
+
+El índice se guarda en datos/busqueda/indice_busqueda.sqlite. Al
+reconstruirlo solo se reindexan los textos nuevos, modificados o
+eliminados (según su hash); los conflictos se reindexan si cambia el
+dataset.
+
+Uso:
+    python indice_busqueda.py [--refrescar]
+    python indice_busqueda.py --buscar "relave minero"
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import hashlib
+import html
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+CONFLICTOS_FILE = BASE_DIR / "datos" / "conflictos" / "conflictos_consolidados_noticias.json"
+TEXTOS_DIR = BASE_DIR / "corpus" / "textos"
+INDICE_DIR = BASE_DIR / "datos" / "busqueda"
+INDICE_FILE = INDICE_DIR / "indice_busqueda.sqlite"
+
+# Cambiar cuando cambie el esquema del índice (fuerza reconstrucción completa)
+VERSION_INDICE = 1
+
+TOKENIZADOR = "unicode61 remove_diacritics 2"
+
+# Pesos BM25 por columna (las columnas UNINDEXED llevan 0)
+PESOS_CONFLICTOS = (0.0, 10.0, 1.0)  # id_maestro, nombre, descripcion
+PESOS_SENTENCIAS = (0.0, 0.0, 1.0)   # documento, tribunal, texto
+
+ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);
+CREATE VIRTUAL TABLE IF NOT EXISTS conflictos USING fts5(
+    id_maestro UNINDEXED, nombre, descripcion, tokenize='{TOKENIZADOR}'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS sentencias USING fts5(
+    documento UNINDEXED, tribunal UNINDEXED, texto, tokenize='{TOKENIZADOR}'
+);
+CREATE TABLE IF NOT EXISTS sentencias_hash (documento TEXT PRIMARY KEY, hash TEXT);
+"""
+
+PATRON_TERMINO = re.compile(r"\w+", re.UNICODE)
+PATRON_TRIBUNAL = re.compile(r"_(\d)ta$", re.IGNORECASE)
+PATRON_ETIQUETA = re.compile(r"<[^>]+>")
+
+
+def hash_archivo(ruta):
+    return hashlib.md5(ruta.read_bytes()).hexdigest()
+
+
+def texto_plano(texto):
+    """Quita etiquetas y entidades HTML (las descripciones del INDH vienen en HTML)."""
+    return " ".join(html.unescape(PATRON_ETIQUETA.sub(" ", texto or "")).split())
+
+
+def tribunal_de_documento(documento):
+    """'R-146-2016_3ta' -> '3TA' (None si el nombre no indica tribunal)."""
+    m = PATRON_TRIBUNAL.search(documento)
+    return f"{m.group(1)}TA" if m else None
+
+
+# ============================================================
+# CONSTRUCCIÓN
+# ============================================================
+
+def _meta(conn, clave):
+    fila = conn.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+    return fila[0] if fila else None
+
+
+def _set_meta(conn, clave, valor):
+    conn.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)", (clave, str(valor)))
+
+
+def indexar_conflictos(conn, refrescar=False):
+    """Reindexa los conflictos si cambió el dataset. Retorna el número indexado (0 si al día)."""
+    if not CONFLICTOS_FILE.exists():
+        print(f"  Conflictos: no existe {CONFLICTOS_FILE.name}, se omite")
+        return 0
+
+    huella = hash_archivo(CONFLICTOS_FILE)
+    if not refrescar and _meta(conn, "hash_conflictos") == huella:
+        print("  Conflictos: al día")
+        return 0
+
+    with open(CONFLICTOS_FILE, encoding="utf-8") as f:
+        conflictos = json.load(f)
+
+    conn.execute("DELETE FROM conflictos")
+    conn.executemany(
+        "INSERT INTO conflictos (id_maestro, nombre, descripcion) VALUES (?, ?, ?)",
+        [(c.get("id_maestro"), texto_plano(c.get("nombre")), texto_plano(c.get("descripcion")))
+         for c in conflictos],
+    )
+    _set_meta(conn, "hash_conflictos", huella)
+    print(f"  Conflictos: {len(conflictos)} indexados")
+    return len(conflictos)
+
+
+def indexar_sentencias(conn, refrescar=False):
+    """Indexa los textos nuevos o modificados y quita los eliminados."""
+    if not TEXTOS_DIR.exists():
+        print(f"  Sentencias: no existe {TEXTOS_DIR}, se omite")
+        return 0
+
+    previos = dict(conn.execute("SELECT documento, hash FROM sentencias_hash"))
+    actuales = {}
+    pendientes = []
+    for ruta in sorted(TEXTOS_DIR.glob("*.txt")):
+        documento = ruta.stem
+        actuales[documento] = huella = hash_archivo(ruta)
+        if refrescar or previos.get(documento) != huella:
+            pendientes.append((documento, ruta, huella))
+
+    eliminados = [d for d in previos if d not in actuales]
+    for documento in eliminados + [d for d, _, _ in pendientes if d in previos]:
+        conn.execute("DELETE FROM sentencias WHERE documento = ?", (documento,))
+        conn.execute("DELETE FROM sentencias_hash WHERE documento = ?", (documento,))
+
+    for documento, ruta, huella in pendientes:
+        texto = ruta.read_text(encoding="utf-8", errors="replace")
+        conn.execute("INSERT INTO sentencias (documento, tribunal, texto) VALUES (?, ?, ?)",
+                     (documento, tribunal_de_documento(documento), texto))
+        conn.execute("INSERT INTO sentencias_hash (documento, hash) VALUES (?, ?)", (documento, huella))
+
+    print(f"  Sentencias: {len(actuales)} textos, {len(pendientes)} indexados, "
+          f"{len(eliminados)} eliminados")
+    return len(pendientes)
+
+
+def construir_indice(refrescar=False):
+    """Crea o actualiza el índice. Retorna la ruta del archivo."""
+    INDICE_DIR.mkdir(parents=True, exist_ok=True)
+
+    if INDICE_FILE.exists():
+        conn = sqlite3.connect(INDICE_FILE)
+        try:
+            version = _meta(conn, "version")
+        except sqlite3.OperationalError:
+            version = None
+        conn.close()
+        if version != str(VERSION_INDICE):
+            INDICE_FILE.unlink()
+
+    conn = sqlite3.connect(INDICE_FILE)
+    try:
+        conn.executescript(ESQUEMA)
+        # Una sola transacción: los lectores ven el índice anterior hasta el commit
+        with conn:
+            _set_meta(conn, "version", VERSION_INDICE)
+            cambios = indexar_conflictos(conn, refrescar) + indexar_sentencias(conn, refrescar)
+        if cambios:
+            conn.execute("INSERT INTO conflictos(conflictos) VALUES ('optimize')")
+            conn.execute("INSERT INTO sentencias(sentencias) VALUES ('optimize')")
+            conn.commit()
+    finally:
+        conn.close()
+    return INDICE_FILE
+
+
+# ============================================================
+# CONSULTAS
+# ============================================================
+
+def consulta_fts(texto):
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura.
+
+    Cada palabra se busca como prefijo y todas deben aparecer:
+    'relave miner' -> '"relave"* "miner"*'. Retorna None si no hay palabras.
+    """
+    terminos = PATRON_TERMINO.findall(texto or "")
+    if not terminos:
+        return None
+    return " ".join(f'"{t}"*' for t in terminos)
+
+
+def conectar(ruta=None):
+    """Conexión de solo lectura al índice (None si no existe)."""
+    ruta = Path(ruta or INDICE_FILE)
+    if not ruta.exists():
+        return None
+    return sqlite3.connect(f"{ruta.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+
+
+def _buscar(tabla, columnas, pesos, columna_fragmento, texto, limite, marca, conn):
+    consulta = consulta_fts(texto)
+    if consulta is None:
+        return []
+
+    propia = conn is None
+    if propia:
+        conn = conectar()
+        if conn is None:
+            raise FileNotFoundError(f"No existe el índice {INDICE_FILE}. Ejecuta: python scripts/indice_busqueda.py")
+    try:
+        pesos_sql = ", ".join(str(p) for p in pesos)
+        filas = conn.execute(
+            f"SELECT {', '.join(columnas)}, "
+            f"snippet({tabla}, {columna_fragmento}, ?, ?, '…', 24), bm25({tabla}, {pesos_sql}) AS puntaje "
+            f"FROM {tabla} WHERE {tabla} MATCH ? ORDER BY puntaje LIMIT ?",
+            (marca[0], marca[1], consulta, limite),
+        ).fetchall()
+    finally:
+        if propia:
+            conn.close()
+
+    # bm25() es negativo: más bajo = más relevante
+    return [dict(zip(columnas, fila[:-2]), fragmento=fila[-2], puntaje=round(-fila[-1], 3))
+            for fila in filas]
+
+
+def buscar_conflictos(texto, limite=50, marca=("**", "**"), conn=None):
+    """
+    Conflictos que contienen todas las palabras de `texto`, por relevancia.
+
+    Returns:
+        Lista de dicts con id_maestro, nombre, fragmento (de la descripción,
+        con los términos entre `marca`) y puntaje.
+    """
+    return _buscar("conflictos", ["id_maestro", "nombre"], PESOS_CONFLICTOS, 2,
+                   texto, limite, marca, conn)
+
+
+def buscar_sentencias(texto, limite=20, marca=("**", "**"), conn=None):
+    """Sentencias que contienen todas las palabras de `texto`, por relevancia."""
+    return _buscar("sentencias", ["documento", "tribunal"], PESOS_SENTENCIAS, 2,
+                   texto, limite, marca, conn)
+
+
+def main(refrescar=False, buscar=None):
+    print("=" * 60)
+    print("ÍNDICE DE BÚSQUEDA")
+    print("=" * 60)
+
+    if buscar is None:
+        inicio = time.perf_counter()
+        ruta = construir_indice(refrescar)
+        print(f"\nÍndice: {ruta} ({ruta.stat().st_size / 1024:.0f} KB, "
+              f"{time.perf_counter() - inicio:.1f}s)")
+        return
+
+    conn = conectar()
+    if conn is None:
+        print(f"\nNo existe el índice {INDICE_FILE}. Ejecuta: python indice_busqueda.py")
+        return
+    for nombre, buscador, campo in [("Conflictos", buscar_conflictos, "nombre"),
+                                    ("Sentencias", buscar_sentencias, "documento")]:
+        inicio = time.perf_counter()
+        resultados = buscador(buscar, limite=10, marca=("[", "]"), conn=conn)
+        ms = (time.perf_counter() - inicio) * 1000
+        print(f"\n{nombre}: {len(resultados)} resultados ({ms:.1f} ms)")
+        for r in resultados:
+            print(f"  {r['puntaje']:>7.2f}  {r[campo]}")
+            print(f"           {' '.join(r['fragmento'].split())[:150]}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Construir o consultar el índice de búsqueda')
+    parser.add_argument('--refrescar', action='store_true', help='Reconstruir el índice completo')
+    parser.add_argument('--buscar', help='Consultar el índice en vez de construirlo')
+    args = parser.parse_args()
+
+    main(refrescar=args.refrescar, buscar=args.buscar)
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Ingesta tipada de los datos abiertos de SNIFA (Superintendencia del Medio Ambiente).
+
+Lee los CSV/XLSX descargados (Latin-1, separados por ';', con campos
+rellenos de espacios y fechas dd-mm-aaaa), aplica tipos explícitos y
+guarda una caché Parquet en datos/snifa/cache/. Las cargas siguientes leen
+directamente la caché mientras su manifiesto (archivos fuente con tamaño y
+mtime, versión del esquema y configuración del dataset) siga coincidiendo.
+
+Datasets:
+- sancionatorios: datos/snifa/procedimientos_sancionatorios/Sancionatorios.csv
+- resto (unidades_fiscalizables, fiscalizaciones, ...): archivos descargados
+  en corpus/snifa/<dataset>/ por descargar_snifa.py
+
+Uso:
+    python ingesta_snifa.py [--refrescar]
+
+Requiere: pandas, pyarrow (openpyxl para archivos .xlsx)
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import codecs
+import csv
+import hashlib
+import json
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+DATOS_SNIFA_DIR = BASE_DIR / "datos" / "snifa"
+CORPUS_SNIFA_DIR = BASE_DIR / "corpus" / "snifa"
+CACHE_DIR = DATOS_SNIFA_DIR / "cache"
+
+EXTENSIONES = [".csv", ".xlsx", ".xls"]
+
+# Subir al cambiar tipar_snifa o el formato de la caché (invalida las cachés existentes)
+VERSION_CACHE = 2
+BLOQUE_LECTURA = 1 << 20
+
+# Columnas comunes a los datasets de SNIFA
+CATEGORICAS_COMUNES = [
+    "RegionNombre", "ComunaNombre", "CategoriaEconomicaNombre", "SubCategoriaEconomicaNombre"
+]
+
+# Configuración por dataset. Las columnas que no existan en un archivo se ignoran.
+DATASETS_SNIFA = {
+    "sancionatorios": {
+        "archivos": [DATOS_SNIFA_DIR / "procedimientos_sancionatorios" / "Sancionatorios.csv"],
+        "categoricas": CATEGORICAS_COMUNES + [
+            "ProcesoSancionTipoNombre", "ProcesoSancionEstado", "ConfirmaPdC"
+        ],
+        "fechas": {
+            "FechaInicio": "%d-%m-%Y",
+            "FechaTermino": "%d-%m-%Y",
+            "FechaActualizacion": "%d-%m-%y",
+        },
+        "decimales": ["MultaTotalUTA", "Latitud", "Longitud"],
+        "enteros": ["ProcesoSancionId", "UnidadFiscalizableId"],
+    },
+    "unidades_fiscalizables": {
+        "categoricas": CATEGORICAS_COMUNES,
+        "decimales": ["Latitud", "Longitud"],
+        "enteros": ["UnidadFiscalizableId"],
+    },
+    "fiscalizaciones": {
+        "categoricas": CATEGORICAS_COMUNES,
+        "enteros": ["UnidadFiscalizableId"],
+    },
+    "sanciones_firmes": {
+        "categoricas": CATEGORICAS_COMUNES,
+        "decimales": ["MultaTotalUTA"],
+        "enteros": ["ProcesoSancionId", "UnidadFiscalizableId"],
+    },
+    "termoelectricas": {
+        "categoricas": CATEGORICAS_COMUNES,
+        "enteros": ["UnidadFiscalizableId"],
+    },
+    "riles": {
+        "categoricas": CATEGORICAS_COMUNES,
+        "enteros": ["UnidadFiscalizableId"],
+    },
+    "rep_residuos": {
+        "categoricas": CATEGORICAS_COMUNES,
+    },
+}
+
+
+def archivos_dataset(nombre):
+    """Archivos fuente existentes de un dataset (configurados + descargados en corpus/snifa)."""
+    config = DATASETS_SNIFA[nombre]
+    archivos = [a for a in config.get("archivos", []) if a.exists()]
+
+    directorio = CORPUS_SNIFA_DIR / nombre
+    if directorio.exists():
+        for archivo in sorted(directorio.iterdir()):
+            if archivo.suffix.lower() in EXTENSIONES and archivo not in archivos:
+                archivos.append(archivo)
+    return archivos
+
+
+def es_utf8(ruta):
+    """True si todo el archivo es UTF-8 válido (decodificación incremental por bloques)."""
+    decodificador = codecs.getincrementaldecoder("utf-8")()
+    try:
+        with open(ruta, "rb") as f:
+            while bloque := f.read(BLOQUE_LECTURA):
+                decodificador.decode(bloque)
+        decodificador.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def detectar_formato(ruta):
+    """Detecta encoding (UTF-8 o Latin-1) del archivo completo y separador del encabezado."""
+    encoding = "utf-8-sig" if es_utf8(ruta) else "latin-1"
+
+    with open(ruta, encoding=encoding, errors="replace") as f:
+        primera_linea = f.readline()
+    try:
+        separador = csv.Sniffer().sniff(primera_linea, delimiters=";,\t|").delimiter
+    except csv.Error:
+        separador = ";"
+    return encoding, separador
+
+
+def leer_archivo(ruta):
+    """Lee un archivo fuente como DataFrame de texto (sin inferencia de tipos)."""
+    import pandas as pd
+
+    if ruta.suffix.lower() in (".xlsx", ".xls"):
+        return pd.read_excel(ruta, dtype=str)
+
+    encoding, separador = detectar_formato(ruta)
+    return pd.read_csv(ruta, sep=separador, encoding=encoding, dtype=str,
+                       keep_default_na=False, na_values=[""], engine="c")
+
+
+def tipar_snifa(df, config):
+    """Quita el relleno de los textos y aplica los tipos configurados."""
+    import pandas as pd
+
+    # Quitar espacios de relleno (ej: LinkSNIFA viene con padding a ancho fijo)
+    for col in df.columns:
+        texto = df[col].str.strip()
+        df[col] = texto.mask(texto == "")
+
+    fechas = dict(config.get("fechas", {}))
+    for col in df.columns:
+        if col.startswith("Fecha") and col not in fechas:
+            fechas[col] = None
+
+    for col, formato in fechas.items():
+        if col in df.columns:
+            if formato:
+                df[col] = pd.to_datetime(df[col], format=formato, errors="coerce")
+            else:
+                df[col] = pd.to_datetime(df[col], dayfirst=True, errors="coerce")
+
+    for col in config.get("decimales", []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col].str.replace(",", ".", regex=False),
+                                    errors="coerce").astype("float64")
+
+    for col in config.get("enteros", []):
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+
+    for col in config.get("categoricas", []):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    return df
+
+
+def ruta_cache(nombre):
+    """Ruta de la caché Parquet de un dataset."""
+    return CACHE_DIR / f"{nombre}.parquet"
+
+
+def ruta_manifiesto(nombre):
+    """Ruta del manifiesto de la caché de un dataset."""
+    return CACHE_DIR / f"{nombre}.manifiesto.json"
+
+
+def manifiesto_actual(nombre, archivos):
+    """Versión del esquema, hash de la configuración y (ruta, tamaño, mtime) de cada archivo fuente."""
+    # Los archivos van en su propia lista (sin rutas absolutas en el hash)
+    config = {k: v for k, v in DATASETS_SNIFA[nombre].items() if k != "archivos"}
+    config = json.dumps(config, sort_keys=True)
+    entradas = []
+    for archivo in archivos:
+        stat = archivo.stat()
+        ruta = archivo.relative_to(BASE_DIR) if archivo.is_relative_to(BASE_DIR) else archivo
+        entradas.append([ruta.as_posix(), stat.st_size, stat.st_mtime_ns])
+    return {
+        "version": VERSION_CACHE,
+        "config": hashlib.sha1(config.encode("utf-8")).hexdigest(),
+        "archivos": entradas,
+    }
+
+
+def cache_vigente(nombre, archivos):
+    """True si existe la caché y su manifiesto coincide con los archivos y la configuración actuales."""
+    manifiesto = ruta_manifiesto(nombre)
+    if not ruta_cache(nombre).exists() or not manifiesto.exists():
+        return False
+    try:
+        with open(manifiesto, encoding="utf-8") as f:
+            guardado = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return False
+    return guardado == manifiesto_actual(nombre, archivos)
+
+
+def guardar_cache(nombre, df, archivos):
+    """Guarda la caché Parquet y, al final, su manifiesto (si falla a medio camino, no queda vigente)."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    ruta_manifiesto(nombre).unlink(missing_ok=True)
+    df.to_parquet(ruta_cache(nombre), index=False, compression="zstd")
+    with open(ruta_manifiesto(nombre), "w", encoding="utf-8") as f:
+        json.dump(manifiesto_actual(nombre, archivos), f, ensure_ascii=False, indent=2)
+
+
+def cargar_snifa(nombre="sancionatorios", columnas=None, refrescar=False):
+    """
+    Carga un dataset SNIFA tipado, usando la caché Parquet si está vigente.
+
+    Args:
+        nombre: Clave de DATASETS_SNIFA
+        columnas: Columnas a retornar (None = todas)
+        refrescar: Ignorar la caché y re-leer los archivos fuente
+
+    Returns:
+        pandas.DataFrame, o None si el dataset no tiene archivos descargados
+    """
+    import pandas as pd
+
+    archivos = archivos_dataset(nombre)
+    if not archivos:
+        return None
+
+    if not refrescar and cache_vigente(nombre, archivos):
+        if columnas is not None:
+            import pyarrow.parquet as pq
+            disponibles = set(pq.read_schema(ruta_cache(nombre)).names)
+            columnas = [c for c in columnas if c in disponibles]
+        return pd.read_parquet(ruta_cache(nombre), columns=columnas)
+
+    partes = [leer_archivo(a) for a in archivos]
+    df = partes[0] if len(partes) == 1 else pd.concat(partes, ignore_index=True)
+    # Categorías y fechas se tipan después de concatenar para unificar categorías
+    df = tipar_snifa(df, DATASETS_SNIFA[nombre])
+
+    try:
+        guardar_cache(nombre, df, archivos)
+    except ImportError:
+        print("pyarrow no instalado, no se guarda caché. Ejecuta: pip install pyarrow")
+
+    if columnas is not None:
+        df = df[[c for c in columnas if c in df.columns]]
+    return df
+
+
+def main(refrescar=False):
+    print("=" * 60)
+    print("INGESTA DE DATOS SNIFA")
+    print("=" * 60)
+
+    for nombre in DATASETS_SNIFA:
+        archivos = archivos_dataset(nombre)
+        if not archivos:
+            print(f"\n{nombre}: sin archivos descargados (ver corpus/snifa/{nombre}/LINK_DESCARGA.txt)")
+            continue
+
+        desde_cache = not refrescar and cache_vigente(nombre, archivos)
+        df = cargar_snifa(nombre, refrescar=refrescar)
+        print(f"\n{nombre}: {len(df)} filas, {len(df.columns)} columnas "
+              f"({'caché' if desde_cache else f'{len(archivos)} archivo(s)'})")
+        for archivo in archivos:
+            print(f"  - {archivo.relative_to(BASE_DIR)}")
+
+        if nombre == "sancionatorios":
+            print(f"  Procesos únicos: {df['ProcesoSancionId'].nunique()}")
+            print(f"  Periodo: {df['FechaInicio'].min():%Y-%m-%d} a {df['FechaInicio'].max():%Y-%m-%d}")
+            print(f"  Multa total: {df['MultaTotalUTA'].sum():,.1f} UTA")
+            print("  Por estado:")
+            for estado, n in df['ProcesoSancionEstado'].value_counts().items():
+                print(f"    {estado}: {n}")
+
+    print(f"\nCaché Parquet: {CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Ingesta tipada de datos SNIFA')
+    parser.add_argument('--refrescar', action='store_true',
+                        help='Ignorar la caché Parquet y re-leer los archivos fuente')
+    args = parser.parse_args()
+
+    main(refrescar=args.refrescar)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Instrumentación liviana de los scripts del pipeline.
+
+Cada script envuelve su ejecución en `ejecucion(...)` y marca sus fases con
+`fase(...)` (context manager) o `@medido(...)` (decorador). Al terminar se
+agrega una línea JSON a datos/instrumentacion/ejecuciones.jsonl con:
+- duración total y por fase (con número de llamadas y el RSS pico del
+  proceso acumulado hasta el fin de la fase: incluye el de fases anteriores)
+- contadores registrados con `contar(...)`
+- memoria pico del proceso (RSS) y de sus procesos hijos
+- estado final (ok / excepción)
+
+Con la variable de entorno PERFILAR=1 también se guarda un perfil cProfile
+en datos/instrumentacion/perfiles/ (leer con `python -m pstats archivo.prof`).
+
+Fuera de una ejecución, fase/medido/contar no hacen nada, así que las
+funciones instrumentadas se pueden importar desde otros scripts.
+
+Ejemplo:
+    with ejecucion("geocodificar_conflictos", parametros={"procesos": 4}):
+        with fase("extraccion"):
+            ...
+        contar("textos", 1200)
+
+Uso (reporte de las últimas ejecuciones):
+    python instrumentacion.py [--script NOMBRE] [--ultimas N]
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+INSTRUMENTACION_DIR = BASE_DIR / "datos" / "instrumentacion"
+REPORTE_FILE = INSTRUMENTACION_DIR / "ejecuciones.jsonl"
+PERFILES_DIR = INSTRUMENTACION_DIR / "perfiles"
+
+VARIABLE_PERFIL = "PERFILAR"
+
+# Ejecución en curso en este proceso (None = instrumentación desactivada)
+_ACTIVA = None
+
+
+def rss_pico_mb(hijos=False):
+    """Memoria residente pico (MB) del proceso o de sus hijos; None si no se puede medir."""
+    try:
+        import resource
+        quien = resource.RUSAGE_CHILDREN if hijos else resource.RUSAGE_SELF
+        pico = resource.getrusage(quien).ru_maxrss
+        # Linux reporta KB, macOS bytes
+        return round(pico / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        pass
+    if hijos:
+        return None
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        # En Windows peak_wset es el pico; en otros sistemas solo el RSS actual
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    except ImportError:
+        return None
+
+
+class Ejecucion:
+    """Tiempos, contadores y memoria de una ejecución de un script."""
+
+    def __init__(self, script, parametros=None, perfilar=None):
+        self.script = script
+        self.parametros = parametros or {}
+        if perfilar is None:
+            perfilar = os.environ.get(VARIABLE_PERFIL, "") not in ("", "0")
+        self.perfilar = perfilar
+        self.fases = {}
+        self.contadores = {}
+        self._pila = []
+        self._perfil = None
+
+    def __enter__(self):
+        global _ACTIVA
+        self._anterior = _ACTIVA
+        _ACTIVA = self
+        self.fecha = datetime.now()
+        self._inicio = time.perf_counter()
+        if self.perfilar:
+            import cProfile
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        global _ACTIVA
+        if self._perfil is not None:
+            self._perfil.disable()
+        segundos = time.perf_counter() - self._inicio
+        _ACTIVA = self._anterior
+
+        registro = {
+            "script": self.script,
+            "fecha": self.fecha.isoformat(),
+            "segundos": round(segundos, 3),
+            "estado": "ok" if tipo is None else f"{tipo.__name__}: {valor}",
+            "parametros": self.parametros,
+            "fases": {nombre: {**datos, "segundos": round(datos["segundos"], 4)}
+                      for nombre, datos in self.fases.items()},
+            "contadores": self.contadores,
+            "rss_pico_mb": rss_pico_mb(),
+            "rss_pico_hijos_mb": rss_pico_mb(hijos=True),
+        }
+        if self._perfil is not None:
+            registro["perfil"] = str(self._guardar_perfil())
+        guardar_registro(registro)
+        print(f"\n[instrumentación] {self.script}: {segundos:.1f}s, RSS pico {registro['rss_pico_mb']} MB "
+              f"-> {REPORTE_FILE}")
+        return False
+
+    def _guardar_perfil(self):
+        PERFILES_DIR.mkdir(parents=True, exist_ok=True)
+        ruta = PERFILES_DIR / f"{self.script}_{self.fecha.strftime('%Y%m%d_%H%M%S')}.prof"
+        self._perfil.dump_stats(ruta)
+        return ruta
+
+    @contextmanager
+    def fase(self, nombre):
+        """Mide una fase; las fases anidadas se registran como 'padre/hija'."""
+        self._pila.append(nombre)
+        # Se registra al entrar para que las fases queden en orden de inicio
+        datos = self.fases.setdefault("/".join(self._pila), {"segundos": 0.0, "llamadas": 0})
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._pila.pop()
+            # Sin redondear: las llamadas cortas (@medido) se acumulan; se redondea al guardar
+            datos["segundos"] += time.perf_counter() - inicio
+            datos["llamadas"] += 1
+            # ru_maxrss es el pico del proceso desde su inicio, no el de la fase
+            datos["rss_pico_acumulado_mb"] = rss_pico_mb()
+
+    def contar(self, nombre, n=1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + n
+
+
+def ejecucion(script, parametros=None, perfilar=None):
+    """Context manager que instrumenta una ejecución completa de un script."""
+    return Ejecucion(script, parametros=parametros, perfilar=perfilar)
+
+
+@contextmanager
+def fase(nombre):
+    """Mide una fase de la ejecución en curso (no hace nada si no hay ninguna)."""
+    if _ACTIVA is None:
+        yield
+        return
+    with _ACTIVA.fase(nombre):
+        yield
+
+
+def medido(nombre=None):
+    """Decorador: cada llamada a la función se mide como una fase."""
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__name__
+
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with fase(etiqueta):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def contar(nombre, n=1):
+    """Suma n al contador `nombre` de la ejecución en curso."""
+    if _ACTIVA is not None:
+        _ACTIVA.contar(nombre, n)
+
+
+def guardar_registro(registro):
+    INSTRUMENTACION_DIR.mkdir(parents=True, exist_ok=True)
+    with open(REPORTE_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+
+def cargar_registros(script=None):
+    """Registros de ejecuciones, del más antiguo al más reciente."""
+    if not REPORTE_FILE.exists():
+        return []
+    registros = []
+    with open(REPORTE_FILE, encoding="utf-8") as f:
+        for linea in f:
+            if linea.strip():
+                registro = json.loads(linea)
+                if script is None or registro["script"] == script:
+                    registros.append(registro)
+    return registros
+
+
+def main(script=None, ultimas=5):
+    print("=" * 60)
+    print("REPORTE DE INSTRUMENTACIÓN")
+    print("=" * 60)
+
+    registros = cargar_registros(script)
+    if not registros:
+        print(f"\nSin ejecuciones registradas en {REPORTE_FILE}")
+        return
+
+    anterior_por_script = {}
+    for r in registros:
+        previo = anterior_por_script.get(r["script"])
+        anterior_por_script[r["script"]] = r
+        r["_previo"] = previo
+
+    for r in registros[-ultimas:]:
+        print(f"\n{r['script']} ({r['fecha'][:19]}) - {r['segundos']:.1f}s, "
+              f"RSS pico {r['rss_pico_mb']} MB, {r['estado']}")
+        previas = (r["_previo"] or {}).get("fases", {})
+        for nombre, datos in r["fases"].items():
+            cambio = ""
+            if nombre in previas and previas[nombre]["segundos"] > 0:
+                cambio = f" ({datos['segundos'] / previas[nombre]['segundos'] - 1:+.0%} vs anterior)"
+            print(f"  {nombre:<40} {datos['segundos']:>9.2f}s x{datos['llamadas']}{cambio}")
+        for nombre, n in r["contadores"].items():
+            print(f"  # {nombre:<38} {n:>10}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mostrar las últimas ejecuciones instrumentadas')
+    parser.add_argument('--script', help='Filtrar por script')
+    parser.add_argument('--ultimas', type=int, default=5, help='Número de ejecuciones (default: 5)')
+    args = parser.parse_args()
+
+    main(script=args.script, ultimas=args.ultimas)
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Asignación de región y comuna a coordenadas por límites administrativos.
+
+Carga una sola vez los polígonos de comunas desde un GeoJSON local
+(datos/geografico/limites/comunas.geojson, por ejemplo la capa "División
+Político Administrativa" de IDE Chile o BCN exportada a GeoJSON) y los
+indexa en una grilla regular. Los puntos se asignan en lotes vectorizados
+con numpy:
+
+1. Cada punto cae en una celda de la grilla
+2. Cada polígono se prueba solo contra los puntos de las celdas que cubre
+   su rectángulo envolvente
+3. Punto en polígono por cruce de rayos sobre todas las aristas a la vez
+   (los anillos interiores/agujeros quedan cubiertos por la regla par-impar)
+
+Con eso se validan o completan los campos de texto de región/comuna del
+dataset consolidado de conflictos y de las unidades SNIFA. Los valores
+completados se guardan en una tabla id -> región/comuna, sin reescribir los
+datasets de origen.
+
+Uso:
+    python limites_administrativos.py [--geojson RUTA]
+
+Salida:
+    datos/geografico/validacion_limites.json  (resumen y discrepancias)
+    datos/geografico/ubicacion_limites.csv    (fuente, id, región/comuna completadas)
+
+Requiere: numpy, pandas
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from almacen_conflictos import SIN_DATO
+from datos_geograficos_chile import buscar_comuna, buscar_region
+
+BASE_DIR = Path(__file__).parent.parent
+LIMITES_FILE = BASE_DIR / "datos" / "geografico" / "limites" / "comunas.geojson"
+OUTPUT_FILE = BASE_DIR / "datos" / "geografico" / "validacion_limites.json"
+UBICACIONES_FILE = BASE_DIR / "datos" / "geografico" / "ubicacion_limites.csv"
+
+# Nombres de propiedades usados por las distintas fuentes de límites
+PROPIEDADES_COMUNA = ["Comuna", "COMUNA", "NOM_COM", "nom_com", "comuna", "NOMBRE", "nombre"]
+PROPIEDADES_REGION = ["Region", "REGION", "NOM_REG", "nom_reg", "region"]
+
+TAMAÑO_CELDA = 0.25          # grados
+MAX_ELEMENTOS_LOTE = 2_000_000  # puntos x aristas por bloque de cruce de rayos
+
+
+def _propiedad(propiedades, candidatas):
+    for clave in candidatas:
+        valor = propiedades.get(clave)
+        if valor:
+            return str(valor).strip()
+    return None
+
+
+class IndiceLimites:
+    """Índice de polígonos de comunas en una grilla regular."""
+
+    def __init__(self, poligonos, tamaño_celda=TAMAÑO_CELDA):
+        """
+        Args:
+            poligonos: Lista de (comuna, region, anillos), con cada anillo un
+                       array numpy (n, 2) de (lon, lat)
+        """
+        import numpy as np
+
+        self.comunas = [p[0] for p in poligonos]
+        self.regiones = [p[1] for p in poligonos]
+        self.tamaño_celda = tamaño_celda
+
+        # Aristas de todos los anillos de cada polígono (x1, y1, x2, y2)
+        self.aristas = []
+        cajas = []
+        for _, _, anillos in poligonos:
+            partes = []
+            for anillo in anillos:
+                partes.append(np.hstack([anillo[:-1], anillo[1:]]) if len(anillo) > 1 else np.empty((0, 4)))
+            aristas = np.vstack(partes) if partes else np.empty((0, 4))
+            self.aristas.append(aristas)
+            puntos = np.vstack(anillos) if anillos else np.zeros((1, 2))
+            cajas.append((*puntos.min(axis=0), *puntos.max(axis=0)))
+        self.cajas = np.array(cajas, dtype="float64").reshape(-1, 4)   # lon_min, lat_min, lon_max, lat_max
+
+        # Celdas que cubre la caja de cada polígono
+        self.celdas = []
+        for lon_min, lat_min, lon_max, lat_max in self.cajas:
+            cx0, cy0 = self._celda(lon_min, lat_min)
+            cx1, cy1 = self._celda(lon_max, lat_max)
+            self.celdas.append([(cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)])
+
+    def _celda(self, lon, lat):
+        return int(lon // self.tamaño_celda), int(lat // self.tamaño_celda)
+
+    def __len__(self):
+        return len(self.comunas)
+
+    def asignar(self, lat, lon):
+        """
+        Índice del polígono que contiene cada punto (-1 si ninguno).
+
+        Args:
+            lat, lon: Arrays (o listas) de coordenadas; los NaN quedan en -1
+        """
+        import numpy as np
+
+        lat = np.asarray(lat, dtype="float64")
+        lon = np.asarray(lon, dtype="float64")
+        resultado = np.full(len(lat), -1, dtype="int64")
+
+        validos = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        if len(validos) == 0:
+            return resultado
+
+        # Puntos agrupados por celda: celda -> índices
+        cx = np.floor(lon[validos] / self.tamaño_celda).astype("int64")
+        cy = np.floor(lat[validos] / self.tamaño_celda).astype("int64")
+        por_celda = dict(_agrupar(cx, cy, validos))
+
+        for i, celdas in enumerate(self.celdas):
+            grupos = [por_celda[c] for c in celdas if c in por_celda]
+            if not grupos:
+                continue
+            candidatos = np.concatenate(grupos)
+            candidatos = candidatos[resultado[candidatos] == -1]
+            lon_min, lat_min, lon_max, lat_max = self.cajas[i]
+            en_caja = ((lon[candidatos] >= lon_min) & (lon[candidatos] <= lon_max) &
+                       (lat[candidatos] >= lat_min) & (lat[candidatos] <= lat_max))
+            candidatos = candidatos[en_caja]
+            if len(candidatos):
+                dentro = punto_en_poligono(lon[candidatos], lat[candidatos], self.aristas[i])
+                resultado[candidatos[dentro]] = i
+
+        return resultado
+
+    def asignar_nombres(self, lat, lon):
+        """(regiones, comunas) como listas, con None para puntos fuera de todo polígono."""
+        indices = self.asignar(lat, lon)
+        regiones = [self.regiones[i] if i >= 0 else None for i in indices]
+        comunas = [self.comunas[i] if i >= 0 else None for i in indices]
+        return regiones, comunas
+
+
+def _agrupar(cx, cy, indices):
+    """Agrupa `indices` por celda (cx, cy) con un solo ordenamiento."""
+    import numpy as np
+
+    orden = np.lexsort((cy, cx))
+    cx, cy, indices = cx[orden], cy[orden], indices[orden]
+    cortes = np.flatnonzero((np.diff(cx) != 0) | (np.diff(cy) != 0)) + 1
+    inicios = np.concatenate([[0], cortes])
+    for inicio, grupo in zip(inicios, np.split(indices, cortes)):
+        yield (int(cx[inicio]), int(cy[inicio])), grupo
+
+
+def punto_en_poligono(x, y, aristas):
+    """
+    Cruce de rayos vectorizado: True para cada punto (x, y) dentro del polígono.
+
+    `aristas` es un array (n, 4) con (x1, y1, x2, y2) de todos sus anillos.
+    """
+    import numpy as np
+
+    dentro = np.zeros(len(x), dtype=bool)
+    if len(aristas) == 0:
+        return dentro
+
+    x1, y1, x2, y2 = (aristas[:, k] for k in range(4))
+    # Evitar división por cero en aristas horizontales (nunca cruzan el rayo)
+    dy = np.where(y2 == y1, 1.0, y2 - y1)
+
+    lote = max(1, MAX_ELEMENTOS_LOTE // len(aristas))
+    for inicio in range(0, len(x), lote):
+        px = x[inicio:inicio + lote, None]
+        py = y[inicio:inicio + lote, None]
+        cruza = ((y1 > py) != (y2 > py)) & (px < (x2 - x1) * (py - y1) / dy + x1)
+        dentro[inicio:inicio + lote] = (cruza.sum(axis=1) % 2) == 1
+    return dentro
+
+
+def _partes_geometria(geometria):
+    """Partes de un (Multi)Polygon, cada una como lista de anillos (n, 2)."""
+    import numpy as np
+
+    if not geometria:
+        return []
+    tipo = geometria.get("type")
+    coords = geometria.get("coordinates", [])
+    if tipo == "Polygon":
+        poligonos = [coords]
+    elif tipo == "MultiPolygon":
+        poligonos = coords
+    else:
+        return []
+    return [[np.asarray(anillo, dtype="float64")[:, :2] for anillo in poligono]
+            for poligono in poligonos if poligono]
+
+
+def leer_poligonos(ruta):
+    """
+    Lee los polígonos de comunas de un GeoJSON (una entrada por parte de
+    cada MultiPolygon).
+
+    Los nombres se llevan a los de datos_geograficos_chile cuando es posible
+    (ej: "Región de Valparaíso" -> "Valparaíso"); la región se toma de la
+    propiedad del archivo o, si falta, de COMUNAS_CHILE.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        capa = json.load(f)
+
+    poligonos = []
+    for feature in capa.get("features", []):
+        propiedades = feature.get("properties") or {}
+        comuna = _propiedad(propiedades, PROPIEDADES_COMUNA)
+        partes = _partes_geometria(feature.get("geometry"))
+        if not comuna or not partes:
+            continue
+
+        datos_comuna = buscar_comuna(comuna)
+        if datos_comuna:
+            comuna = datos_comuna["nombre"]
+
+        region_texto = _propiedad(propiedades, PROPIEDADES_REGION)
+        region = buscar_region(region_texto) if region_texto else None
+        if region is None:
+            region = datos_comuna["region"] if datos_comuna else region_texto
+
+        # Cada parte (islas, exclaves) se indexa por separado con su propio
+        # rectángulo envolvente
+        for anillos in partes:
+            poligonos.append((comuna, region, anillos))
+    return poligonos
+
+
+@lru_cache(maxsize=None)
+def cargar_indice(ruta=LIMITES_FILE):
+    """
+    Índice de límites comunales (se construye una vez por proceso).
+
+    Returns:
+        IndiceLimites, o None si no existe el archivo de límites
+    """
+    ruta = Path(ruta)
+    if not ruta.exists():
+        return None
+    return IndiceLimites(leer_poligonos(ruta))
+
+
+def validar_dataframe(df, indice, col_lat, col_lon, col_region, col_comuna=None, completar=True):
+    """
+    Compara los campos de texto con la región/comuna que dan las coordenadas.
+
+    Agrega las columnas region_limite, comuna_limite y region_coincide
+    (None si el punto no cae en ningún polígono o no hay región de texto).
+    Con `completar`, rellena region/comuna vacías (o SIN_DATO) con las de los límites.
+
+    Returns:
+        El mismo DataFrame con las columnas nuevas
+    """
+    regiones, comunas = indice.asignar_nombres(df[col_lat].to_numpy("float64", na_value=float("nan")),
+                                               df[col_lon].to_numpy("float64", na_value=float("nan")))
+    df["region_limite"] = regiones
+    df["comuna_limite"] = comunas
+
+    coincide = []
+    for texto, limite in zip(df[col_region].astype(object), regiones):
+        region_texto = buscar_region(texto) if isinstance(texto, str) and texto.strip() else None
+        coincide.append(None if region_texto is None or limite is None else region_texto == limite)
+    df["region_coincide"] = coincide
+
+    if completar:
+        columnas = [(col_region, "region_limite")] + ([(col_comuna, "comuna_limite")] if col_comuna else [])
+        for col, col_limite in columnas:
+            vacia = df[col].isna() | df[col].astype(object).astype(str).str.strip().isin(["", SIN_DATO])
+            if vacia.any():
+                df[col] = df[col].astype(object)
+                df.loc[vacia, col] = df.loc[vacia, col_limite]
+    return df
+
+
+def resumen_validacion(df, id_col, col_lat):
+    """Totales de la validación y lista de discrepancias de región."""
+    discrepancias = df[df["region_coincide"] == False]  # noqa: E712 (columna object con None)
+    return {
+        "total": len(df),
+        "con_coordenadas": int(df[col_lat].notna().sum()),
+        "dentro_de_limites": int(df["region_limite"].notna().sum()),
+        "region_coincide": int((df["region_coincide"] == True).sum()),  # noqa: E712
+        "region_difiere": len(discrepancias),
+        "discrepancias": [
+            {"id": str(r[id_col]), "region_texto": r["region_texto"], "region_limite": r["region_limite"],
+             "comuna_limite": r["comuna_limite"]}
+            for r in discrepancias.to_dict("records")
+        ],
+    }
+
+
+def tabla_ubicaciones(df, fuente, id_col, col_region, col_comuna=None):
+    """
+    Tabla id -> región/comuna (ya completadas) de un DataFrame validado.
+
+    Sin columna de comuna de texto se usa la de los límites.
+    """
+    import pandas as pd
+
+    return pd.DataFrame({
+        "fuente": fuente,
+        "id": df[id_col].astype(str),
+        "region": df[col_region].astype(object),
+        "comuna": df[col_comuna].astype(object) if col_comuna else df["comuna_limite"],
+        "region_limite": df["region_limite"],
+        "comuna_limite": df["comuna_limite"],
+        "region_coincide": df["region_coincide"],
+    })
+
+
+def main(ruta_geojson=LIMITES_FILE):
+    print("=" * 60)
+    print("VALIDACIÓN DE UBICACIONES POR LÍMITES ADMINISTRATIVOS")
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    indice = cargar_indice(Path(ruta_geojson))
+    if indice is None:
+        print(f"ERROR: No se encontró {ruta_geojson}")
+        print("Descarga la capa de comunas (IDE Chile / BCN) en formato GeoJSON en esa ruta.")
+        return None
+    print(f"\nPolígonos de comunas: {len(set(indice.comunas))} comunas, {len(indice)} partes "
+          f"({time.perf_counter() - inicio:.2f}s)")
+
+    from almacen_conflictos import cargar_conflictos
+    from ingesta_snifa import cargar_snifa
+    import pandas as pd
+
+    salida = {}
+    tablas = []
+
+    conflictos = cargar_conflictos(["id_maestro", "region", "latitud", "longitud"])
+    conflictos["region_texto"] = conflictos["region"].astype(object)
+    inicio = time.perf_counter()
+    conflictos = validar_dataframe(conflictos, indice, "latitud", "longitud", "region")
+    segundos = time.perf_counter() - inicio
+    salida["conflictos"] = resumen_validacion(conflictos, "id_maestro", "latitud")
+    tablas.append(tabla_ubicaciones(conflictos, "conflictos", "id_maestro", "region"))
+    print(f"\nConflictos: {len(conflictos)} registros en {segundos:.3f}s")
+
+    snifa = cargar_snifa("sancionatorios", columnas=["Expediente", "RegionNombre", "ComunaNombre",
+                                                      "Latitud", "Longitud"])
+    if snifa is not None:
+        snifa["region_texto"] = snifa["RegionNombre"].astype(object)
+        inicio = time.perf_counter()
+        snifa = validar_dataframe(snifa, indice, "Latitud", "Longitud", "RegionNombre", "ComunaNombre")
+        segundos = time.perf_counter() - inicio
+        salida["snifa_sancionatorios"] = resumen_validacion(snifa, "Expediente", "Latitud")
+        tablas.append(tabla_ubicaciones(snifa, "snifa_sancionatorios", "Expediente", "RegionNombre",
+                                        "ComunaNombre"))
+        print(f"SNIFA sancionatorios: {len(snifa)} registros en {segundos:.3f}s "
+              f"({len(snifa) / segundos:,.0f} puntos/s)")
+
+    for nombre, r in salida.items():
+        print(f"\n{nombre}:")
+        print(f"  Con coordenadas: {r['con_coordenadas']}/{r['total']}, "
+              f"dentro de límites comunales: {r['dentro_de_limites']}")
+        print(f"  Región coincide: {r['region_coincide']}, difiere: {r['region_difiere']}")
+
+    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(salida, f, ensure_ascii=False, indent=2)
+    pd.concat(tablas, ignore_index=True).to_csv(UBICACIONES_FILE, index=False, encoding="utf-8")
+    print(f"\nGuardado en {OUTPUT_FILE}")
+    print(f"Región/comuna completadas: {UBICACIONES_FILE}")
+    return salida
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Validar ubicaciones con límites administrativos')
+    parser.add_argument('--geojson', default=str(LIMITES_FILE),
+                        help='GeoJSON con los polígonos de comunas')
+    args = parser.parse_args()
+
+    main(ruta_geojson=Path(args.geojson))
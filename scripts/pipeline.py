@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Orquestador del pipeline de datos.
+
+Declara cada etapa (script, argumentos, archivos de entrada y de salida) y
+deduce las dependencias: una etapa depende de otra si lee algo que la otra
+escribe. Al ejecutar:
+
+1. Se omiten las etapas cuyas entradas (hash de contenido), script y
+   salidas no cambiaron desde su última ejecución exitosa
+2. Las ramas independientes corren en paralelo
+3. Se registra el tiempo de cada etapa en datos/pipeline/ejecuciones.jsonl
+
+Las etapas de descarga usan la red y solo corren con --descargas; si no,
+sus salidas se tratan como datos fuente.
+
+Uso:
+    python pipeline.py                      # todo el pipeline
+    python pipeline.py geocodificar         # una etapa y lo que necesita
+    python pipeline.py --plan               # mostrar qué se ejecutaría
+    python pipeline.py --forzar consolidar  # re-ejecutar aunque esté al día
+    python pipeline.py --paralelo 4 --descargas
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import hashlib
+import json
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+SCRIPTS_DIR = BASE_DIR / "scripts"
+PIPELINE_DIR = BASE_DIR / "datos" / "pipeline"
+ESTADO_FILE = PIPELINE_DIR / "estado.json"
+EJECUCIONES_FILE = PIPELINE_DIR / "ejecuciones.jsonl"
+LOGS_DIR = PIPELINE_DIR / "logs"
+
+DESCARGA = "corpus/descarga_completa"
+CONFLICTOS = "datos/conflictos"
+SENTENCIAS = "datos/sentencias"
+GEOGRAFICO = "datos/geografico"
+SANCIONATORIOS = "datos/snifa/procedimientos_sancionatorios/Sancionatorios.csv"
+
+# Rutas relativas a BASE_DIR (archivos o directorios)
+ETAPAS = {
+    # --- Corpus de sentencias ---
+    "descargar_tribunales": {
+        "script": "descargar_tribunales.py",
+        "args": ["todos"],
+        "entradas": [],
+        "salidas": [f"{DESCARGA}/documentos"],
+        "descarga": True,
+    },
+    "extraer_corpus": {
+        "script": "extraer_corpus_completo.py",
+        "entradas": [f"{DESCARGA}/documentos"],
+        "salidas": ["corpus/textos", "datos/log_extraccion.json", "datos/pdfs_escaneados.json"],
+    },
+    "filtrar_sentencias": {
+        "script": "filtrar_sentencias_v2.py",
+        "entradas": [f"{DESCARGA}/documentos"],
+        "salidas": [f"{SENTENCIAS}/causas_unicas.json", f"{SENTENCIAS}/causas_unicas.csv",
+                    f"{SENTENCIAS}/estadisticas_sentencias_v2.json"],
+    },
+    "analisis_estadisticas": {
+        "script": "analisis_estadisticas.py",
+        "entradas": [f"{DESCARGA}/documentos"],
+        "salidas": ["datos/estadisticas/estadisticas_corpus.json", "datos/estadisticas/listado_archivos.json",
+                    "datos/estadisticas/listado_archivos.csv"],
+    },
+    "cubo_tribunales": {
+        "script": "cubo_tribunales.py",
+        "entradas": ["datos/estadisticas/listado_archivos.csv"],
+        "salidas": ["datos/estadisticas/cubo_tribunales.json"],
+    },
+
+    # --- Conflictos socioambientales ---
+    "descargar_conflictos": {
+        "script": "descargar_conflictos.py",
+        "entradas": [],
+        "salidas": [f"{CONFLICTOS}/indh_conflictos.json", f"{CONFLICTOS}/ejatlas_chile.json"],
+        "descarga": True,
+    },
+    "integrar_conflictos": {
+        "script": "integrar_conflictos.py",
+        "entradas": [f"{CONFLICTOS}/indh_conflictos.json", f"{CONFLICTOS}/ejatlas_chile_filtrado.json",
+                     f"{CONFLICTOS}/ocmal_chile.json"],
+        "salidas": [f"{CONFLICTOS}/conflictos_integrados.json", f"{CONFLICTOS}/duplicados_identificados.json"],
+    },
+    "categorizar_conflictos": {
+        "script": "categorizar_conflictos.py",
+        # Reescribe conflictos_integrados.json en el mismo archivo
+        "entradas": [f"{CONFLICTOS}/conflictos_integrados.json"],
+        "salidas": [f"{CONFLICTOS}/conflictos_integrados.json", f"{CONFLICTOS}/estadisticas_categorias.json"],
+    },
+    "consolidar": {
+        "script": "consolidar_con_ids.py",
+        "args": ["--incremental"],
+        "entradas": [f"{CONFLICTOS}/indh_conflictos.json", f"{CONFLICTOS}/ejatlas_chile_filtrado.json",
+                     f"{CONFLICTOS}/ocmal_chile.json", f"{CONFLICTOS}/duplicados_identificados.json"],
+        "salidas": [f"{CONFLICTOS}/conflictos_consolidados_ids.json",
+                    f"{CONFLICTOS}/conflictos_consolidados_ids.parquet",
+                    f"{CONFLICTOS}/conflictos_consolidados_completo.json",
+                    f"{CONFLICTOS}/registro_ids.json"],
+    },
+    "agregar_noticias": {
+        "script": "agregar_noticias.py",
+        "entradas": [f"{CONFLICTOS}/conflictos_consolidados_ids.json", f"{CONFLICTOS}/noticias_conflictos.json"],
+        "salidas": [f"{CONFLICTOS}/conflictos_consolidados_noticias.json",
+                    f"{CONFLICTOS}/conflictos_consolidados_noticias.parquet"],
+    },
+
+    # --- Geografía ---
+    "geocodificar": {
+        "script": "geocodificar_conflictos.py",
+        "args": ["--incremental"],
+        "entradas": ["corpus/textos", f"{SENTENCIAS}/causas_unicas.json",
+                     f"{CONFLICTOS}/conflictos_consolidados_noticias.json"],
+        "salidas": [f"{GEOGRAFICO}/geocodificacion.json", f"{GEOGRAFICO}/ubicaciones_extraidas.json"],
+    },
+    "validar_limites": {
+        "script": "limites_administrativos.py",
+        "entradas": [f"{GEOGRAFICO}/limites/comunas.geojson",
+                     f"{CONFLICTOS}/conflictos_consolidados_noticias.json", SANCIONATORIOS],
+        "salidas": [f"{GEOGRAFICO}/validacion_limites.json", f"{GEOGRAFICO}/ubicacion_limites.csv"],
+    },
+
+    # --- Plataforma ---
+    "cubo_temporal": {
+        "script": "cubo_temporal.py",
+        "entradas": [f"{CONFLICTOS}/conflictos_consolidados_noticias.json"],
+        "salidas": ["datos/estadisticas/cubo_temporal.parquet", "datos/estadisticas/cubo_temporal_registros.parquet"],
+    },
+    "indice_busqueda": {
+        "script": "indice_busqueda.py",
+        "entradas": [f"{CONFLICTOS}/conflictos_consolidados_noticias.json", "corpus/textos"],
+        "salidas": ["datos/busqueda/indice_busqueda.sqlite"],
+    },
+
+    # --- SNIFA ---
+    "ingesta_snifa": {
+        "script": "ingesta_snifa.py",
+        "entradas": [SANCIONATORIOS, "corpus/snifa"],
+        "salidas": ["datos/snifa/cache"],
+    },
+    "vincular_snifa": {
+        "script": "vincular_snifa_causas.py",
+        "entradas": ["corpus/textos", "datos/snifa/cache", f"{SENTENCIAS}/causas_unicas.json"],
+        "salidas": ["datos/snifa/vinculos_causas_sanciones.json", "datos/snifa/vinculos_causas_sanciones.csv"],
+    },
+}
+
+
+# ============================================================
+# GRAFO DE DEPENDENCIAS
+# ============================================================
+
+def _se_solapan(a, b):
+    """True si las rutas relativas a y b son iguales o una contiene a la otra."""
+    pa, pb = Path(a).parts, Path(b).parts
+    n = min(len(pa), len(pb))
+    return pa[:n] == pb[:n]
+
+
+def construir_grafo(etapas=ETAPAS):
+    """
+    Dependencias de cada etapa: {etapa: set(etapas de las que depende)}.
+
+    B depende de A si alguna entrada de B se solapa con una salida de A.
+    Cuando dos etapas escriben el mismo archivo (categorizar reescribe lo de
+    integrar), solo dependen de las anteriores en el orden de ETAPAS.
+    """
+    nombres = list(etapas)
+    grafo = {nombre: set() for nombre in nombres}
+    for i, b in enumerate(nombres):
+        for j, a in enumerate(nombres):
+            if a == b:
+                continue
+            escribe_lo_que_lee = any(_se_solapan(e, s) for e in etapas[b]["entradas"] for s in etapas[a]["salidas"])
+            if not escribe_lo_que_lee:
+                continue
+            comparten_salida = any(_se_solapan(s1, s2) for s1 in etapas[b]["salidas"] for s2 in etapas[a]["salidas"])
+            if comparten_salida and j > i:
+                continue
+            grafo[b].add(a)
+    verificar_aciclico(grafo)
+    return grafo
+
+
+def verificar_aciclico(grafo):
+    """Lanza ValueError si el grafo tiene ciclos."""
+    visitando, listo = set(), set()
+
+    def visitar(nodo, camino):
+        if nodo in listo:
+            return
+        if nodo in visitando:
+            raise ValueError(f"Ciclo de dependencias: {' -> '.join(camino + [nodo])}")
+        visitando.add(nodo)
+        for dep in grafo[nodo]:
+            visitar(dep, camino + [nodo])
+        visitando.discard(nodo)
+        listo.add(nodo)
+
+    for nodo in grafo:
+        visitar(nodo, [])
+
+
+def cerrar_objetivos(objetivos, grafo):
+    """Las etapas pedidas más todas sus dependencias (transitivas)."""
+    seleccion = set()
+    pendientes = list(objetivos)
+    while pendientes:
+        etapa = pendientes.pop()
+        if etapa not in seleccion:
+            seleccion.add(etapa)
+            pendientes.extend(grafo[etapa])
+    return seleccion
+
+
+# ============================================================
+# HUELLAS DE CONTENIDO
+# ============================================================
+
+class Huellas:
+    """
+    Hash de contenido de archivos y directorios.
+
+    Los hashes por archivo se reutilizan entre ejecuciones mientras no
+    cambien su tamaño ni su fecha de modificación.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = dict(cache or {})
+        self._lock = threading.Lock()
+
+    def archivo(self, ruta):
+        stat = ruta.stat()
+        clave = str(ruta.relative_to(BASE_DIR))
+        firma = [stat.st_size, stat.st_mtime_ns]
+        with self._lock:
+            previo = self.cache.get(clave)
+        if previo and previo[:2] == firma:
+            return previo[2]
+
+        sha = hashlib.sha1()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                sha.update(bloque)
+        digest = sha.hexdigest()
+        with self._lock:
+            self.cache[clave] = firma + [digest]
+        return digest
+
+    def ruta(self, relativa):
+        """Hash de un archivo o de todo un directorio (None si no existe)."""
+        ruta = BASE_DIR / relativa
+        if ruta.is_file():
+            return self.archivo(ruta)
+        if ruta.is_dir():
+            sha = hashlib.sha1()
+            for archivo in sorted(p for p in ruta.rglob("*") if p.is_file()):
+                sha.update(str(archivo.relative_to(ruta)).encode("utf-8"))
+                sha.update(self.archivo(archivo).encode("ascii"))
+            return sha.hexdigest()
+        return None
+
+    def etapa(self, config):
+        """Huella de una etapa: su script, argumentos y entradas."""
+        return {
+            "script": self.archivo(SCRIPTS_DIR / config["script"]),
+            "args": config.get("args", []),
+            "entradas": {e: self.ruta(e) for e in config["entradas"]},
+        }
+
+
+# ============================================================
+# ESTADO Y EJECUCIÓN
+# ============================================================
+
+def cargar_estado():
+    if not ESTADO_FILE.exists():
+        return {"etapas": {}, "hashes": {}}
+    with open(ESTADO_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def guardar_estado(estado):
+    PIPELINE_DIR.mkdir(parents=True, exist_ok=True)
+    temporal = ESTADO_FILE.with_suffix(".tmp")
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False, indent=2)
+    temporal.replace(ESTADO_FILE)
+
+
+def al_dia(nombre, config, huella, estado):
+    """True si la etapa ya corrió con exactamente estas entradas y sus salidas existen."""
+    previo = estado["etapas"].get(nombre)
+    if not previo or previo.get("huella") != huella:
+        return False
+    return all((BASE_DIR / s).exists() for s in config["salidas"])
+
+
+def ejecutar_etapa(nombre, config):
+    """Ejecuta el script de una etapa; la salida va a datos/pipeline/logs/<etapa>.log."""
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    comando = [sys.executable, str(SCRIPTS_DIR / config["script"]), *config.get("args", [])]
+    inicio = time.perf_counter()
+    with open(LOGS_DIR / f"{nombre}.log", "w", encoding="utf-8") as log:
+        proceso = subprocess.run(comando, cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT)
+    return proceso.returncode, time.perf_counter() - inicio
+
+
+def ejecutar(objetivos=None, forzar=(), descargas=False, paralelo=2, plan=False):
+    """
+    Ejecuta las etapas pedidas (None = todas) y sus dependencias.
+
+    Args:
+        objetivos: Nombres de etapas a dejar al día
+        forzar: Etapas a re-ejecutar aunque estén al día
+        descargas: Incluir las etapas de descarga (red)
+        paralelo: Máximo de etapas simultáneas
+        plan: Solo mostrar qué se ejecutaría
+
+    Returns:
+        Lista de resultados {"etapa", "estado", "segundos"}
+    """
+    grafo = construir_grafo()
+    seleccion = cerrar_objetivos(objetivos or list(ETAPAS), grafo)
+    if not descargas:
+        seleccion = {e for e in seleccion if not ETAPAS[e].get("descarga")}
+
+    estado = cargar_estado()
+    huellas = Huellas(estado.get("hashes"))
+    forzar = set(forzar)
+
+    resultados = {}
+    pendientes = {e for e in seleccion}
+    en_curso = {}
+    lock = threading.Lock()
+
+    def lista_para_correr(etapa):
+        return all(dep in resultados or dep not in seleccion for dep in grafo[etapa])
+
+    def correr(etapa):
+        """Decide y ejecuta una etapa (en un hilo del pool)."""
+        config = ETAPAS[etapa]
+        fallidas = [d for d in grafo[etapa] if resultados.get(d, {}).get("estado") in ("error", "bloqueada")]
+        if fallidas:
+            return {"etapa": etapa, "estado": "bloqueada", "segundos": 0.0, "por": fallidas}
+        if plan:
+            # En el plan las dependencias pendientes no corren: sus salidas cambiarían
+            previas = [d for d in grafo[etapa] if resultados.get(d, {}).get("estado") == "pendiente"]
+            if previas:
+                return {"etapa": etapa, "estado": "pendiente", "segundos": 0.0, "por": previas}
+
+        huella = huellas.etapa(config)
+        if etapa not in forzar and al_dia(etapa, config, huella, estado):
+            return {"etapa": etapa, "estado": "al_dia", "segundos": 0.0}
+        if plan:
+            return {"etapa": etapa, "estado": "pendiente", "segundos": 0.0}
+
+        print(f"  -> {etapa} ({' '.join([config['script'], *config.get('args', [])])})")
+        codigo, segundos = ejecutar_etapa(etapa, config)
+        if codigo != 0:
+            return {"etapa": etapa, "estado": "error", "segundos": segundos, "codigo": codigo}
+
+        # La huella se toma después de correr: las etapas que reescriben su
+        # propia entrada quedan al día con el archivo ya modificado
+        with lock:
+            estado["etapas"][etapa] = {
+                "huella": huellas.etapa(config),
+                "fecha": datetime.now().isoformat(),
+                "segundos": round(segundos, 3),
+            }
+        return {"etapa": etapa, "estado": "ejecutada", "segundos": segundos}
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, paralelo)) as pool:
+        while pendientes or en_curso:
+            for etapa in sorted(pendientes):
+                if lista_para_correr(etapa):
+                    pendientes.discard(etapa)
+                    en_curso[pool.submit(correr, etapa)] = etapa
+            if not en_curso:
+                break
+            hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                etapa = en_curso.pop(futuro)
+                resultados[etapa] = futuro.result()
+                r = resultados[etapa]
+                detalle = f" {r['segundos']:.1f}s" if r["estado"] in ("ejecutada", "error") else ""
+                print(f"  [{r['estado']}] {etapa}{detalle}")
+    total = time.perf_counter() - inicio
+
+    if not plan:
+        estado["hashes"] = huellas.cache
+        guardar_estado(estado)
+        registrar_ejecucion(resultados, total)
+
+    return [resultados[e] for e in ETAPAS if e in resultados]
+
+
+def registrar_ejecucion(resultados, total):
+    """Agrega una línea JSON con los tiempos de la ejecución."""
+    PIPELINE_DIR.mkdir(parents=True, exist_ok=True)
+    registro = {
+        "fecha": datetime.now().isoformat(),
+        "segundos_total": round(total, 3),
+        "etapas": [{**r, "segundos": round(r["segundos"], 3)} for r in resultados.values()],
+    }
+    with open(EJECUCIONES_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Ejecutar el pipeline de datos')
+    parser.add_argument('etapas', nargs='*', help=f"Etapas objetivo (default: todas). Opciones: {', '.join(ETAPAS)}")
+    parser.add_argument('--forzar', nargs='*', default=None,
+                        help='Re-ejecutar estas etapas (sin nombres: las etapas objetivo)')
+    parser.add_argument('--descargas', action='store_true', help='Incluir etapas de descarga (red)')
+    parser.add_argument('--paralelo', type=int, default=2, help='Etapas simultáneas (default: 2)')
+    parser.add_argument('--plan', action='store_true', help='Mostrar qué se ejecutaría, sin ejecutar')
+    args = parser.parse_args()
+
+    desconocidas = [e for e in args.etapas if e not in ETAPAS]
+    if desconocidas:
+        parser.error(f"Etapas desconocidas: {', '.join(desconocidas)}")
+
+    forzar = args.forzar
+    if forzar is not None and not forzar:
+        forzar = args.etapas or list(ETAPAS)
+
+    print("=" * 60)
+    print("PIPELINE DE DATOS" + (" (plan)" if args.plan else ""))
+    print("=" * 60)
+
+    resultados = ejecutar(args.etapas or None, forzar=forzar or (), descargas=args.descargas,
+                          paralelo=args.paralelo, plan=args.plan)
+
+    print("\nResumen:")
+    for r in resultados:
+        print(f"  {r['etapa']:<24} {r['estado']:<10} {r['segundos']:>8.1f}s")
+    if any(r["estado"] == "error" for r in resultados):
+        print(f"\nHubo errores; ver {LOGS_DIR}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
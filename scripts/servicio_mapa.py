@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Clusters del mapa calculados en el servidor, por nivel de zoom.
+
+IndiceMapa guarda las coordenadas de todos los puntos (conflictos, causas
+geocodificadas, ...) como arreglos numpy y precalcula, para cada nivel de
+NIVELES_ZOOM de capas_mapa.py, la celda de la grilla de cada punto. Una
+consulta (zoom, extensión visible, máscara de filtros) agrupa con un
+np.unique + np.bincount solo los puntos visibles y retorna un cluster por
+celda (centroide, cantidad, composición por tipo). Si los puntos visibles
+son pocos (hasta max_puntos), retorna los puntos individuales; si no, y las
+celdas del nivel del zoom (la más fina desde ZOOM_PUNTOS) superan
+max_puntos, pasa al siguiente tamaño de celda más grueso.
+
+Así al navegador llegan a lo más max_puntos marcadores (salvo que ni el
+nivel más grueso alcance) aunque el índice tenga 100.000 puntos.
+
+Ejemplo:
+    indice = IndiceMapa.desde_puntos(puntos)     # puntos de capas_mapa
+    vista = indice.consultar(zoom=5, extension=(-40, -75, -30, -68))
+    vista["modo"], vista["lat"], vista["n"]
+
+Uso (tiempos sobre el corpus real y sobre puntos aleatorios):
+    python servicio_mapa.py [--aleatorios 100000]
+
+Requiere: numpy
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import json
+import math
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from capas_mapa import (GEOCODIFICACION_FILE, NIVELES_ZOOM, ZOOM_PUNTOS, cargar_conflictos_mapa,
+                        puntos_de_causas, puntos_de_conflictos)
+
+# Bajo este número de puntos visibles se envían los puntos individuales
+MAX_PUNTOS_DIRECTOS = 1000
+
+# Extensión de Chile continental e insular (lat_min, lon_min, lat_max, lon_max)
+EXTENSION_CHILE = (-56.0, -110.0, -17.0, -66.0)
+
+
+def zoom_para_extension(extension, ancho_px=800, alto_px=600):
+    """Nivel de zoom (Web Mercator, teselas de 256 px) que muestra completa la extensión."""
+    lat_min, lon_min, lat_max, lon_max = extension
+    ancho = max(lon_max - lon_min, 1e-6)
+    alto = max(lat_max - lat_min, 1e-6)
+    zoom_lon = math.log2(ancho_px * 360 / (256 * ancho))
+    zoom_lat = math.log2(alto_px * 180 / (256 * alto))
+    return max(0.0, min(zoom_lon, zoom_lat, ZOOM_PUNTOS + 2))
+
+
+def tamano_celda(zoom):
+    """Tamaño de celda (grados) del nivel de clusters para un zoom; None = puntos individuales."""
+    if zoom >= ZOOM_PUNTOS:
+        return None
+    niveles = [z for z in sorted(NIVELES_ZOOM) if z <= zoom]
+    return NIVELES_ZOOM[niveles[-1] if niveles else min(NIVELES_ZOOM)]
+
+
+class IndiceMapa:
+    """Coordenadas y celdas precalculadas por nivel de zoom de un conjunto de puntos."""
+
+    def __init__(self, lat, lon, tipos=None, etiquetas=None, ids=None):
+        import numpy as np
+
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.n = len(self.lat)
+        self.etiquetas = list(etiquetas) if etiquetas is not None else [None] * self.n
+        self.ids = list(ids) if ids is not None else list(range(self.n))
+
+        # Tipo de punto codificado (conflicto, causa, ...) para la composición de los clusters
+        tipos = list(tipos) if tipos is not None else ["punto"] * self.n
+        self.tipos = sorted(set(tipos))
+        codigo = {t: i for i, t in enumerate(self.tipos)}
+        self.tipo = np.array([codigo[t] for t in tipos], dtype=np.int16)
+
+        # Celda de cada punto por nivel: (fila + 2^20) * 2^21 + columna, sin colisiones
+        self.celdas = {}
+        for tamano in set(NIVELES_ZOOM.values()):
+            fila = np.floor(self.lat / tamano).astype(np.int64) + (1 << 20)
+            columna = np.floor(self.lon / tamano).astype(np.int64) + (1 << 20)
+            self.celdas[tamano] = fila * (1 << 21) + columna
+
+    @classmethod
+    def desde_puntos(cls, puntos):
+        """Índice a partir de puntos normalizados de capas_mapa (dicts con lat, lon, tipo, id)."""
+        return cls(
+            [p["lat"] for p in puntos],
+            [p["lon"] for p in puntos],
+            tipos=[p["tipo"] for p in puntos],
+            etiquetas=[p.get("nombre") or p.get("id") for p in puntos],
+            ids=[p["id"] for p in puntos],
+        )
+
+    def seleccion(self, extension=None, mascara=None):
+        """Posiciones de los puntos dentro de la extensión y de la máscara."""
+        import numpy as np
+
+        visibles = np.ones(self.n, dtype=bool) if mascara is None else np.asarray(mascara, dtype=bool).copy()
+        if extension is not None:
+            lat_min, lon_min, lat_max, lon_max = extension
+            visibles &= (self.lat >= lat_min) & (self.lat <= lat_max)
+            visibles &= (self.lon >= lon_min) & (self.lon <= lon_max)
+        return np.flatnonzero(visibles)
+
+    def extension(self, posiciones):
+        """Extensión (lat_min, lon_min, lat_max, lon_max) de unos puntos (Chile si no hay)."""
+        if len(posiciones) == 0:
+            return EXTENSION_CHILE
+        lat, lon = self.lat[posiciones], self.lon[posiciones]
+        return (float(lat.min()), float(lon.min()), float(lat.max()), float(lon.max()))
+
+    def consultar(self, zoom=None, extension=None, mascara=None, max_puntos=MAX_PUNTOS_DIRECTOS):
+        """
+        Vista agregada de los puntos visibles.
+
+        Args:
+            zoom: Nivel de zoom (None = el que muestra completos los puntos seleccionados)
+            extension: (lat_min, lon_min, lat_max, lon_max) visible; None = todo
+            mascara: Arreglo booleano de puntos permitidos por los filtros
+            max_puntos: Máximo de marcadores: hasta este número de puntos visibles
+                        se envían sin agrupar; si no, se agrupan con celdas cada
+                        vez más gruesas hasta no superarlo
+
+        Returns:
+            dict con modo ("puntos" o "clusters"), zoom, total y columnas
+            lat, lon, n, etiqueta (y por_tipo en clusters: {tipo: [conteos]})
+        """
+        import numpy as np
+
+        posiciones = self.seleccion(extension, mascara)
+        if zoom is None:
+            zoom = zoom_para_extension(extension or self.extension(posiciones))
+        total = len(posiciones)
+
+        if total <= max_puntos:
+            return {
+                "modo": "puntos",
+                "zoom": zoom,
+                "total": total,
+                "posiciones": posiciones.tolist(),
+                "lat": self.lat[posiciones].round(5).tolist(),
+                "lon": self.lon[posiciones].round(5).tolist(),
+                "n": [1] * total,
+                "etiqueta": [self.etiquetas[i] for i in posiciones],
+            }
+
+        # Desde el nivel del zoom (el más fino si correspondían puntos) hacia celdas más gruesas
+        tamanos = sorted(set(NIVELES_ZOOM.values()))
+        tamano = tamano_celda(zoom) or tamanos[0]
+        for tamano in tamanos[tamanos.index(tamano):]:
+            celdas, inverso = np.unique(self.celdas[tamano][posiciones], return_inverse=True)
+            if len(celdas) <= max_puntos:
+                break
+        n = np.bincount(inverso)
+        lat = np.bincount(inverso, weights=self.lat[posiciones]) / n
+        lon = np.bincount(inverso, weights=self.lon[posiciones]) / n
+        tipos = self.tipo[posiciones]
+        por_tipo = {
+            t: np.bincount(inverso[tipos == i], minlength=len(celdas)).tolist()
+            for i, t in enumerate(self.tipos)
+        }
+        return {
+            "modo": "clusters",
+            "zoom": zoom,
+            "tamano_celda": tamano,
+            "total": total,
+            "lat": lat.round(5).tolist(),
+            "lon": lon.round(5).tolist(),
+            "n": n.tolist(),
+            "etiqueta": [f"{int(k)} puntos" for k in n],
+            "por_tipo": por_tipo,
+        }
+
+
+def indice_conflictos_y_causas(df, causas=None):
+    """
+    Índice con los conflictos georreferenciados de un DataFrame del dataset
+    consolidado, seguidos de las causas geocodificadas.
+
+    Args:
+        df: DataFrame con latitud, longitud y nombre
+        causas: Puntos de puntos_de_causas() (None = leerlos de geocodificacion.json)
+
+    Returns:
+        (IndiceMapa, filas del DataFrame de cada conflicto del índice, causas).
+        Las posiciones desde len(filas) en adelante son causas.
+    """
+    import numpy as np
+
+    if causas is None:
+        causas = []
+        if GEOCODIFICACION_FILE.exists():
+            with open(GEOCODIFICACION_FILE, encoding="utf-8") as f:
+                causas = puntos_de_causas(json.load(f)["causas"])
+
+    filas = np.flatnonzero(df['latitud'].notna().to_numpy() & df['longitud'].notna().to_numpy())
+    indice = IndiceMapa(
+        np.concatenate([df['latitud'].to_numpy(dtype=float)[filas], [c["lat"] for c in causas]]),
+        np.concatenate([df['longitud'].to_numpy(dtype=float)[filas], [c["lon"] for c in causas]]),
+        tipos=["conflicto"] * len(filas) + ["causa"] * len(causas),
+        etiquetas=df['nombre'].iloc[filas].tolist() + [c["id"] for c in causas],
+    )
+    return indice, filas, causas
+
+
+def cargar_puntos():
+    """Puntos de causas geocodificadas y conflictos del dataset consolidado."""
+    causas = []
+    if GEOCODIFICACION_FILE.exists():
+        with open(GEOCODIFICACION_FILE, encoding="utf-8") as f:
+            causas = json.load(f)["causas"]
+    return puntos_de_causas(causas) + puntos_de_conflictos(cargar_conflictos_mapa())
+
+
+def puntos_aleatorios(n, semilla=2024):
+    """n puntos uniformes dentro de Chile continental (para medir)."""
+    import numpy as np
+
+    rng = np.random.default_rng(semilla)
+    lat = rng.uniform(-54.0, -18.0, n)
+    lon = rng.uniform(-75.0, -67.0, n)
+    tipos = rng.choice(["causa", "conflicto", "unidad"], n)
+    return IndiceMapa(lat, lon, tipos=tipos)
+
+
+def _medir(indice, nombre):
+    print(f"\n{nombre}: {indice.n} puntos")
+    for zoom in sorted(NIVELES_ZOOM) + [ZOOM_PUNTOS]:
+        inicio = time.perf_counter()
+        # Desde zoom 6 se consulta una ventana de la zona central
+        extension = None if zoom <= 5 else (-38.0, -74.0, -32.0, -70.0)
+        vista = indice.consultar(zoom=zoom, extension=extension)
+        ms = (time.perf_counter() - inicio) * 1000
+        print(f"  zoom {zoom:>2}: {vista['modo']:<8} {len(vista['lat']):>6} marcadores "
+              f"de {vista['total']:>7} puntos ({ms:.1f} ms)")
+
+
+def main(aleatorios=None):
+    print("=" * 60)
+    print("SERVICIO DE CLUSTERS DEL MAPA")
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    indice = IndiceMapa.desde_puntos(cargar_puntos())
+    print(f"\nÍndice construido en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    _medir(indice, "Corpus (causas + conflictos)")
+
+    if aleatorios:
+        inicio = time.perf_counter()
+        indice = puntos_aleatorios(aleatorios)
+        print(f"\nÍndice aleatorio construido en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        _medir(indice, "Puntos aleatorios")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Medir los clusters del mapa por nivel de zoom')
+    parser.add_argument('--aleatorios', type=int, help='Medir también con N puntos aleatorios')
+    args = parser.parse_args()
+
+    main(aleatorios=args.aleatorios)
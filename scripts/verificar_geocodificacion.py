@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Casos de regresión del puntaje de ubicaciones de geocodificar_conflictos.
+
+Cada caso es un texto sintético de sentencia con la comuna que
+determinar_ubicacion_principal debería elegir (o None si debe caer en la
+sede del tribunal). El cuerpo de relleno deja las menciones fuera de la
+primera página, donde no reciben el multiplicador de carátula.
+
+Uso:
+    python verificar_geocodificacion.py
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from geocodificar_conflictos import determinar_ubicacion_principal, extraer_ubicaciones_texto
+
+_CUERPO = "Vistos y considerando los antecedentes del proceso. " * 70
+
+# (descripción, texto, tribunal, comuna esperada o None = sede del tribunal)
+CASOS = [
+    ("'Constitución Política' suelta no es la comuna de Constitución",
+     _CUERPO + "Conforme a la Constitución Política de la República. " * 4, "2TA", None),
+    ("'Constitución Política' no suma a una comuna con contexto",
+     _CUERPO + "Conforme a la Constitución Política. " * 6 + "El proyecto está en la comuna de Curepto.",
+     "2TA", "Curepto"),
+    ("Las menciones sueltas suman a un lugar anclado con 'ubicado en'",
+     _CUERPO + "El proyecto está ubicado en Constitución. Los vecinos de Constitución reclamaron "
+     "ante la planta de Constitución.", "2TA", "Constitución"),
+]
+
+
+def main() -> bool:
+    """Corre CASOS; retorna True si todos dan la comuna esperada."""
+    print("=" * 60)
+    print("VERIFICACIÓN DE UBICACIÓN PRINCIPAL")
+    print("=" * 60)
+
+    fallidos = 0
+    for descripcion, texto, tribunal, esperada in CASOS:
+        ubicaciones = extraer_ubicaciones_texto(texto)
+        principal = determinar_ubicacion_principal(ubicaciones, tribunal)
+        obtenida = principal["comuna"] if principal["fuente"] == "texto_comuna" else None
+        correcto = obtenida == esperada
+        fallidos += not correcto
+        print(f"  [{'OK' if correcto else 'FALLA'}] {descripcion}: {obtenida or principal['fuente']}")
+    print(f"\n{len(CASOS) - fallidos}/{len(CASOS)} casos correctos")
+    return fallidos == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
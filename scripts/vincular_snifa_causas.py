@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Vincula procedimientos sancionatorios de SNIFA con causas de los Tribunales Ambientales.
+
+Busca en cada texto de sentencia (corpus/textos/*.txt):
+1. Códigos de expediente SNIFA (A-/D-/F-NNN-AAAA), con una expresión regular
+2. Nombres de unidades fiscalizables, con un autómata Aho-Corasick sobre
+   tokens normalizados (todas las unidades en una sola pasada por texto)
+
+Las menciones se cruzan contra índices hash de Sancionatorios.csv
+(expediente -> procesos, nombre -> unidades) y se genera una tabla de
+aristas causa (tribunal + ROL) <-> sanción.
+
+Los códigos con la forma de un ROL de tribunal (la propia causa, cualquier
+ROL de causas_unicas.json, o precedidos de "causa", "Rol" o "R.I.T.") no se
+cuentan como expedientes.
+
+Uso:
+    python vincular_snifa_causas.py [--procesos N]
+
+Salida:
+    datos/snifa/vinculos_causas_sanciones.json
+    datos/snifa/vinculos_causas_sanciones.csv
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+import csv
+import json
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from automata_patrones import AhoCorasick
+from geocodificar_conflictos import identificar_causa
+from ingesta_snifa import cargar_snifa
+
+BASE_DIR = Path(__file__).parent.parent
+TEXTOS_DIR = BASE_DIR / "corpus" / "textos"
+CAUSAS_FILE = BASE_DIR / "datos" / "sentencias" / "causas_unicas.json"
+OUTPUT_DIR = BASE_DIR / "datos" / "snifa"
+
+# Expediente SNIFA: A (autodenuncia), D (denuncia), F (fiscalización)
+PATRON_EXPEDIENTE = re.compile(r'\b([ADF])\s*-\s*(\d{1,3})\s*-\s*(\d{4})\b')
+
+# Prefijos de ROL/RIT de causas judiciales ("causa Rol N° D-12-2015", "R.I.T. D-3-2020")
+PREFIJO_CAUSA = re.compile(r'(?:\bcausas?|\bR\.?\s*I\.?\s*T\.?|\bRol(?:es)?)\s*(?:N\s*[°º.]\s*)?:?\s*$',
+                           re.IGNORECASE)
+VENTANA_PREFIJO = 24
+
+# Sin ceros a la izquierda el código se confunde con ROLes de tribunal (D-12-2015),
+# así que en ese caso se exige contexto sancionatorio cercano.
+CONTEXTO_SANCIONATORIO = re.compile(
+    r'sancionatori|superintendencia|\bSMA\b|expediente|formulaci[oó]n de cargos',
+    re.IGNORECASE
+)
+VENTANA_CONTEXTO = 120
+
+# Nombres de unidades demasiado cortos o genéricos producen falsos positivos
+MIN_TOKENS_UNIDAD = 2
+MIN_CARACTERES_UNIDAD = 10
+
+
+def normalizar_tokens(texto):
+    """Tokens en minúsculas, sin tildes ni puntuación."""
+    texto = unicodedata.normalize('NFKD', texto or "").encode('ASCII', 'ignore').decode('ASCII')
+    return re.findall(r'[a-z0-9]+', texto.lower())
+
+
+def normalizar_expediente(letra, numero, año):
+    """Formato canónico de SNIFA: D-004-2013."""
+    return f"{letra.upper()}-{int(numero):03d}-{año}"
+
+
+def normalizar_rol(rol):
+    """ROL de tribunal en forma comparable: D-12-2015 (sin ceros a la izquierda)."""
+    match = re.fullmatch(r'\s*([A-Za-z])\s*-\s*(\d+)\s*-\s*(\d{4})\s*', rol or "")
+    if not match:
+        return None
+    letra, numero, año = match.groups()
+    return f"{letra.upper()}-{int(numero)}-{año}"
+
+
+# ============================================================
+# ÍNDICES SNIFA
+# ============================================================
+
+def construir_indices(df):
+    """
+    Construye los índices hash de SNIFA.
+
+    Returns:
+        (por_expediente, por_unidad, unidades) donde
+        por_expediente: {expediente: [ProcesoSancionId, ...]}
+        por_unidad: {UnidadFiscalizableId: [Expediente, ...]}
+        unidades: {UnidadFiscalizableId: nombre}
+    """
+    import pandas as pd
+
+    por_expediente = defaultdict(set)
+    por_unidad = defaultdict(set)
+    unidades = {}
+
+    for expediente, proceso_id, unidad_id, nombre in zip(
+            df["Expediente"], df["ProcesoSancionId"], df["UnidadFiscalizableId"], df["Nombre"]):
+        if isinstance(expediente, str):
+            por_expediente[expediente].add(int(proceso_id))
+        if pd.notna(unidad_id) and isinstance(nombre, str):
+            unidad_id = int(unidad_id)
+            unidades[unidad_id] = nombre
+            if isinstance(expediente, str):
+                por_unidad[unidad_id].add(expediente)
+
+    return (
+        {k: sorted(v) for k, v in por_expediente.items()},
+        {k: sorted(v) for k, v in por_unidad.items()},
+        unidades,
+    )
+
+
+def construir_automata_unidades(unidades):
+    """Autómata sobre secuencias de tokens de los nombres de unidades fiscalizables."""
+    por_tokens = defaultdict(list)
+    for unidad_id, nombre in unidades.items():
+        tokens = tuple(normalizar_tokens(nombre))
+        if len(tokens) >= MIN_TOKENS_UNIDAD and len(" ".join(tokens)) >= MIN_CARACTERES_UNIDAD:
+            por_tokens[tokens].append(unidad_id)
+
+    automata = AhoCorasick()
+    for tokens, ids in por_tokens.items():
+        automata.agregar(tokens, tuple(ids))
+    return automata.construir()
+
+
+# ============================================================
+# EXTRACCIÓN DE MENCIONES
+# ============================================================
+
+def extraer_expedientes(texto, expedientes_validos, roles_excluidos=frozenset()):
+    """
+    Cuenta los códigos de expediente SNIFA mencionados en el texto.
+
+    Se descartan los códigos precedidos de "causa", "Rol" o "R.I.T." y, si
+    no tienen ceros a la izquierda, los que coinciden con un ROL de
+    `roles_excluidos` (normalizados con normalizar_rol).
+    """
+    encontrados = Counter()
+    for match in PATRON_EXPEDIENTE.finditer(texto):
+        letra, numero, año = match.groups()
+        if PREFIJO_CAUSA.search(texto, max(0, match.start() - VENTANA_PREFIJO), match.start()):
+            continue
+        if not numero.startswith("0") and normalizar_rol(f"{letra}-{numero}-{año}") in roles_excluidos:
+            continue
+        if len(numero) < 3:
+            inicio = max(0, match.start() - VENTANA_CONTEXTO)
+            if not CONTEXTO_SANCIONATORIO.search(texto, inicio, match.start()):
+                continue
+        expediente = normalizar_expediente(letra, numero, año)
+        if expediente in expedientes_validos:
+            encontrados[expediente] += 1
+    return encontrados
+
+
+def extraer_unidades(texto, automata):
+    """Cuenta las unidades fiscalizables mencionadas (una pasada por tokens)."""
+    encontrados = Counter()
+    for _, _, ids in automata.buscar(normalizar_tokens(texto)):
+        for unidad_id in ids:
+            encontrados[unidad_id] += 1
+    return encontrados
+
+
+# Índices por proceso (se inicializan una vez por worker)
+_INDICES = {}
+
+
+def _inicializar_worker(por_expediente, unidades, roles_causas=frozenset()):
+    _INDICES["expedientes"] = set(por_expediente)
+    _INDICES["automata"] = construir_automata_unidades(unidades)
+    _INDICES["roles"] = frozenset(roles_causas)
+
+
+def procesar_texto(txt_file):
+    """Extrae las menciones SNIFA de un archivo de texto."""
+    try:
+        texto = txt_file.read_text(encoding='utf-8', errors='ignore')
+    except OSError as e:
+        return {"archivo": txt_file.name, "error": str(e)}
+
+    rol, tribunal = identificar_causa(txt_file)
+    roles_excluidos = _INDICES["roles"] | {normalizar_rol(rol)}
+    return {
+        "archivo": txt_file.name,
+        "rol": rol,
+        "tribunal": tribunal,
+        "expedientes": dict(extraer_expedientes(texto, _INDICES["expedientes"], roles_excluidos)),
+        "unidades": dict(extraer_unidades(texto, _INDICES["automata"])),
+    }
+
+
+# ============================================================
+# TABLA DE ARISTAS
+# ============================================================
+
+def construir_aristas(menciones, por_expediente, por_unidad, unidades, causas):
+    """
+    Une las menciones con los índices SNIFA.
+
+    Cada arista es una mención causa (tribunal, ROL) -> expediente: el mismo
+    ROL en dos tribunales son causas distintas. Las menciones por unidad se
+    expanden a todos los expedientes de esa unidad.
+    """
+    aristas = {}
+    for m in menciones:
+        info_causa = causas.get((m["tribunal"], m["rol"]), {})
+        base = {
+            "rol": m["rol"],
+            "tribunal": m["tribunal"],
+            "archivo": m["archivo"],
+            "tipo_causa": info_causa.get("tipo"),
+        }
+
+        def arista_de(expediente):
+            return aristas.setdefault((m["tribunal"], m["rol"], expediente), {
+                **base, "expediente": expediente,
+                "procesos_sancion": por_expediente[expediente],
+                "unidad_fiscalizable_id": None, "unidad_nombre": None,
+                "menciones_expediente": 0, "menciones_unidad": 0,
+            })
+
+        for expediente, n in m["expedientes"].items():
+            arista_de(expediente)["menciones_expediente"] += n
+
+        for unidad_id, n in m["unidades"].items():
+            for expediente in por_unidad.get(unidad_id, []):
+                arista = arista_de(expediente)
+                arista["unidad_fiscalizable_id"] = unidad_id
+                arista["unidad_nombre"] = unidades[unidad_id]
+                arista["menciones_unidad"] += n
+
+    for arista in aristas.values():
+        if arista["menciones_expediente"] and arista["menciones_unidad"]:
+            arista["vinculo"] = "expediente+unidad"
+        elif arista["menciones_expediente"]:
+            arista["vinculo"] = "expediente"
+        else:
+            arista["vinculo"] = "unidad"
+
+    return sorted(aristas.values(), key=lambda a: (a["tribunal"], a["rol"], a["expediente"]))
+
+
+def cargar_causas():
+    """Carga causas_unicas.json indexado por (tribunal, ROL)."""
+    if not CAUSAS_FILE.exists():
+        return {}
+    with open(CAUSAS_FILE, encoding="utf-8") as f:
+        return {(c.get("tribunal"), c["rol"]): c for c in json.load(f) if c.get("rol")}
+
+
+def guardar_aristas(aristas):
+    """Guarda la tabla de aristas en JSON y CSV."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    with open(OUTPUT_DIR / "vinculos_causas_sanciones.json", "w", encoding="utf-8") as f:
+        json.dump(aristas, f, ensure_ascii=False, indent=2)
+
+    columnas = ["rol", "tribunal", "tipo_causa", "expediente", "vinculo",
+                "menciones_expediente", "menciones_unidad", "unidad_fiscalizable_id",
+                "unidad_nombre", "procesos_sancion", "archivo"]
+    with open(OUTPUT_DIR / "vinculos_causas_sanciones.csv", "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columnas, extrasaction='ignore')
+        writer.writeheader()
+        for a in aristas:
+            writer.writerow({**a, "procesos_sancion": ";".join(str(p) for p in a["procesos_sancion"])})
+
+
+def main(procesos=1):
+    print("=" * 60)
+    print("VINCULACIÓN SNIFA <-> CAUSAS DE TRIBUNALES")
+    print("=" * 60)
+
+    df = cargar_snifa("sancionatorios",
+                      columnas=["Expediente", "ProcesoSancionId", "UnidadFiscalizableId", "Nombre"])
+    if df is None:
+        print("ERROR: No se encontró Sancionatorios.csv")
+        return []
+
+    por_expediente, por_unidad, unidades = construir_indices(df)
+    print(f"\nÍndice SNIFA: {len(por_expediente)} expedientes, {len(unidades)} unidades fiscalizables")
+
+    if not TEXTOS_DIR.exists():
+        print(f"ERROR: No existe el directorio {TEXTOS_DIR}")
+        return []
+
+    causas = cargar_causas()
+    roles_causas = {normalizar_rol(rol) for _, rol in causas} - {None}
+
+    textos = sorted(TEXTOS_DIR.glob("*.txt"))
+    print(f"Textos a procesar: {len(textos)} (procesos: {procesos})")
+
+    if procesos > 1:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_worker,
+                                 initargs=(por_expediente, unidades, roles_causas)) as pool:
+            menciones = list(pool.map(procesar_texto, textos, chunksize=16))
+    else:
+        _inicializar_worker(por_expediente, unidades, roles_causas)
+        menciones = []
+        for i, txt_file in enumerate(textos, 1):
+            if i % 200 == 0:
+                print(f"  Procesando {i}/{len(textos)}...")
+            menciones.append(procesar_texto(txt_file))
+
+    errores = [m for m in menciones if "error" in m]
+    for m in errores:
+        print(f"  Error leyendo {m['archivo']}: {m['error']}")
+    menciones = [m for m in menciones if "error" not in m]
+
+    aristas = construir_aristas(menciones, por_expediente, por_unidad, unidades, causas)
+    guardar_aristas(aristas)
+
+    por_vinculo = Counter(a["vinculo"] for a in aristas)
+    print(f"\nAristas causa <-> sanción: {len(aristas)}")
+    for vinculo, n in por_vinculo.most_common():
+        print(f"  {vinculo}: {n}")
+    print(f"Causas vinculadas: {len({(a['tribunal'], a['rol']) for a in aristas})}")
+    print(f"Expedientes vinculados: {len({a['expediente'] for a in aristas})}")
+    print(f"\nGuardado en {OUTPUT_DIR / 'vinculos_causas_sanciones.json'}")
+
+    return aristas
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Vincular sanciones SNIFA con causas')
+    parser.add_argument('--procesos', type=int, default=1,
+                        help='Número de procesos en paralelo (default: 1)')
+    args = parser.parse_args()
+
+    main(procesos=args.procesos)